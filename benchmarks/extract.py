@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+
+"""
+Compares the extraction of title, excerpt and body of a content file with the regular
+expressions LSTE used before against the single pass of `helpers.extract_parts`.
+
+Every document is a generated markdown file with a title, an excerpt and many paragraphs,
+code blocks and subheadings. The result of both methods is checked to be the same before
+they are timed.
+
+Usage:
+    ./benchmarks/extract.py [--size=KB] [--repeat=N]
+"""
+
+import os
+import re
+import sys
+import getopt
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import src.helpers as helpers
+
+
+def extract_with_regex(content: str):
+    """
+    Extracts title, excerpt and body like LSTE did before: three scans with patterns which
+    are compiled on every call.
+    """
+    # title
+    title_matches = re.findall(r'^(#+)\s*(.*)$', content, re.MULTILINE)
+    title = title_matches[0][1] if title_matches else ''
+
+    # excerpt
+    excerpt = content
+    title_match = re.search(r'^# .*\n', content, re.MULTILINE)
+    if title_match:
+        post_title_content = content[title_match.end():]
+        content_match = re.search(
+            r'((?:.*?(?:\n|$))+?)(?=\n\n|$)', post_title_content, re.MULTILINE | re.DOTALL
+        )
+        if content_match:
+            excerpt = content_match.group(1).strip()
+
+    # body
+    body = re.sub(r"^(#+)\s*(.*)$", "", content, count=1, flags=re.MULTILINE)
+    return title, excerpt, body
+
+
+def extract_single_pass(content: str):
+    """
+    Extracts title, excerpt and body with `helpers.extract_parts`.
+    """
+    title, excerpt, start, end = helpers.extract_parts(content)
+    if start == 0:
+        return title, excerpt, content[end:]
+    return title, excerpt, content[:start] + content[end:]
+
+
+def create_document(size: int) -> str:
+    """
+    Creates a markdown document of about the given size in bytes.
+    """
+    parts = [
+        "# A generated article\n\n",
+        "This is the excerpt of the article. It is long enough to look like a real one.\n\n",
+    ]
+    length = sum(len(part) for part in parts)
+    section = 0
+    while length < size:
+        section += 1
+        block = (
+            f"## Section {section}\n\n"
+            + "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor. " * 8
+            + "\n\n```python\nprint('code block')\n```\n\n"
+        )
+        parts.append(block)
+        length += len(block)
+    return "".join(parts)
+
+
+def main() -> None:
+    size = 256
+    repeat = 200
+    opts, args = getopt.getopt(sys.argv[1:], "", ["size=", "repeat="])
+    for operator, argument in opts:
+        if operator == "--size":
+            size = int(argument)
+        elif operator == "--repeat":
+            repeat = int(argument)
+
+    document = create_document(size * 1024)
+    assert extract_with_regex(document) == extract_single_pass(document)
+
+    regex_time = min(timeit.repeat(lambda: extract_with_regex(document), number=repeat, repeat=5))
+    single_time = min(timeit.repeat(lambda: extract_single_pass(document), number=repeat, repeat=5))
+
+    print(f"document:    {len(document) / 1024:.0f} KB")
+    print(f"regex:       {regex_time / repeat * 1000:.3f} ms per document")
+    print(f"single pass: {single_time / repeat * 1000:.3f} ms per document")
+    print(f"speedup:     {regex_time / single_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/python3
+
+"""
+Measures the throughput of LSTE on generated websites.
+
+The generated websites are modelled on `example-full`: articles with a date in their file name
+in `content/articles`, a paginated listing of them on the start page, a contact page, a feed,
+a sitemap and templates which include each other. Dummy plugins register callbacks for the
+per page hooks, like the plugins of the example do.
+
+Every website is built in a new process with `--profile-json`, first without caches, then
+again with `--incremental`. The time of the phases `load_templates`, `load_content`,
+`render_site` and `save_site`, the pages per second and the peak RSS of both builds are
+reported. Then the website is watched with `--watch` and an article is changed several times
+to measure the time until the rebuild is saved. The result is printed as JSON and can be
+written to a file to track regressions.
+
+Usage:
+    ./benchmarks/site.py [--pages=N[,N...]] [--size=KB] [--depth=N] [--plugins=N]
+                         [--jobs=N] [--stream] [--rebuilds=N] [--output=FILE] [--keep=PATH]
+
+Options:
+    --pages     The number of articles, several counts are separated by commas. Defaults to 1000.
+    --size      The size of the markdown of an article in KB. Defaults to 4.
+    --depth     How deep the template parts include each other. Defaults to 3.
+    --plugins   The number of dummy plugins. Defaults to 2.
+    --jobs      Passed to LSTE as --jobs. Defaults to 1.
+    --stream    Builds with --stream, which renders and writes the pages in batches.
+    --rebuilds  The number of changes in watch mode. Defaults to 5, 0 skips watch mode.
+    --output    Writes the JSON result to this file.
+    --keep      Generates the websites in this folder and keeps them.
+"""
+
+import os
+import sys
+import json
+import time
+import select
+import getopt
+import shutil
+import tempfile
+import statistics
+import subprocess
+import datetime
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LSTE = os.path.join(BASE_PATH, "lste.py")
+
+# the phases of LSTE which are reported
+PHASES = ["load_templates", "load_content", "render_site", "save_site"]
+
+PLUGIN = '''
+parallel_safe = True
+
+
+def register_hooks(lste):
+    lste.hooks.add("excerpt", excerpt)
+    lste.hooks.add("single_content", single_content)
+    lste.hooks.add("pre_load_custom_functions", pre_load_custom_functions)
+
+
+def excerpt(excerpt, file, lste):
+    return excerpt.strip()
+
+
+def single_content(content, file, lste):
+    return content.replace("<h2>", "<h2 class=\\"{name}\\">")
+
+
+def pre_load_custom_functions(html, file, lste):
+    return html + "<!-- {name} -->"
+'''
+
+
+def write_file(path: str, content: str) -> None:
+    """
+    Writes a file and creates its folder.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as handle:
+        handle.write(content)
+
+
+def create_article(number: int, size: int) -> str:
+    """
+    Creates the markdown of an article of about the given size in bytes.
+    """
+    parts = [
+        f"# Article {number}\n\n",
+        f"This is the excerpt of article {number}. It is long enough to look like a real one.\n\n",
+    ]
+    length = sum(len(part) for part in parts)
+    section = 0
+    while length < size:
+        section += 1
+        block = (
+            f"## Section {section}\n\n"
+            + "Lorem ipsum dolor sit amet, *consectetur* adipiscing elit, sed do [eiusmod](https://example.com) tempor. " * 6
+            + "\n\n- first item\n- second item\n- third item\n\n"
+            + "```python\nprint('code block')\n```\n\n"
+        )
+        parts.append(block)
+        length += len(block)
+    return "".join(parts)
+
+
+def create_site(path: str, pages: int, size: int, depth: int, plugins: int) -> None:
+    """
+    Creates a website with the given number of articles, template depth and plugins.
+    """
+    config = [
+        "[lste]",
+        "title = Benchmark",
+        "keywords = benchmark",
+        "description = A generated website",
+        "",
+        "[listing]",
+        "source = articles",
+        "per_page = 10",
+        "location = index",
+        "template = articles-excerpt.html",
+        "date_format = d.m.Y",
+        "",
+        "[feed]",
+        "url = https://example.com",
+        "source = articles",
+        "",
+        "[sitemap]",
+        "url = https://example.com",
+        "",
+        "[plugins]",
+    ]
+    config += [f"bench-{number} = benchmark/bench-{number}.lste" for number in range(plugins)]
+    write_file(f"{path}/lste.conf", "\n".join(config) + "\n")
+
+    # templates, every part includes the next one
+    write_file(f"{path}/template/index.html", (
+        "<!DOCTYPE html>\n<html>\n{{part: header.html}}\n<main>\n    {{content}}\n</main>\n"
+        "{{part: footer.html}}\n</html>\n"
+    ))
+    write_file(f"{path}/template/header.html", (
+        "<head>\n    <title>{{title}}</title>\n    <meta name=\"description\" content=\"{{description}}\" />\n"
+        "    <link rel=\"stylesheet\" href=\"assets/style.css?ver={{timestamp}}\" />\n</head>\n"
+        + ("{{part: part-1.html}}\n" if depth else "")
+    ))
+    for level in range(1, depth + 1):
+        include = f"{{{{part: part-{level + 1}.html}}}}\n" if level < depth else ""
+        write_file(f"{path}/template/part-{level}.html", f"<div class=\"level-{level}\">\n{include}</div>\n")
+    write_file(f"{path}/template/footer.html", "<footer>{{keywords}}</footer>\n")
+    write_file(f"{path}/template/page.html", "<article>\n    <h1>{{title}}</h1>\n    {{content}}\n</article>\n")
+    write_file(f"{path}/template/articles-excerpt.html", (
+        "<article>\n    <h2><a href=\"{{permalink}}\">{{title}}</a></h2>\n"
+        "    <time>{{date}}</time>\n    <p>{{excerpt}}</p>\n</article>\n"
+    ))
+
+    # content
+    write_file(f"{path}/content/index.md", "# Start\n\n{{listing}}\n\n{{listing-pages}}\n")
+    write_file(f"{path}/content/contact.md", "# Contact\n\nWrite me a mail.\n")
+    start = datetime.date(2000, 1, 1)
+    for number in range(pages):
+        date = start + datetime.timedelta(days=number)
+        write_file(f"{path}/content/articles/{date.isoformat()}-article-{number}.md", create_article(number, size))
+
+    # assets
+    write_file(f"{path}/assets/style.css", "body { font-family: sans-serif; }\n" * 50)
+
+
+def create_plugins(home: str, plugins: int) -> None:
+    """
+    Installs the dummy plugins into the plugin folder of the given home folder.
+    """
+    for number in range(plugins):
+        name = f"bench-{number}"
+        folder = f"{home}/.local/share/lste/plugins/{name}"
+        write_file(f"{folder}/lste.conf", "[lste]\nversion = 1.0.0\n")
+        write_file(f"{folder}/{name}.py", PLUGIN.format(name=name))
+
+
+def run_build(path: str, home: str, arguments: list) -> dict:
+    """
+    Builds a website in a new process and returns its phases, duration and peak RSS.
+    """
+    profile_file = os.path.join(home, "profile.json")
+    environment = dict(os.environ, HOME=home)
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, LSTE, "--offline", f"--profile-json={profile_file}", "-p", path] + arguments,
+        env=environment, stdout=subprocess.DEVNULL,
+    )
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"the build failed with exit code {process.returncode}")
+
+    with open(profile_file) as handle:
+        rows = json.load(handle)
+    phases = {
+        row["name"]: round(row["total"], 4)
+        for row in rows if row["kind"] == "phase" and row["name"] in PHASES
+    }
+    return {
+        "seconds": round(seconds, 4),
+        "phases": phases,
+        # ru_maxrss is in KB on Linux
+        "peak_rss_kb": usage.ru_maxrss,
+    }
+
+
+class LineReader:
+    """
+    Reads the output of a process line by line with a timeout.
+    """
+
+    def __init__(self, process: subprocess.Popen) -> None:
+        self.fd = process.stdout.fileno()
+        self.buffer = b""
+
+    def wait_for(self, prefix: str, timeout: float = 60) -> str:
+        """
+        Returns the first line which starts with the prefix.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            while b"\n" in self.buffer:
+                line, self.buffer = self.buffer.split(b"\n", 1)
+                text = line.decode("utf-8", "replace")
+                if text.startswith(prefix):
+                    return text
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"no line starting with {prefix!r}")
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if ready:
+                data = os.read(self.fd, 65536)
+                if not data:
+                    raise RuntimeError("the watcher exited")
+                self.buffer += data
+
+
+def run_watch(path: str, home: str, rebuilds: int, arguments: list) -> list:
+    """
+    Watches a website, changes an article several times and returns the seconds until each
+    rebuild was saved.
+    """
+    environment = dict(os.environ, HOME=home, PYTHONUNBUFFERED="1")
+    process = subprocess.Popen(
+        [sys.executable, LSTE, "--offline", "--watch", "-p", path] + arguments,
+        env=environment, stdout=subprocess.PIPE,
+    )
+    reader = LineReader(process)
+    latencies = []
+    try:
+        reader.wait_for("Watching folders")
+        articles = sorted(os.listdir(f"{path}/content/articles"))
+        for number in range(rebuilds):
+            article = f"{path}/content/articles/{articles[number % len(articles)]}"
+            started = time.perf_counter()
+            with open(article, "a") as handle:
+                handle.write(f"\nChanged {number} at {time.time()}.\n")
+            reader.wait_for("Saved pages")
+            latencies.append(round(time.perf_counter() - started, 4))
+    finally:
+        process.terminate()
+        process.wait()
+    return latencies
+
+
+def run_benchmark(path: str, home: str, pages: int, options: dict) -> dict:
+    """
+    Generates a website and measures a cold build, an incremental build and watch mode.
+    """
+    create_site(path, pages, options["size"] * 1024, options["depth"], options["plugins"])
+    arguments = [f"--jobs={options['jobs']}"]
+    if options["stream"]:
+        arguments.append("--stream")
+
+    # the listing pages, the start page and the contact page
+    total_pages = pages + (pages + 9) // 10 + 1
+    result = {"articles": pages, "pages": total_pages}
+    for name, extra in (("cold", []), ("incremental", ["--incremental"])):
+        build = run_build(path, home, arguments + extra)
+        build["pages_per_second"] = round(total_pages / build["seconds"], 1)
+        result[name] = build
+
+    if options["rebuilds"]:
+        latencies = run_watch(path, home, options["rebuilds"], arguments)
+        result["watch"] = {
+            "latencies": latencies,
+            "median": statistics.median(latencies),
+            "max": max(latencies),
+        }
+    return result
+
+
+def main() -> None:
+    options = {"size": 4, "depth": 3, "plugins": 2, "jobs": 1, "stream": False, "rebuilds": 5}
+    page_counts = [1000]
+    output_file = ""
+    keep_path = ""
+    opts, args = getopt.getopt(
+        sys.argv[1:], "",
+        ["pages=", "size=", "depth=", "plugins=", "jobs=", "stream", "rebuilds=", "output=", "keep="],
+    )
+    for operator, argument in opts:
+        if operator == "--pages":
+            page_counts = [int(count) for count in argument.split(",")]
+        elif operator == "--output":
+            output_file = argument
+        elif operator == "--keep":
+            keep_path = os.path.abspath(argument)
+        elif operator == "--stream":
+            options["stream"] = True
+        else:
+            options[operator[2:]] = int(argument)
+
+    work_path = keep_path or tempfile.mkdtemp(prefix="lste-bench-")
+    home = os.path.join(work_path, "home")
+    create_plugins(home, options["plugins"])
+
+    results = []
+    try:
+        for pages in page_counts:
+            site_path = os.path.join(work_path, f"site-{pages}")
+            shutil.rmtree(site_path, ignore_errors=True)
+            results.append(run_benchmark(site_path, home, pages, options))
+            print(f"{pages} articles done", file=sys.stderr)
+    finally:
+        if not keep_path:
+            shutil.rmtree(work_path, ignore_errors=True)
+
+    report = json.dumps({"options": options, "results": results}, indent=1)
+    print(report)
+    if output_file:
+        with open(output_file, "w") as handle:
+            handle.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
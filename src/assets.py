@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+
+"""
+This module synchronizes the assets folder of a website with its copy in the `dist` folder.
+
+Instead of deleting and copying the whole folder on every build, only new and changed files
+are copied and only files which no longer exist in the assets folder are removed. A file is
+considered unchanged if its size and modification time match, or optionally if the sha256
+digests of both files match.
+
+Files are copied with the cheapest method the filesystem supports: a hardlink if enabled,
+a reflink (copy-on-write clone), `os.copy_file_range` inside the kernel, and a regular copy
+as the last resort. Every file is copied to a temporary file first and then moved into place,
+so a reader never sees a half-written asset.
+
+The primary functions include:
+- `sync_assets`: Synchronizes a source folder with a target folder.
+- `copy_file`: Copies a single file with the cheapest available method.
+- `is_unchanged`: Checks if a copied file still matches its source.
+"""
+
+import os
+import shutil
+import hashlib
+from typing import Dict
+
+# ioctl request to clone a file on Linux, see ioctl_ficlone(2)
+FICLONE = 0x40049409
+
+
+def get_file_digest(path: str) -> str:
+    """
+    Returns the sha256 digest of a file, read in chunks.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def is_unchanged(source: os.stat_result, source_path: str, target_path: str, checksum: bool = False) -> bool:
+    """
+    Checks if a copied file still matches its source.
+
+    Args:
+        source (os.stat_result): The stat of the source file.
+        source_path (str): The path of the source file.
+        target_path (str): The path of the copied file.
+        checksum (bool): Compare the digests instead of the modification times.
+
+    Returns:
+        bool: True if the copied file doesn't need to be copied again.
+    """
+    try:
+        target = os.stat(target_path)
+    except OSError:
+        return False
+
+    # hardlinks share the same file
+    if (source.st_dev, source.st_ino) == (target.st_dev, target.st_ino):
+        return True
+
+    if source.st_size != target.st_size:
+        return False
+
+    if checksum:
+        return get_file_digest(source_path) == get_file_digest(target_path)
+
+    return source.st_mtime_ns == target.st_mtime_ns
+
+
+def _clone_file(source_path: str, target_path: str) -> bool:
+    """
+    Copies a file as a reflink or with `os.copy_file_range`.
+
+    Args:
+        source_path (str): The path of the source file.
+        target_path (str): The path of the new file.
+
+    Returns:
+        bool: False if neither method is supported.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+
+    with open(source_path, "rb") as source, open(target_path, "wb") as target:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+                return True
+            except OSError:
+                pass
+
+        if not hasattr(os, "copy_file_range"):
+            return False
+
+        remaining = os.fstat(source.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(source.fileno(), target.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            return False
+        return remaining == 0
+
+
+def copy_file(source_path: str, target_path: str, link: bool = False) -> None:
+    """
+    Copies a file with the cheapest available method and keeps its modification time.
+    The copy is written to a temporary file first and then moved into place.
+
+    Args:
+        source_path (str): The path of the source file.
+        target_path (str): The path of the copy.
+        link (bool): Create a hardlink instead of a copy if possible.
+
+    Returns:
+        None
+    """
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    temp_path = os.path.join(
+        os.path.dirname(target_path), f".{os.path.basename(target_path)}.tmp"
+    )
+    if os.path.lexists(temp_path):
+        os.remove(temp_path)
+
+    try:
+        if link:
+            try:
+                os.link(source_path, temp_path)
+                os.replace(temp_path, target_path)
+                return
+            except OSError:
+                pass
+
+        if not _clone_file(source_path, temp_path):
+            shutil.copyfile(source_path, temp_path)
+        shutil.copystat(source_path, temp_path)
+        os.replace(temp_path, target_path)
+    finally:
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+
+
+def remove_path(path: str) -> None:
+    """
+    Removes a file or a folder.
+
+    Args:
+        path (str): The path to remove.
+
+    Returns:
+        None
+    """
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def sync_assets(source_path: str, target_path: str, checksum: bool = False, link: bool = False) -> Dict[str, int]:
+    """
+    Synchronizes a target folder with a source folder: new and changed files are copied,
+    files and folders which don't exist in the source anymore are removed.
+
+    Args:
+        source_path (str): The assets folder.
+        target_path (str): The copy of the assets folder.
+        checksum (bool): Compare the digests instead of the modification times.
+        link (bool): Create hardlinks instead of copies if possible.
+
+    Returns:
+        Dict[str, int]: The number of 'copied', 'unchanged' and 'removed' files.
+    """
+    stats = {"copied": 0, "unchanged": 0, "removed": 0}
+    os.makedirs(target_path, exist_ok=True)
+
+    for dirpath, dirnames, filenames in os.walk(source_path):
+        relative_path = os.path.relpath(dirpath, source_path)
+        target_dir = os.path.normpath(os.path.join(target_path, relative_path))
+        os.makedirs(target_dir, exist_ok=True)
+
+        # remove everything which is not part of the source folder anymore
+        names = set(dirnames) | set(filenames)
+        for entry in os.scandir(target_dir):
+            if entry.name not in names:
+                remove_path(entry.path)
+                stats["removed"] += 1
+            elif entry.name in dirnames and not entry.is_dir(follow_symlinks=False):
+                remove_path(entry.path)
+
+        for filename in filenames:
+            source_file = os.path.join(dirpath, filename)
+            target_file = os.path.join(target_dir, filename)
+            if os.path.isdir(target_file) and not os.path.islink(target_file):
+                shutil.rmtree(target_file)
+
+            if is_unchanged(os.stat(source_file), source_file, target_file, checksum):
+                stats["unchanged"] += 1
+                continue
+
+            copy_file(source_file, target_file, link)
+            stats["copied"] += 1
+
+    return stats
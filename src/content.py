@@ -0,0 +1,520 @@
+#!/usr/bin/python3
+
+"""
+This module provides the content index of a website and the lazy content dictionary built on it.
+
+The `ContentIndex` walks the whole content folder with `os.scandir`, including its subfolders,
+and records the path, size, modification time and slug of every file without reading it. The
+index is stored in the cache folder, so every scan also knows which files have been added,
+changed or removed since the last run.
+
+Content files can start with a front matter block with metadata of the page. The block is
+enclosed by lines of three dashes and contains one `key: value` (or `key = value`) pair per line:
+
+    ---
+    template: article.html
+    date: 2024-08-02
+    tags: [python, hooks]
+    ---
+    # The title
+
+The header of a file, its metadata together with its title and excerpt, is read without reading
+the rest of the file and stored in the index with the size and modification time of the file.
+Listing pages, sorting them by date or building indexes doesn't need to read their bodies.
+
+The `LazyContent` dictionary holds the content entries of the pages. It knows all file names
+from the start, but a file is only read and parsed when its entry is accessed for the first
+time. Listing the pages or checking if a page exists never touches the files.
+
+Usage:
+    index = ContentIndex("content", ".lste-cache/content.json")
+    index.scan()
+    header = index.get_header("index.md") # reads the front matter, title and excerpt only
+    content = LazyContent(index.get_pages(), load_entry)
+    print(list(content))       # no file is read
+    print(content["index.md"]) # reads and parses index.md
+"""
+
+import os
+import json
+import src.helpers as helpers
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+FRONT_MATTER_START = "---"
+FRONT_MATTER_END = ("---", "...")
+
+
+def parse_value(value: str) -> Any:
+    """
+    Converts a value of the front matter: quotes are removed, `yes`, `true`, `no` and `false`
+    become booleans and `[a, b]` becomes a list of strings.
+
+    Args:
+        value (str): The raw value.
+
+    Returns:
+        Any: The converted value.
+    """
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item) for item in value[1:-1].split(",") if item.strip()]
+    if value.lower() in ("yes", "true", "on"):
+        return True
+    if value.lower() in ("no", "false", "off"):
+        return False
+    return value
+
+
+def parse_front_matter(lines: List[str]) -> Dict[str, Any]:
+    """
+    Parses the lines of a front matter block. Empty lines and lines starting with `#` are skipped.
+
+    Args:
+        lines (List[str]): The lines between the delimiters.
+
+    Returns:
+        Dict[str, Any]: The metadata.
+    """
+    metadata = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        # the first separator wins, so values may contain colons like times or URLs
+        positions = [position for position in (line.find(":"), line.find("=")) if position > 0]
+        if not positions:
+            continue
+        position = min(positions)
+        metadata[line[:position].strip()] = parse_value(line[position + 1:])
+    return metadata
+
+
+def split_front_matter(text: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Splits the front matter block off the content of a file. A block which is never closed
+    is not a front matter block.
+
+    Args:
+        text (str): The content of the file.
+
+    Returns:
+        Tuple[Dict[str, Any], str]: The metadata and the content after the block.
+    """
+    if not text.startswith(FRONT_MATTER_START):
+        return {}, text
+
+    lines = text.splitlines(keepends=True)
+    if lines[0].rstrip() != FRONT_MATTER_START:
+        return {}, text
+
+    for position in range(1, len(lines)):
+        if lines[position].rstrip() in FRONT_MATTER_END:
+            return parse_front_matter(lines[1:position]), "".join(lines[position + 1:])
+    return {}, text
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """
+    Reads the header of a content file: the front matter, the title and the excerpt. The file
+    is read line by line and only up to the paragraph which follows the first `# ` title.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        Dict[str, Any]: The 'metadata', 'title' and 'excerpt' of the file.
+    """
+    lines = []
+    with open(path) as handle:
+        in_front_matter = False
+        has_heading = False
+        heading_open = False
+        title_line = 0
+        has_paragraph = False
+        for line in handle:
+            lines.append(line)
+            if has_paragraph and not heading_open:
+                # the excerpt ends with the paragraph, one more line completes it
+                break
+
+            stripped = line.rstrip()
+            if len(lines) == 1 and stripped == FRONT_MATTER_START:
+                in_front_matter = True
+                continue
+            elif in_front_matter:
+                in_front_matter = stripped not in FRONT_MATTER_END
+                continue
+
+            # the title of an empty heading is the next line with text
+            if heading_open:
+                heading_open = not stripped
+            elif not has_heading and line.startswith("#"):
+                has_heading = True
+                heading_open = not stripped.lstrip("#").strip()
+
+            if not title_line:
+                if line.startswith("# ") and line.endswith("\n"):
+                    title_line = len(lines)
+            elif line == "\n" and len(lines) > title_line + 1:
+                # an empty line right after the title doesn't end the excerpt
+                has_paragraph = True
+
+    metadata, body = split_front_matter("".join(lines))
+    title, excerpt, start, end = helpers.extract_parts(body)
+    return {"metadata": metadata, "title": title, "excerpt": excerpt}
+
+
+class ContentIndex:
+    """
+    Records all files of the content folder and its subfolders.
+
+    Attributes:
+        content_path (str): The content folder.
+        path (str): The path of the stored index.
+        files (Dict[str, Dict[str, Any]]): The 'size', 'mtime', 'slug' and, once it has been
+            read, the 'header' of every file by its path relative to the content folder.
+        changed (Set[str]): The files which have been added or changed since the last scan.
+        removed (Set[str]): The files which have been removed since the last scan.
+        modified (bool): True if the index needs to be written to disk.
+
+    Methods:
+        scan() -> Dict[str, Dict[str, Any]]:
+            Walks the content folder and updates the index.
+        get_pages(recursive: bool = False) -> List[str]:
+            Returns the files which become pages.
+        get_path(file: str) -> str:
+            Returns the full path of a file.
+        get_header(file: str) -> Dict[str, Any]:
+            Returns the metadata, title and excerpt of a file, from the index if possible.
+        set_header(file: str, header: Dict[str, Any]) -> None:
+            Stores the metadata, title and excerpt of a file which has been read completely.
+        read(file: str) -> Tuple[Dict[str, Any], str]:
+            Reads a file and splits its front matter off.
+        load() -> bool:
+            Loads the index of the last scan from disk.
+        save() -> None:
+            Writes the index to disk if it changed.
+    """
+    version = 2
+
+    def __init__(self, content_path: str, path: str) -> None:
+        """
+        Initializes an empty index.
+
+        Parameters:
+            content_path (str): The content folder.
+            path (str): The path of the stored index.
+
+        Returns:
+            None
+        """
+        self.content_path = content_path
+        self.path = path
+        self.files = {}
+        self.changed = set()
+        self.removed = set()
+        self.modified = False
+
+    def scan(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Walks the content folder and its subfolders and updates the index. The cached headers
+        of files which haven't changed are kept.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The files of the content folder.
+        """
+        if not self.files:
+            self.load()
+        previous = self.files
+
+        self.files = {}
+        self.scan_folder(self.content_path, "")
+
+        self.changed = set()
+        for file, entry in self.files.items():
+            previous_entry = previous.get(file)
+            if previous_entry is None or get_stamp(previous_entry) != get_stamp(entry):
+                self.changed.add(file)
+            elif "header" in previous_entry:
+                entry["header"] = previous_entry["header"]
+        self.removed = set(previous) - set(self.files)
+        if self.changed or self.removed:
+            self.modified = True
+
+        return self.files
+
+    def scan_folder(self, folder: str, prefix: str) -> None:
+        """
+        Adds the files of a folder and its subfolders to the index.
+
+        Parameters:
+            folder (str): The folder.
+            prefix (str): The path of the folder relative to the content folder.
+
+        Returns:
+            None
+        """
+        try:
+            entries = sorted(os.scandir(folder), key=lambda entry: entry.name)
+        except OSError:
+            return
+
+        for entry in entries:
+            file = prefix + entry.name
+            if entry.is_dir():
+                self.scan_folder(entry.path, file + "/")
+                continue
+
+            stat = entry.stat()
+            self.files[file] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "slug": os.path.splitext(file)[0],
+            }
+
+    def get_pages(self, recursive: bool = False) -> List[str]:
+        """
+        Returns the files which become pages: all files of the content folder and, if
+        `recursive` is set, of its subfolders as well.
+
+        Parameters:
+            recursive (bool): Include the files of the subfolders.
+
+        Returns:
+            List[str]: The paths of the files relative to the content folder.
+        """
+        if recursive:
+            return list(self.files)
+        return [file for file in self.files if "/" not in file]
+
+    def get_path(self, file: str) -> str:
+        """
+        Returns the full path of a file.
+
+        Parameters:
+            file (str): The path of the file relative to the content folder.
+
+        Returns:
+            str: The full path.
+        """
+        return os.path.join(self.content_path, file)
+
+    def get_header(self, file: str) -> Dict[str, Any]:
+        """
+        Returns the metadata, title and excerpt of a file. They are read from the index if the
+        file didn't change, otherwise only the header of the file is read.
+
+        Parameters:
+            file (str): The path of the file relative to the content folder.
+
+        Returns:
+            Dict[str, Any]: The 'metadata', 'title' and 'excerpt' of the file.
+        """
+        entry = self.files.get(file)
+        if entry is not None and "header" in entry:
+            return entry["header"]
+
+        header = read_header(self.get_path(file))
+        if entry is not None:
+            entry["header"] = header
+            self.modified = True
+        return header
+
+    def set_header(self, file: str, header: Dict[str, Any]) -> None:
+        """
+        Stores the metadata, title and excerpt of a file which has been read completely, so
+        the next run doesn't need to read its header.
+
+        Parameters:
+            file (str): The path of the file relative to the content folder.
+            header (Dict[str, Any]): The 'metadata', 'title' and 'excerpt' of the file.
+
+        Returns:
+            None
+        """
+        entry = self.files.get(file)
+        if entry is not None and entry.get("header") != header:
+            entry["header"] = header
+            self.modified = True
+
+    def read(self, file: str) -> Tuple[Dict[str, Any], str]:
+        """
+        Reads a file and splits its front matter off.
+
+        Parameters:
+            file (str): The path of the file relative to the content folder.
+
+        Returns:
+            Tuple[Dict[str, Any], str]: The metadata and the content of the file.
+        """
+        with open(self.get_path(file)) as handle:
+            return split_front_matter(handle.read())
+
+    def load(self) -> bool:
+        """
+        Loads the index of the last scan from disk.
+
+        Returns:
+            bool: True if the index has been loaded.
+        """
+        self.files = {}
+        try:
+            with open(self.path) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return False
+
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            return False
+
+        self.files = data.get("files", {})
+        return True
+
+    def save(self) -> None:
+        """
+        Writes the index to disk if it changed, through a temporary file.
+
+        Returns:
+            None
+        """
+        if not self.modified:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        data = {"version": self.version, "files": self.files}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump(data, handle, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+        self.modified = False
+
+
+def get_stamp(entry: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Returns the size and modification time of an index entry.
+
+    Args:
+        entry (Dict[str, Any]): The index entry.
+
+    Returns:
+        Tuple[int, int]: The size and the modification time in nanoseconds.
+    """
+    return entry.get("size"), entry.get("mtime")
+
+
+class LazyContent(MutableMapping):
+    """
+    A dictionary of content entries which are loaded on their first access.
+
+    Entries can be set, replaced and deleted like in a regular dictionary, so plugins can add
+    pages which don't exist as files.
+
+    Attributes:
+        entries (Dict[str, Optional[Dict[str, Any]]]): The entries by file name, None if not loaded yet.
+        loader (Callable[[str], Dict[str, Any]]): Creates the entry of a file.
+        assigned (Set[str]): The files whose entries have been set instead of loaded.
+
+    Methods:
+        add(file: str) -> None:
+            Adds a file whose entry is loaded on its first access.
+        is_loaded(file: str) -> bool:
+            Checks if the entry of a file has been loaded.
+        unload(file: str) -> None:
+            Drops the loaded entry of a file, it is loaded again on its next access.
+        copy() -> Dict[str, Dict[str, Any]]:
+            Returns a regular dictionary with all entries loaded.
+    """
+
+    def __init__(self, files: List[str], loader: Callable[[str], Dict[str, Any]]) -> None:
+        """
+        Initializes the dictionary without loading any entry.
+
+        Parameters:
+            files (List[str]): The file names.
+            loader (Callable[[str], Dict[str, Any]]): Creates the entry of a file.
+
+        Returns:
+            None
+        """
+        self.entries = dict.fromkeys(files)
+        self.loader = loader
+        self.assigned = set()
+
+    def __getitem__(self, file: str) -> Dict[str, Any]:
+        entry = self.entries[file]
+        if entry is None:
+            entry = self.entries[file] = self.loader(file)
+        return entry
+
+    def __setitem__(self, file: str, entry: Dict[str, Any]) -> None:
+        self.entries[file] = entry
+        self.assigned.add(file)
+
+    def __delitem__(self, file: str) -> None:
+        del self.entries[file]
+        self.assigned.discard(file)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, file: object) -> bool:
+        return file in self.entries
+
+    def __repr__(self) -> str:
+        return f"LazyContent({list(self.entries)!r})"
+
+    def add(self, file: str) -> None:
+        """
+        Adds a file whose entry is loaded on its first access.
+
+        Parameters:
+            file (str): The file name.
+
+        Returns:
+            None
+        """
+        self.entries.setdefault(file, None)
+
+    def is_loaded(self, file: str) -> bool:
+        """
+        Checks if the entry of a file has been loaded.
+
+        Parameters:
+            file (str): The file name.
+
+        Returns:
+            bool: True if the entry has been loaded or set.
+        """
+        return self.entries.get(file) is not None
+
+    def unload(self, file: str) -> None:
+        """
+        Drops the loaded entry of a file to free its memory, it is loaded again on its next
+        access. Changes made to the entry are lost.
+
+        Parameters:
+            file (str): The file name.
+
+        Returns:
+            None
+        """
+        if file in self.entries:
+            self.entries[file] = None
+            self.assigned.discard(file)
+
+    def copy(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns a regular dictionary with all entries loaded.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The entries by file name.
+        """
+        return {file: self[file] for file in self.entries}
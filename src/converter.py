@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+
+"""
+This module provides the `MarkdownConverter` class which converts the markdown of content
+files to HTML.
+
+Instead of calling `markdown.markdown()` for every file, which builds a new `Markdown`
+instance and registers all extensions again, the converter keeps one configured instance
+per process and resets it between documents. A cache keyed by the digest of the markdown
+sits in front of it, in memory and optionally on disk, so unchanged markdown is never
+converted twice. Streaming builds turn the memory cache off, so it doesn't grow with the
+size of the website.
+
+Usage:
+    converter = MarkdownConverter(["fenced_code", "tables"], cache_path)
+    html = converter.convert("# Hello")
+"""
+
+import os
+import hashlib
+import markdown
+from typing import Iterable, List, Optional, Set
+
+
+class MarkdownConverter:
+    """
+    Converts markdown to HTML with one reused `Markdown` instance per process and a cache.
+
+    Attributes:
+        extensions (List[str]): The markdown extensions to use.
+        cache_path (Optional[str]): The directory of the disk cache. None disables the disk cache.
+        cache (Dict[str, str]): The converted HTML in memory, keyed by the digest of the markdown.
+        memory (bool): False if converted HTML is only kept in the disk cache.
+
+    Methods:
+        convert(text: str) -> str:
+            Converts markdown to HTML, using the cache if possible.
+        get_key(text: str) -> str:
+            Returns the cache key of a markdown text.
+        store(text: str, html: str) -> None:
+            Stores converted HTML in the cache.
+        prune(texts: Iterable[str]) -> None:
+            Removes all entries from the disk cache which don't belong to the given texts.
+        prune_keys(keys: Set[str]) -> None:
+            Removes all entries from the disk cache which don't have one of the given keys.
+    """
+
+    def __init__(self, extensions: List[str], cache_path: Optional[str] = None, memory: bool = True) -> None:
+        """
+        Initializes the converter. The `Markdown` instance is created on first use.
+
+        Parameters:
+            extensions (List[str]): The markdown extensions to use.
+            cache_path (Optional[str]): The directory of the disk cache.
+            memory (bool): False if converted HTML is only kept in the disk cache.
+
+        Returns:
+            None
+        """
+        self.extensions = extensions
+        self.cache_path = cache_path
+        self.cache = {}
+        self.memory = memory
+        self._instance = None
+        self._pid = None
+        self._salt = f"{markdown.__version__}\0{','.join(extensions)}\0".encode("utf-8")
+
+    def get_instance(self) -> markdown.Markdown:
+        """
+        Returns the `Markdown` instance of the current process. Worker processes which were
+        forked from the main process create their own instance.
+
+        Returns:
+            markdown.Markdown: The configured instance.
+        """
+        if self._instance is None or self._pid != os.getpid():
+            self._instance = markdown.Markdown(extensions=self.extensions)
+            self._pid = os.getpid()
+        return self._instance
+
+    def get_key(self, text: str) -> str:
+        """
+        Returns the cache key of a markdown text. The key also covers the markdown version
+        and the extensions, so a changed configuration never serves outdated HTML.
+
+        Parameters:
+            text (str): The markdown text.
+
+        Returns:
+            str: The cache key.
+        """
+        return hashlib.sha256(self._salt + text.encode("utf-8")).hexdigest()
+
+    def convert(self, text: str) -> str:
+        """
+        Converts markdown to HTML. The HTML is taken from the cache if the same markdown
+        has been converted before.
+
+        Parameters:
+            text (str): The markdown text.
+
+        Returns:
+            str: The converted HTML.
+        """
+        key = self.get_key(text)
+        if key in self.cache:
+            return self.cache[key]
+
+        # check the disk cache
+        cache_file = self._get_cache_file(key)
+        if cache_file and os.path.isfile(cache_file):
+            with open(cache_file) as handle:
+                html = handle.read()
+            if self.memory:
+                self.cache[key] = html
+            return html
+
+        instance = self.get_instance()
+        html = instance.reset().convert(text)
+        if self.memory:
+            self.cache[key] = html
+        return html
+
+    def store(self, text: str, html: str) -> None:
+        """
+        Stores converted HTML in the memory and the disk cache. This is used to keep the
+        results of worker processes in the main process.
+
+        Parameters:
+            text (str): The markdown text.
+            html (str): The converted HTML.
+
+        Returns:
+            None
+        """
+        key = self.get_key(text)
+        if self.memory:
+            self.cache[key] = html
+
+        cache_file = self._get_cache_file(key)
+        if cache_file and not os.path.isfile(cache_file):
+            os.makedirs(self.cache_path, exist_ok=True)
+            temp_file = f"{cache_file}.tmp"
+            with open(temp_file, "w") as handle:
+                handle.write(html)
+            os.replace(temp_file, cache_file)
+
+    def prune(self, texts: Iterable[str]) -> None:
+        """
+        Removes all entries from the memory and the disk cache which don't belong to the
+        given markdown texts.
+
+        Parameters:
+            texts (Iterable[str]): The markdown texts which are still in use.
+
+        Returns:
+            None
+        """
+        self.prune_keys({self.get_key(text) for text in texts})
+
+    def prune_keys(self, keys: Set[str]) -> None:
+        """
+        Removes all entries from the memory and the disk cache which don't have one of the
+        given keys.
+
+        Parameters:
+            keys (Set[str]): The cache keys which are still in use.
+
+        Returns:
+            None
+        """
+        self.cache = {key: html for key, html in self.cache.items() if key in keys}
+
+        if not self.cache_path or not os.path.isdir(self.cache_path):
+            return
+
+        for entry in os.scandir(self.cache_path):
+            if entry.name.replace(".html", "") not in keys:
+                os.remove(entry.path)
+
+    def _get_cache_file(self, key: str) -> Optional[str]:
+        """
+        Returns the path of the disk cache file of a key.
+
+        Parameters:
+            key (str): The cache key.
+
+        Returns:
+            Optional[str]: The path, or None if the disk cache is disabled.
+        """
+        if not self.cache_path:
+            return None
+        return os.path.join(self.cache_path, f"{key}.html")
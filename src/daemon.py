@@ -0,0 +1,295 @@
+#!/usr/bin/python3
+
+"""
+This module provides a build daemon which keeps loaded websites in memory.
+
+Starting LSTE imports its dependencies and the plugins, checks for plugin updates and reads
+every template and content file. The daemon does this once per website and keeps the `Site`
+with its compiled templates, content index, imported plugins and caches in memory. Later
+requests only pick up the changed files, so a repeated build takes milliseconds.
+
+Requests are JSON objects sent as a single line over a Unix socket, each answered with a
+single line of JSON. Requests are handled one after another:
+
+    {"command": "build", "path": "/path/to/website", "incremental": true}
+    {"command": "render", "path": "/path/to/website", "file": "index.md"}
+    {"command": "ping"}
+    {"command": "shutdown"}
+
+Every answer contains `ok` and either `error` or the result: `output` and `seconds` of a
+build, `html` of a rendered page. Requests without a `path`, or a render request without a
+`file`, are answered with an error. A changed `lste.conf` loads the website from scratch.
+
+Usage:
+    daemon = BuildDaemon(get_socket_path())
+    daemon.run()
+
+    answer = send_request(get_socket_path(), {"command": "build", "path": "/path/to/website"})
+"""
+
+import io
+import os
+import json
+import time
+import socket
+import contextlib
+import socketserver
+from typing import Any, Dict, Optional, Tuple
+
+from src.site import Site
+
+# the fields the commands need besides `command`
+REQUIRED_FIELDS = {
+    "build": ["path"],
+    "render": ["path", "file"],
+}
+
+
+def get_socket_path() -> str:
+    """
+    Returns the default path of the socket, in the runtime folder of the user if there is one.
+
+    Returns:
+        str: The path of the socket.
+    """
+    runtime_path = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_path and os.path.isdir(runtime_path):
+        return os.path.join(runtime_path, "lste.sock")
+    return os.path.join("/tmp", f"lste-{os.getuid()}.sock")
+
+
+def send_request(socket_path: str, request: Dict[str, Any], timeout: float = None) -> Dict[str, Any]:
+    """
+    Sends a request to a running daemon and returns its answer.
+
+    Args:
+        socket_path (str): The path of the socket of the daemon.
+        request (Dict[str, Any]): The request.
+        timeout (float, optional): The seconds to wait for the answer.
+
+    Returns:
+        Dict[str, Any]: The answer.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as handle:
+            line = handle.readline()
+    if not line:
+        raise ConnectionError("the daemon closed the connection")
+    return json.loads(line)
+
+
+def get_config_stamp(base_path: str) -> Optional[Tuple[int, int]]:
+    """
+    Returns the size and modification time of the `lste.conf` of a website.
+
+    Args:
+        base_path (str): The base directory of the website.
+
+    Returns:
+        Optional[Tuple[int, int]]: The size and the modification time, or None if there is no config.
+    """
+    try:
+        stat = os.stat(os.path.join(base_path, "lste.conf"))
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Reads one request from a connection and writes the answer of the daemon.
+    """
+
+    def handle(self) -> None:
+        """
+        Handles a single request.
+
+        Returns:
+            None
+        """
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            answer = self.server.handle_request_data(request)
+        except Exception as error:
+            answer = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        self.wfile.write(json.dumps(answer).encode("utf-8") + b"\n")
+
+
+class BuildDaemon(socketserver.UnixStreamServer):
+    """
+    Serves build and render requests for any number of websites over a Unix socket.
+
+    Attributes:
+        socket_path (str): The path of the socket.
+        sites (Dict[str, Site]): The loaded websites by their base directory.
+        stamps (Dict[str, Tuple[int, int]]): The stamps of the `lste.conf` the websites were loaded with.
+        running (bool): False once a shutdown has been requested.
+
+    Methods:
+        handle_request_data(request: Dict[str, Any]) -> Dict[str, Any]:
+            Runs a request and returns its answer.
+        get_site(request: Dict[str, Any]) -> Site:
+            Returns the loaded website of a request, loading it if needed.
+        build(request: Dict[str, Any]) -> Dict[str, Any]:
+            Renders and writes a website.
+        render(request: Dict[str, Any]) -> Dict[str, Any]:
+            Renders a single page to a string.
+        run() -> None:
+            Serves requests until a shutdown is requested.
+    """
+
+    def __init__(self, socket_path: str) -> None:
+        """
+        Creates the socket, only the current user may connect to it. A socket left behind
+        by a daemon which isn't running anymore is replaced.
+
+        Parameters:
+            socket_path (str): The path of the socket.
+
+        Returns:
+            None
+        """
+        self.socket_path = socket_path
+        self.sites = {}
+        self.stamps = {}
+        self.running = True
+
+        if os.path.exists(socket_path):
+            try:
+                send_request(socket_path, {"command": "ping"}, timeout=1)
+            except OSError:
+                os.remove(socket_path)
+            else:
+                raise OSError(f"a daemon is already running on {socket_path}")
+
+        umask = os.umask(0o077)
+        try:
+            super().__init__(socket_path, RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def handle_request_data(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Runs a request and returns its answer.
+
+        Parameters:
+            request (Dict[str, Any]): The request.
+
+        Returns:
+            Dict[str, Any]: The answer.
+        """
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "the request must be a JSON object"}
+
+        command = request.get("command")
+        missing = [
+            field for field in REQUIRED_FIELDS.get(command, [])
+            if not isinstance(request.get(field), str) or not request[field]
+        ]
+        if missing:
+            return {"ok": False, "error": f"{command} needs: {', '.join(missing)}"}
+
+        if command == "ping":
+            return {"ok": True, "sites": sorted(self.sites)}
+        if command == "shutdown":
+            self.running = False
+            return {"ok": True}
+        if command == "build":
+            return self.build(request)
+        if command == "render":
+            return self.render(request)
+        return {"ok": False, "error": f"unknown command: {command}"}
+
+    def get_site(self, request: Dict[str, Any]) -> Site:
+        """
+        Returns the loaded website of a request. A website is loaded on its first request and
+        again if its `lste.conf` changed, otherwise only its templates and content are
+        refreshed, which only reads the changed files.
+
+        Parameters:
+            request (Dict[str, Any]): The request with the `path` of the website.
+
+        Returns:
+            Site: The website.
+        """
+        base_path = os.path.abspath(request["path"])
+        stamp = get_config_stamp(base_path)
+        site = self.sites.get(base_path)
+
+        if site is None or self.stamps.get(base_path) != stamp:
+            site = Site(
+                base_path,
+                offline=request.get("offline", False),
+                reproducible=request.get("reproducible", False),
+            )
+            self.sites.pop(base_path, None)
+            site.load()
+            self.sites[base_path] = site
+            self.stamps[base_path] = stamp
+        else:
+            site.load_templates()
+            site.load_content()
+
+        site.jobs = request.get("jobs", 1)
+        site.reproducible = request.get("reproducible", False)
+        return site
+
+    def build(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Renders and writes a website. With `incremental` only the pages whose inputs changed
+        are rendered.
+
+        Parameters:
+            request (Dict[str, Any]): The request with the `path` of the website.
+
+        Returns:
+            Dict[str, Any]: The answer with the printed `output` and the `seconds` it took.
+        """
+        started = time.perf_counter()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            site = self.get_site(request)
+            site.incremental = request.get("incremental", False)
+            site.render()
+            site.write()
+        return {"ok": True, "output": output.getvalue(), "seconds": time.perf_counter() - started}
+
+    def render(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Renders a single page of a website without writing anything.
+
+        Parameters:
+            request (Dict[str, Any]): The request with the `path` of the website and the `file`.
+
+        Returns:
+            Dict[str, Any]: The answer with the `html` of the page.
+        """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            site = self.get_site(request)
+            if request["file"] not in site.content:
+                return {"ok": False, "error": f"unknown page: {request['file']}"}
+            html = site.render_to_string(request["file"])
+        return {"ok": True, "html": html}
+
+    def run(self) -> None:
+        """
+        Serves requests until a shutdown is requested, then removes the socket.
+
+        Returns:
+            None
+        """
+        print(f"Waiting for builds on {self.socket_path} ...")
+        try:
+            while self.running:
+                self.handle_request()
+        finally:
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
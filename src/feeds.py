@@ -0,0 +1,460 @@
+#!/usr/bin/python3
+
+"""
+This module writes the feed and the sitemap of a website.
+
+Both are built from the content index and the cached headers of the content files, never from
+the rendered pages, and are streamed to disk element by element with an `XMLGenerator`, so the
+memory they need doesn't grow with the size of the website. Before a file is written, a digest
+of its entries is compared with the digest of the last build and unchanged files are skipped.
+
+The feed is configured in the `[feed]` section of the `lste.conf`:
+
+    [feed]
+    url = https://example.com
+    source = articles
+    format = rss
+    file = feed.xml
+    limit = 20
+
+The sitemap is configured in the `[sitemap]` section. A sitemap holds at most 50,000 URLs,
+larger websites get a sitemap index in `sitemap.xml` which links `sitemap-1.xml`,
+`sitemap-2.xml` and so on:
+
+    [sitemap]
+    url = https://example.com
+    file = sitemap.xml
+
+Usage:
+    feeds = Feeds(".lste-cache/feeds.json")
+    feeds.write(lste, OutputWriter())
+"""
+
+import os
+import json
+import hashlib
+import datetime
+import email.utils
+from xml.sax.saxutils import XMLGenerator
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.pagination import get_value
+
+# the most URLs a single sitemap may contain
+SITEMAP_LIMIT = 50000
+
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+
+
+def get_date(lste, file: str) -> datetime.datetime:
+    """
+    Returns the date of a content file: the `date` of its front matter or file name, or its
+    modification time.
+
+    Args:
+        lste (obj): The LSTE object.
+        file (str): The content file.
+
+    Returns:
+        datetime.datetime: The date in UTC.
+    """
+    value = str(get_value(lste, file, "date"))
+    try:
+        date = datetime.date.fromisoformat(value[:10])
+        return datetime.datetime(date.year, date.month, date.day, tzinfo=datetime.timezone.utc)
+    except ValueError:
+        mtime = lste.content_index.files[file]["mtime"] / 1e9
+        return datetime.datetime.fromtimestamp(int(mtime), datetime.timezone.utc)
+
+
+def get_entries_digest(entries: Iterator[Dict[str, Any]]) -> str:
+    """
+    Returns the digest of the entries of a file without holding them all in memory.
+
+    Args:
+        entries (Iterator[Dict[str, Any]]): The entries.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    hasher = hashlib.sha256()
+    for entry in entries:
+        hasher.update(json.dumps(entry, sort_keys=True, default=str).encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def write_element(generator: XMLGenerator, name: str, text: Optional[str] = None,
+                  attributes: Optional[Dict[str, str]] = None) -> None:
+    """
+    Writes an element with an optional text.
+
+    Args:
+        generator (XMLGenerator): The generator.
+        name (str): The name of the element.
+        text (str, optional): The text of the element.
+        attributes (Dict[str, str], optional): The attributes of the element.
+
+    Returns:
+        None
+    """
+    generator.startElement(name, attributes or {})
+    if text:
+        generator.characters(text)
+    generator.endElement(name)
+
+
+class Feeds:
+    """
+    Writes the feed and the sitemap of a website, if they are configured.
+
+    Attributes:
+        path (str): The path of the stored digests.
+        digests (Dict[str, str]): The digests of the entries of the written files by their
+            path relative to the dist folder.
+
+    Methods:
+        write(lste, writer: OutputWriter) -> None:
+            Writes the feed and the sitemap if they changed.
+        write_feed(lste, writer: OutputWriter, options: Dict[str, str]) -> None:
+            Writes the feed as RSS 2.0 or Atom.
+        write_sitemap(lste, writer: OutputWriter, options: Dict[str, str]) -> None:
+            Writes the sitemap, split into several files if it is too large.
+    """
+    version = 1
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the writer and loads the digests of the last build.
+
+        Parameters:
+            path (str): The path of the stored digests.
+
+        Returns:
+            None
+        """
+        self.path = path
+        self.digests = {}
+        self.load()
+
+    def write(self, lste, writer) -> None:
+        """
+        Writes the feed and the sitemap if they are configured and changed.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            writer (OutputWriter): The writer which counts the written files.
+
+        Returns:
+            None
+        """
+        digests = dict(self.digests)
+        if lste.config_file.has_section("feed"):
+            self.write_feed(lste, writer, dict(lste.config_file.items("feed", raw=True)))
+        if lste.config_file.has_section("sitemap"):
+            self.write_sitemap(lste, writer, dict(lste.config_file.items("sitemap", raw=True)))
+        if digests != self.digests:
+            self.save()
+
+    def write_file(self, lste, writer, name: str, entries: Callable[[], Iterator[Dict[str, Any]]],
+                   write: Callable[[XMLGenerator], None]) -> None:
+        """
+        Writes a file if the digest of its entries changed or if it doesn't exist.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            writer (OutputWriter): The writer which counts the written files.
+            name (str): The path of the file relative to the dist folder.
+            entries (Callable[[], Iterator[Dict[str, Any]]]): Returns the entries of the file.
+            write (Callable[[XMLGenerator], None]): Writes the content of the file.
+
+        Returns:
+            None
+        """
+        path = os.path.join(lste.dist_path, name)
+        entries_digest = get_entries_digest(entries())
+        if self.digests.get(name) == entries_digest and os.path.isfile(path):
+            writer.skip(path)
+            return
+
+        with writer.stream(path) as handle:
+            generator = XMLGenerator(handle, encoding="utf-8", short_empty_elements=True)
+            generator.startDocument()
+            write(generator)
+            generator.endDocument()
+            handle.write(b"\n")
+        self.digests[name] = entries_digest
+
+    def get_base_url(self, lste, options: Dict[str, str]) -> str:
+        """
+        Returns the URL of the website, the `url` of the section or the `home_url` of `[rss]`.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            options (Dict[str, str]): The options of the section.
+
+        Returns:
+            str: The URL without a trailing slash.
+        """
+        url = options.get("url") or lste.config_file.get("rss", "home_url", fallback="")
+        return url.rstrip("/")
+
+    def get_feed_items(self, lste, options: Dict[str, str]) -> List[str]:
+        """
+        Returns the content files of the feed, the newest first.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            options (Dict[str, str]): The options of the `[feed]` section.
+
+        Returns:
+            List[str]: The content files.
+        """
+        source = options.get("source", "").strip("/")
+        prefix = source + "/" if source else ""
+        files = [
+            file for file in lste.content
+            if file.startswith(prefix) and file in lste.content_index.files
+        ]
+        files.sort(reverse=True)
+        files.sort(key=lambda file: get_date(lste, file), reverse=True)
+        return files[:int(options.get("limit", "20"))]
+
+    def iter_feed_entries(self, lste, options: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the channel of the feed and then one entry per item.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            options (Dict[str, str]): The options of the `[feed]` section.
+
+        Returns:
+            Iterator[Dict[str, Any]]: The channel and the items.
+        """
+        base_url = self.get_base_url(lste, options)
+        items = self.get_feed_items(lste, options)
+        yield {
+            "title": options.get("title") or lste.config_file.get("lste", "title", fallback=""),
+            "description": options.get("description") or lste.config_file.get("lste", "description", fallback=""),
+            "language": options.get("language", ""),
+            "author": options.get("author", ""),
+            "link": base_url + "/",
+            "format": options.get("format", "rss"),
+            "updated": get_date(lste, items[0]) if items else None,
+        }
+        for file in items:
+            header = lste.content_index.get_header(file)
+            yield {
+                "title": str(header["metadata"].get("title", header["title"])),
+                "link": f"{base_url}/{file[:-3]}.html" if file.endswith(".md") else f"{base_url}/{file}",
+                "description": header["excerpt"],
+                "date": get_date(lste, file),
+            }
+
+    def write_feed(self, lste, writer, options: Dict[str, str]) -> None:
+        """
+        Writes the feed as RSS 2.0 or, if `format` is `atom`, as Atom.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            writer (OutputWriter): The writer which counts the written files.
+            options (Dict[str, str]): The options of the `[feed]` section.
+
+        Returns:
+            None
+        """
+        def write(generator: XMLGenerator) -> None:
+            entries = self.iter_feed_entries(lste, options)
+            channel = next(entries)
+            if channel["format"] == "atom":
+                self.write_atom(generator, channel, entries)
+            else:
+                self.write_rss(generator, channel, entries)
+
+        self.write_file(
+            lste, writer, options.get("file", "feed.xml"),
+            lambda: self.iter_feed_entries(lste, options), write,
+        )
+
+    def write_rss(self, generator: XMLGenerator, channel: Dict[str, Any],
+                  items: Iterator[Dict[str, Any]]) -> None:
+        """
+        Writes an RSS 2.0 feed.
+
+        Parameters:
+            generator (XMLGenerator): The generator.
+            channel (Dict[str, Any]): The values of the channel.
+            items (Iterator[Dict[str, Any]]): The items.
+
+        Returns:
+            None
+        """
+        generator.startElement("rss", {"version": "2.0"})
+        generator.startElement("channel", {})
+        write_element(generator, "title", channel["title"])
+        write_element(generator, "link", channel["link"])
+        write_element(generator, "description", channel["description"])
+        if channel["language"]:
+            write_element(generator, "language", channel["language"])
+        if channel["updated"]:
+            write_element(generator, "pubDate", email.utils.format_datetime(channel["updated"]))
+        for item in items:
+            generator.startElement("item", {})
+            write_element(generator, "title", item["title"])
+            write_element(generator, "link", item["link"])
+            write_element(generator, "guid", item["link"], {"isPermaLink": "true"})
+            write_element(generator, "pubDate", email.utils.format_datetime(item["date"]))
+            write_element(generator, "description", item["description"])
+            generator.endElement("item")
+        generator.endElement("channel")
+        generator.endElement("rss")
+
+    def write_atom(self, generator: XMLGenerator, channel: Dict[str, Any],
+                   entries: Iterator[Dict[str, Any]]) -> None:
+        """
+        Writes an Atom feed.
+
+        Parameters:
+            generator (XMLGenerator): The generator.
+            channel (Dict[str, Any]): The values of the feed.
+            entries (Iterator[Dict[str, Any]]): The entries.
+
+        Returns:
+            None
+        """
+        updated = channel["updated"] or datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+        generator.startElement("feed", {"xmlns": ATOM_NAMESPACE})
+        write_element(generator, "title", channel["title"])
+        write_element(generator, "subtitle", channel["description"])
+        write_element(generator, "link", None, {"href": channel["link"]})
+        write_element(generator, "id", channel["link"])
+        write_element(generator, "updated", updated.isoformat())
+        if channel["author"]:
+            generator.startElement("author", {})
+            write_element(generator, "name", channel["author"])
+            generator.endElement("author")
+        for entry in entries:
+            generator.startElement("entry", {})
+            write_element(generator, "title", entry["title"])
+            write_element(generator, "link", None, {"href": entry["link"]})
+            write_element(generator, "id", entry["link"])
+            write_element(generator, "updated", entry["date"].isoformat())
+            write_element(generator, "summary", entry["description"])
+            generator.endElement("entry")
+        generator.endElement("feed")
+
+    def iter_sitemap_urls(self, lste, base_url: str, files: List[str]) -> Iterator[Dict[str, str]]:
+        """
+        Yields the URL and, for content files, the date of the last modification of every page.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            base_url (str): The URL of the website.
+            files (List[str]): The content files.
+
+        Returns:
+            Iterator[Dict[str, str]]: The URLs.
+        """
+        for file in files:
+            url = {"loc": f"{base_url}/{file[:-3]}.html" if file.endswith(".md") else f"{base_url}/{file}"}
+            entry = lste.content_index.files.get(file)
+            if entry is not None:
+                modified = datetime.datetime.fromtimestamp(entry["mtime"] // 10 ** 9, datetime.timezone.utc)
+                url["lastmod"] = modified.date().isoformat()
+            yield url
+
+    def write_sitemap(self, lste, writer, options: Dict[str, str]) -> None:
+        """
+        Writes the sitemap. If the website has more pages than a sitemap may contain, the pages
+        are split into numbered sitemaps which are linked by a sitemap index. Numbered sitemaps
+        of earlier builds which are no longer needed are deleted.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            writer (OutputWriter): The writer which counts the written files.
+            options (Dict[str, str]): The options of the `[sitemap]` section.
+
+        Returns:
+            None
+        """
+        base_url = self.get_base_url(lste, options)
+        name = options.get("file", "sitemap.xml")
+        limit = min(int(options.get("max_urls", str(SITEMAP_LIMIT))), SITEMAP_LIMIT)
+        files = sorted(lste.content)
+
+        def write_urls(chunk: List[str]) -> Callable[[XMLGenerator], None]:
+            def write(generator: XMLGenerator) -> None:
+                generator.startElement("urlset", {"xmlns": SITEMAP_NAMESPACE})
+                for url in self.iter_sitemap_urls(lste, base_url, chunk):
+                    generator.startElement("url", {})
+                    for key, value in url.items():
+                        write_element(generator, key, value)
+                    generator.endElement("url")
+                generator.endElement("urlset")
+            return write
+
+        root, extension = os.path.splitext(name)
+        parts = []
+        if len(files) > limit:
+            for start in range(0, len(files), limit):
+                chunk = files[start:start + limit]
+                part = f"{root}-{len(parts) + 1}{extension}"
+                self.write_file(
+                    lste, writer, part,
+                    lambda chunk=chunk: self.iter_sitemap_urls(lste, base_url, chunk),
+                    write_urls(chunk),
+                )
+                parts.append(part)
+
+            def write_index(generator: XMLGenerator) -> None:
+                generator.startElement("sitemapindex", {"xmlns": SITEMAP_NAMESPACE})
+                for part in parts:
+                    generator.startElement("sitemap", {})
+                    write_element(generator, "loc", f"{base_url}/{part}")
+                    generator.endElement("sitemap")
+                generator.endElement("sitemapindex")
+
+            self.write_file(lste, writer, name, lambda: iter([{"parts": parts, "url": base_url}]), write_index)
+        else:
+            self.write_file(
+                lste, writer, name,
+                lambda: self.iter_sitemap_urls(lste, base_url, files),
+                write_urls(files),
+            )
+
+        # numbered sitemaps of earlier builds
+        prefix = f"{root}-"
+        for stale in [part for part in self.digests if part.startswith(prefix) and part not in parts]:
+            writer.delete(os.path.join(lste.dist_path, stale))
+            del self.digests[stale]
+
+    def load(self) -> None:
+        """
+        Loads the digests of the last build from disk.
+
+        Returns:
+            None
+        """
+        self.digests = {}
+        try:
+            with open(self.path) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == self.version:
+            self.digests = data.get("files", {})
+
+    def save(self) -> None:
+        """
+        Writes the digests to disk, through a temporary file.
+
+        Returns:
+            None
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {"version": self.version, "files": self.digests}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump(data, handle, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
@@ -4,6 +4,7 @@
 This script contains several helper functions for processing text content and loading configurations.
 
 The current functions included are:
+- `extract_parts`: Extracts title, excerpt and the position of the title heading in a single pass.
 - `extract_title`: Extracts the first title from the given content.
 - `extract_excerpt`: Extracts the content following the first title up to the first double newline.
 - `load_config`: Loads a configuration file and returns a config parser object.
@@ -11,10 +12,65 @@ The current functions included are:
 Additional helper functions can be added to this file as needed.
 """
 
-import re
 import configparser
 import os
-from typing import Union
+from typing import Tuple, Union
+
+def extract_parts(content: str) -> Tuple[str, str, int, int]:
+    """
+    Extracts the title, the excerpt and the position of the title heading from the given
+    content string in a single pass. The text is only scanned up to the end of the excerpt.
+
+    The title is the text of the first line that starts with one or more hash symbols (#).
+    The excerpt is the content following the first title with a single hash symbol ('# ')
+    up to the first double newline, or the whole content if there is no such title. The
+    body of a page is the content without the title heading, which is
+    `content[:start] + content[end:]`, or just `content[end:]` if the page starts with it.
+
+    Args:
+        content (str): The content string from which to extract the parts.
+
+    Returns:
+        Tuple[str, str, int, int]: The title, the excerpt and the start and end of the title
+        heading. The title is empty and start and end are 0 if no title is found.
+    """
+    # the first heading of any level
+    if content.startswith("#"):
+        heading = 0
+    else:
+        heading = content.find("\n#") + 1
+        if heading == 0:
+            return "", content, 0, 0
+
+    # the text of the heading starts after the hash symbols and any whitespace
+    length = len(content)
+    position = heading
+    while position < length and content[position] == "#":
+        position += 1
+    while position < length and content[position].isspace():
+        position += 1
+    end = content.find("\n", position)
+    if end == -1:
+        end = length
+    title = content[position:end]
+
+    # the excerpt follows the first title with a single hash symbol
+    if content.startswith("# ", heading):
+        first_title = heading
+    else:
+        first_title = content.find("\n# ", heading)
+        if first_title != -1:
+            first_title += 1
+    excerpt = content
+    if first_title != -1:
+        title_end = content.find("\n", first_title)
+        if title_end != -1:
+            excerpt_end = content.find("\n\n", title_end + 1)
+            if excerpt_end == -1:
+                excerpt_end = length
+            excerpt = content[title_end + 1:excerpt_end].strip()
+
+    return title, excerpt, heading, end
 
 def extract_title(content: str) -> str:
     """
@@ -27,20 +83,7 @@ def extract_title(content: str) -> str:
     Returns:
         str: The extracted title, or an empty string if no title is found.
     """
-    # Define the pattern to match the first title
-    title_pattern = r'^(#+)\s*(.*)$'
-    
-    # Find all titles
-    title_matches = re.findall(title_pattern, content, re.MULTILINE)
-    
-    # Initialize title
-    title = ''
-    
-    # If a title is found, extract it
-    if title_matches:
-        title = title_matches[0][1]
-    
-    return title
+    return extract_parts(content)[0]
 
 def extract_excerpt(content: str) -> str:
     """
@@ -53,30 +96,7 @@ def extract_excerpt(content: str) -> str:
     Returns:
         str: The extracted excerpt or the original content if no title is found.
     """
-    # Define the pattern to match the first title and capture content after it up to the first double newline
-    title_pattern = r'^# .*\n'
-    content_pattern = r'((?:.*?(?:\n|$))+?)(?=\n\n|$)'
-    
-    # Find the first title
-    title_match = re.search(title_pattern, content, re.MULTILINE)
-
-    # Exit early if no title is found
-    if not title_match:
-        return content
-
-    # The end index of the title match
-    start_index = title_match.end()
-    
-    # Extract content after the title
-    post_title_content = content[start_index:]
-    
-    # Find the first double newline after the title
-    content_match = re.search(content_pattern, post_title_content, re.MULTILINE | re.DOTALL)
-    
-    if content_match:
-        return content_match.group(1).strip()
-    else:
-        return content
+    return extract_parts(content)[1]
 
 def load_config(file: str) -> Union[configparser.ConfigParser, bool]:
     """
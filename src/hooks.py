@@ -8,6 +8,18 @@ The `Hooks` class supports the registration of hooks with specific names, priori
 and callback functions. Hooks can be executed or applied in order of their priority to 
 perform actions or modify values.
 
+Callbacks are indexed by hook name and every hook keeps a precomputed call plan: the
+callbacks sorted by priority together with the number of arguments they expect. The plan
+is built on the first call and only rebuilt after a new callback has been added, so
+applying a hook doesn't sort or scan anything. Hooks without callbacks return immediately.
+
+Loaders can be registered for a hook to add its callbacks on demand: they run once, right
+before the hook is dispatched for the first time. Plugins use this to be imported lazily.
+While a plugin registers its callbacks, `position` holds the position of the plugin in the
+config, so callbacks with the same priority run in the order of the plugins in the config,
+however late a plugin is imported. Callbacks added outside of a plugin run after those of the
+plugins, in the order they were added.
+
 Classes:
     Hooks: A class that manages hooks with associated callbacks and priorities.
 
@@ -29,7 +41,7 @@ Usage Example:
     hooks.exec("print-hook", "arg1", "arg2")  # Output: Callback with arg1 and arg2
 """
 
-from typing import Callable, Any, Dict, List
+from typing import Callable, Any, Dict, List, Tuple
 
 class Hooks:
     """
@@ -44,18 +56,44 @@ class Hooks:
             - 'name': The name of the hook (str)
             - 'callback': The callback function to be called (Callable[..., Any])
             - 'priority': The priority of the hook (int)
+            - 'num_args': The number of arguments the callback expects besides the value (int)
+            - 'position': The position of the plugin which added the callback (Optional[int])
+            - 'sequence': The number of callbacks added before this one (int)
+        index (Dict[str, List[Dict[str, Any]]]): The hook dictionaries by hook name, in order of registration.
+        plans (Dict[str, List[Tuple[Callable[..., Any], int]]]): The cached call plans by hook name,
+            each a list of callbacks and their number of arguments in order of their priority.
+        loaders (Dict[str, List[Callable[[], Any]]]): The loaders by hook name which haven't run yet.
+        profiler (Optional[Profiler]): If set, the time of every callback is recorded.
+        position (Optional[int]): The position in the config of the plugin which is registering
+            its callbacks, None outside of a plugin.
+        sequence (int): The number of callbacks added so far.
 
     Methods:
         add(name: str, callback: Callable[..., Any], priority: int = 10) -> None:
             Registers a new hook with the specified name, callback, and priority.
 
+        add_loader(name: str, loader: Callable[[], Any]) -> None:
+            Registers a loader which runs before the hook is dispatched for the first time.
+
         apply(hook_name: str, initial_value: Any, *args, **kwargs) -> Any:
             Applies all hooks with the specified name to modify the initial value in order of their priority.
 
         exec(hook_name: str, *args, **kwargs) -> None:
             Executes all hooks with the specified name in order of their priority.
+
+        get_callbacks(hook_name: str) -> List[Callable[..., Any]]:
+            Returns the callbacks registered for the specified name in order of their priority.
+
+        has(hook_name: str) -> bool:
+            Checks if any callback is registered for the specified name.
     """
     hooks: Dict[int, List[Dict[str, Any]]] = {}
+    index: Dict[str, List[Dict[str, Any]]] = {}
+    plans: Dict[str, List[Tuple[Callable[..., Any], int]]] = {}
+    loaders: Dict[str, List[Callable[[], Any]]] = {}
+    profiler = None
+    position = None
+    sequence = 0
 
     def __init__(self):
         """
@@ -64,6 +102,12 @@ class Hooks:
         The dictionary is organized by priority, with each priority containing a list of hook dictionaries.
         """
         self.hooks = {}
+        self.index = {}
+        self.plans = {}
+        self.loaders = {}
+        self.profiler = None
+        self.position = None
+        self.sequence = 0
 
     def add(self, name: str, callback: Callable[..., Any], priority: int = 10) -> None:
         """
@@ -71,6 +115,8 @@ class Hooks:
 
         This method appends a new hook to the list of hooks associated with the given priority.
         Each hook is represented as a dictionary containing its name, callback function, and priority.
+        The number of arguments the callback expects is resolved once here and the cached call
+        plan of the hook is dropped.
 
         Args:
             name (str): The name of the hook.
@@ -83,20 +129,94 @@ class Hooks:
         hook = {
             'name': name,
             'callback': callback,
-            'priority': priority
+            'priority': priority,
+            # Get the number of arguments the callback expects
+            'num_args': callback.__code__.co_argcount - 1,  # Subtract 1 for 'self'
+            'position': self.position,
+            'sequence': self.sequence,
         }
+        self.sequence += 1
         if priority in self.hooks:
             self.hooks[priority].append(hook)
         else:
             self.hooks[priority] = [hook]
 
+        self.index.setdefault(name, []).append(hook)
+        self.plans.pop(name, None)
+
+    def add_loader(self, name: str, loader: Callable[[], Any]) -> None:
+        """
+        Registers a loader which runs once, right before the hook is dispatched for the first
+        time. The loader is expected to add the callbacks of the hook.
+
+        Args:
+            name (str): The name of the hook.
+            loader (Callable[[], Any]): The loader.
+
+        Returns:
+            None
+        """
+        self.loaders.setdefault(name, []).append(loader)
+
+    def run_loaders(self, hook_name: str) -> None:
+        """
+        Runs the pending loaders of a hook.
+
+        Args:
+            hook_name (str): The name of the hook.
+
+        Returns:
+            None
+        """
+        for loader in self.loaders.pop(hook_name, []):
+            loader()
+
+    def get_plan(self, hook_name: str) -> List[Tuple[Callable[..., Any], int]]:
+        """
+        Returns the call plan of a hook, building it if it is not cached yet.
+
+        The plan contains the callbacks and their number of arguments in ascending order of
+        their priority. Callbacks with the same priority run in the order of the plugins which
+        added them in the config, followed by the callbacks added outside of a plugin, each in
+        the order of their registration.
+
+        Args:
+            hook_name (str): The name of the hook.
+
+        Returns:
+            List[Tuple[Callable[..., Any], int]]: The callbacks and their number of arguments.
+        """
+        plan = self.plans.get(hook_name)
+        if plan is None:
+            hooks = sorted(self.index.get(hook_name, []), key=lambda hook: (
+                hook['priority'],
+                hook['position'] is None,
+                hook['position'] or 0,
+                hook['sequence'],
+            ))
+            plan = [(hook['callback'], hook['num_args']) for hook in hooks]
+            self.plans[hook_name] = plan
+        return plan
+
+    def has(self, hook_name: str) -> bool:
+        """
+        Checks if any callback is registered for the specified name.
+
+        Args:
+            hook_name (str): The name of the hook.
+
+        Returns:
+            bool: True if the hook has callbacks or loaders which add them.
+        """
+        return hook_name in self.index or hook_name in self.loaders
+
     def apply(self, hook_name: str, initial_value: Any, *args, **kwargs) -> Any:
         """
         Apply all hooks with the specified name in order of their priority to modify the initial value.
 
-        This method finds all hooks with the given name and calls their callback functions
-        in ascending order of their priority. Each callback function modifies the initial value,
-        and the final modified value is returned.
+        This method calls the callback functions of the cached call plan of the hook in ascending
+        order of their priority. Each callback function modifies the initial value, and the final
+        modified value is returned. Hooks without callbacks return the initial value right away.
 
         Args:
             initial_value (Any): The initial value to be modified by the callbacks.
@@ -107,22 +227,21 @@ class Hooks:
         Returns:
             Any: The final modified value after applying all the callbacks.
         """
-        sorted_priorities = sorted(self.hooks.keys())
-        value = initial_value
+        if hook_name in self.loaders:
+            self.run_loaders(hook_name)
+        if hook_name not in self.index:
+            return initial_value
 
-        for priority in sorted_priorities:
-            for hook in self.hooks[priority]:
-                if hook['name'] == hook_name:
-                    callback = hook['callback']
-                    # Get the number of arguments the callback expects
-                    num_args = callback.__code__.co_argcount - 1  # Subtract 1 for 'self'
-                    # Call the callback with the current value and any additional arguments
-                    if num_args == 1:  # Only one additional argument expected
-                        value = callback(value, *args[:num_args], **kwargs)
-                    elif num_args > 1:  # Multiple additional arguments expected
-                        value = callback(value, *args[:num_args], **kwargs)
-                    else:  # No additional arguments expected
-                        value = callback(value)
+        value = initial_value
+        profiler = self.profiler
+        for callback, num_args in self.get_plan(hook_name):
+            if profiler is not None:
+                value = self._apply_profiled(hook_name, callback, num_args, value, *args, **kwargs)
+            # Call the callback with the current value and any additional arguments
+            elif num_args > 0:
+                value = callback(value, *args[:num_args], **kwargs)
+            else:  # No additional arguments expected
+                value = callback(value)
 
         return value
 
@@ -130,8 +249,8 @@ class Hooks:
         """
         Execute all hooks with the specified name in order of their priority.
 
-        This method finds all hooks with the given name and calls their callback functions
-        in ascending order of their priority, passing any additional arguments to the callbacks.
+        This method calls the callback functions of the cached call plan of the hook in ascending
+        order of their priority, passing any additional arguments to the callbacks.
 
         Args:
             hook_name (str): The name of the hook to execute.
@@ -141,15 +260,49 @@ class Hooks:
         Returns:
             None
         """
-        # Sort hooks by priority
-        sorted_hooks = sorted(self.hooks.keys())
-        for priority in sorted_hooks:
-            for hook in self.hooks[priority]:
-                if hook['name'] == hook_name:
-                    # Check the number of arguments the callback expects
-                    callback = hook['callback']
-                    callback_args = callback.__code__.co_argcount - 1  # Subtract 1 for 'self'
-                    if callback_args == len(args):
-                        callback(*args, **kwargs)
-                    else:
-                        callback(*args[:callback_args], **kwargs)
\ No newline at end of file
+        if hook_name in self.loaders:
+            self.run_loaders(hook_name)
+        if hook_name not in self.index:
+            return
+
+        profiler = self.profiler
+        for callback, num_args in self.get_plan(hook_name):
+            # Pass only as many arguments as the callback expects
+            if profiler is not None:
+                profiler.call(hook_name, callback, *args[:num_args], **kwargs)
+            else:
+                callback(*args[:num_args], **kwargs)
+
+    def _apply_profiled(self, hook_name: str, callback: Callable[..., Any], num_args: int,
+                        value: Any, *args, **kwargs) -> Any:
+        """
+        Calls a callback of `apply` through the profiler.
+
+        Args:
+            hook_name (str): The name of the hook.
+            callback (Callable[..., Any]): The callback.
+            num_args (int): The number of additional arguments the callback expects.
+            value (Any): The current value.
+            *args: Variable length argument list to pass to the callback.
+            **kwargs: Arbitrary keyword arguments to pass to the callback.
+
+        Returns:
+            Any: The modified value.
+        """
+        if num_args > 0:
+            return self.profiler.call(hook_name, callback, value, *args[:num_args], **kwargs)
+        return self.profiler.call(hook_name, callback, value)
+
+    def get_callbacks(self, hook_name: str) -> List[Callable[..., Any]]:
+        """
+        Returns the callbacks registered for the specified name in order of their priority.
+
+        Args:
+            hook_name (str): The name of the hook.
+
+        Returns:
+            List[Callable[..., Any]]: The registered callbacks.
+        """
+        if hook_name in self.loaders:
+            self.run_loaders(hook_name)
+        return [callback for callback, num_args in self.get_plan(hook_name)]
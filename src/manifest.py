@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+
+"""
+This module provides the `Manifest` class which keeps track of the inputs that were used to
+generate every page of a website.
+
+The manifest is a small JSON file stored next to the `dist` folder. For every content file it
+records a digest of all inputs that went into the rendered page (the content itself, the
+resolved template chain, the configuration and the plugin versions) as well as the name of the
+generated output file. Incremental builds compare the current digests with the recorded ones
+and only render and write the pages whose inputs changed. The manifest also lists every file
+the build produced, like the feed and the sitemap, so files which a later build doesn't
+produce anymore are removed.
+
+Usage:
+    - Create an instance of the `Manifest` class with the path of the manifest file.
+    - Call `load` to read a previously saved manifest.
+    - Use `is_current` to check if a page needs to be rendered again.
+    - Call `update` for every written page, set `outputs` and call `save` at the end of the build.
+"""
+
+import os
+import json
+import hashlib
+from typing import Any, List, Tuple
+
+
+def digest(*values: Any) -> str:
+    """
+    Creates a stable sha256 digest out of the given values.
+
+    Strings are hashed as they are, every other value is serialized to JSON with sorted keys
+    so dictionaries with the same content always result in the same digest.
+
+    Args:
+        *values (Any): The values which should be part of the digest.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    hasher = hashlib.sha256()
+    for value in values:
+        if not isinstance(value, str):
+            value = json.dumps(value, sort_keys=True, default=str)
+        hasher.update(value.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class Manifest:
+    """
+    Stores the input digests and output files of all pages of a website.
+
+    Attributes:
+        path (str): The path of the manifest file.
+        pages (Dict[str, Dict[str, str]]): A dictionary where keys are content file names and values
+            are dictionaries containing the 'digest' of the inputs and the generated 'output' file.
+        outputs (List[str]): All files the build produced, relative to the dist folder.
+        loaded (bool): True if the manifest has been loaded from or saved to disk.
+
+    Methods:
+        load() -> bool:
+            Loads the manifest from disk.
+        save() -> None:
+            Writes the manifest to disk.
+        is_current(file: str, page_digest: str, dist_path: str) -> bool:
+            Checks if the recorded digest of a page matches and its output still exists.
+        update(file: str, page_digest: str, output: str) -> None:
+            Records the digest and the output of a page.
+        orphans(files: List[str]) -> List[Tuple[str, str]]:
+            Returns all recorded pages which are not part of the given files anymore.
+        remove(file: str) -> None:
+            Removes a page from the manifest.
+    """
+    version = 2
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes a new, empty manifest.
+
+        Parameters:
+            path (str): The path of the manifest file.
+
+        Returns:
+            None
+        """
+        self.path = path
+        self.pages = {}
+        self.outputs = []
+        self.loaded = False
+
+    def load(self) -> bool:
+        """
+        Loads the manifest from disk. A missing, broken or outdated manifest results in an
+        empty manifest which makes every page look changed.
+
+        Returns:
+            bool: True if the manifest has been loaded.
+        """
+        self.pages = {}
+        self.outputs = []
+        self.loaded = False
+
+        if not os.path.isfile(self.path):
+            return False
+
+        try:
+            with open(self.path) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return False
+
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            return False
+
+        self.pages = data.get("pages", {})
+        self.outputs = data.get("outputs", [])
+        self.loaded = True
+        return True
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk. The file is written to a temporary file first and then
+        moved into place so an interrupted build never leaves a broken manifest behind.
+
+        Returns:
+            None
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        data = {"version": self.version, "pages": self.pages, "outputs": self.outputs}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump(data, handle, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+        self.loaded = True
+
+    def is_current(self, file: str, page_digest: str, dist_path: str) -> bool:
+        """
+        Checks if the recorded digest of a page matches the given digest and if the output
+        of the page still exists.
+
+        Parameters:
+            file (str): The name of the content file.
+            page_digest (str): The digest of the current inputs of the page.
+            dist_path (str): The directory the website is saved to.
+
+        Returns:
+            bool: True if the page does not need to be rendered again.
+        """
+        page = self.pages.get(file)
+        if page is None or page["digest"] != page_digest:
+            return False
+        return os.path.isfile(os.path.join(dist_path, page["output"]))
+
+    def update(self, file: str, page_digest: str, output: str) -> None:
+        """
+        Records the digest and the output of a page.
+
+        Parameters:
+            file (str): The name of the content file.
+            page_digest (str): The digest of the inputs of the page.
+            output (str): The name of the generated file relative to the dist folder.
+
+        Returns:
+            None
+        """
+        self.pages[file] = {"digest": page_digest, "output": output}
+
+    def orphans(self, files: List[str]) -> List[Tuple[str, str]]:
+        """
+        Returns all recorded pages which are not part of the given content files anymore.
+
+        Parameters:
+            files (List[str]): The names of the current content files.
+
+        Returns:
+            List[Tuple[str, str]]: A list of tuples containing the content file name and its output.
+        """
+        files = set(files)
+        return [
+            (file, page["output"])
+            for file, page in self.pages.items()
+            if file not in files
+        ]
+
+    def remove(self, file: str) -> None:
+        """
+        Removes a page from the manifest.
+
+        Parameters:
+            file (str): The name of the content file.
+
+        Returns:
+            None
+        """
+        self.pages.pop(file, None)
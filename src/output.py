@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+
+"""
+This module provides the `OutputWriter` class which writes the generated files of a website.
+
+Files whose content didn't change are not written again, so their modification time stays the
+same and tools like rsync or CDN uploads only see the files which really changed. Changed files
+are written to a temporary file first and then moved into place with `os.replace`, so a reader
+never sees a missing or half-written page.
+
+Large files like feeds can be streamed into place with `stream`, so they never have to be held
+in memory as a whole.
+
+Usage:
+    writer = OutputWriter()
+    writer.write("dist/index.html", "<html>...</html>")
+    with writer.stream("dist/sitemap.xml") as handle:
+        handle.write(b"<urlset>...</urlset>")
+    writer.delete("dist/old.html")
+    print(writer.paths)      # Output: {"dist/index.html", "dist/sitemap.xml"}
+    print(writer.summary())  # Output: "1 written, 0 skipped, 1 deleted"
+"""
+
+import os
+import contextlib
+from typing import BinaryIO, Iterator
+
+
+class OutputWriter:
+    """
+    Writes files atomically and only if their content changed, and counts what it did.
+
+    Attributes:
+        stats (Dict[str, int]): The number of 'written', 'skipped' and 'deleted' files.
+        paths (Set[str]): The paths of the files which have been written or skipped.
+
+    Methods:
+        write(path: str, content: str) -> bool:
+            Writes a file if its content changed.
+        stream(path: str) -> Iterator[BinaryIO]:
+            A context manager which writes a file in pieces.
+        skip(path: str) -> None:
+            Counts a file which didn't need to be written.
+        delete(path: str) -> bool:
+            Deletes a file if it exists.
+        summary() -> str:
+            Returns the counts as a readable line.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the writer with empty counts.
+
+        Returns:
+            None
+        """
+        self.stats = {"written": 0, "skipped": 0, "deleted": 0}
+        self.paths = set()
+
+    def is_unchanged(self, path: str, data: bytes) -> bool:
+        """
+        Checks if a file already has the given content. The size is compared first, so
+        the file is only read if the sizes match.
+
+        Parameters:
+            path (str): The path of the file.
+            data (bytes): The new content.
+
+        Returns:
+            bool: True if the file exists with the same content.
+        """
+        try:
+            if os.path.getsize(path) != len(data):
+                return False
+            with open(path, "rb") as handle:
+                return handle.read() == data
+        except OSError:
+            return False
+
+    def write(self, path: str, content: str) -> bool:
+        """
+        Writes a file if its content changed. The content is written to a temporary file in
+        the same folder first and then moved into place.
+
+        Parameters:
+            path (str): The path of the file.
+            content (str): The new content.
+
+        Returns:
+            bool: True if the file has been written.
+        """
+        data = content.encode("utf-8")
+        self.paths.add(path)
+        if self.is_unchanged(path, data):
+            self.stats["skipped"] += 1
+            return False
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+        try:
+            with open(temp_path, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.stats["written"] += 1
+        return True
+
+    @contextlib.contextmanager
+    def stream(self, path: str) -> Iterator[BinaryIO]:
+        """
+        A context manager which writes a file in pieces. The pieces are written to a temporary
+        file which is moved into place when the context is left without an error. The caller
+        decides if the file changed, see `skip`.
+
+        Parameters:
+            path (str): The path of the file.
+
+        Returns:
+            Iterator[BinaryIO]: The open temporary file.
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+        try:
+            with open(temp_path, "wb") as handle:
+                yield handle
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.paths.add(path)
+        self.stats["written"] += 1
+
+    def skip(self, path: str) -> None:
+        """
+        Counts a file which didn't need to be written.
+
+        Parameters:
+            path (str): The path of the file.
+
+        Returns:
+            None
+        """
+        self.paths.add(path)
+        self.stats["skipped"] += 1
+
+    def delete(self, path: str) -> bool:
+        """
+        Deletes a file if it exists.
+
+        Parameters:
+            path (str): The path of the file.
+
+        Returns:
+            bool: True if the file has been deleted.
+        """
+        self.paths.discard(path)
+        if not os.path.isfile(path):
+            return False
+        os.remove(path)
+        self.stats["deleted"] += 1
+        return True
+
+    def summary(self) -> str:
+        """
+        Returns the counts as a readable line.
+
+        Returns:
+            str: The summary, like "3 written, 10 skipped, 1 deleted".
+        """
+        return (
+            f"{self.stats['written']} written, "
+            f"{self.stats['skipped']} skipped, "
+            f"{self.stats['deleted']} deleted"
+        )
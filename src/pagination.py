@@ -0,0 +1,605 @@
+#!/usr/bin/python3
+
+"""
+This module provides the listing engine of LSTE: paginated lists of content files like the
+articles of a blog.
+
+A listing is configured in the `lste.conf` by a section named `listing`, or `listing:<name>`
+for more than one listing:
+
+    [listing]
+    source = articles
+    sort = date
+    order = desc
+    per_page = 10
+    location = index
+    template = articles-excerpt.html
+    date_format = d.m.Y
+
+Without a `[listing]` section, the `[articles]` section of the articles plugin is read if it
+sets `listing = yes` and the plugin itself isn't configured, with `articles_per_page` as
+`per_page`.
+
+All content files in the `source` folder become items of the listing. They are sorted once by
+a key of their front matter and sliced into pages of `per_page` items. The first page is the
+`location` page, the other pages are generated next to it as `index-2.html`, `index-3.html`
+and so on. On these pages `{{listing}}` renders the items of the page and `{{listing-pages}}`
+the links to all pages.
+
+Every item is rendered into a fragment with the `template`, using the values of its front
+matter together with `title`, `excerpt`, `date`, `slug` and `permalink`. Only the cached
+header of an item is needed for this, never its body. The fragments are cached on disk and
+every listing page has a digest of the fragments on it, so during incremental builds only the
+listing pages whose items changed are rendered again.
+
+Classes:
+    Paginator: Slices a sorted list of items into pages.
+    Listing: A single configured listing.
+    Listings: All listings of a website.
+
+Usage:
+    listings = Listings(".lste-cache/listings.json")
+    listings.load(lste)     # reads the config and adds the listing pages to the content
+    listings.update(lste)   # renders the fragments of all items
+    html = listings.render_items("index.md", lste)
+"""
+
+import os
+import re
+import json
+import datetime
+import posixpath
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.manifest import digest
+from src.variables import substitute
+
+# a date at the start of a file name, like 2024-08-02-my-article.md
+DATE_PREFIX = re.compile(r"^(\d{4}-\d{2}-\d{2})")
+
+# the letters of a date format, like the date_format of the articles plugin
+DATE_FORMAT_LETTERS = {
+    "d": lambda date: f"{date.day:02d}",
+    "j": lambda date: str(date.day),
+    "m": lambda date: f"{date.month:02d}",
+    "n": lambda date: str(date.month),
+    "Y": lambda date: str(date.year),
+    "y": lambda date: f"{date.year % 100:02d}",
+}
+
+
+def get_value(lste, file: str, key: str) -> Any:
+    """
+    Returns a value of the front matter of a content file. Without a `date` in the front
+    matter the date at the start of the file name is used.
+
+    Args:
+        lste (obj): The LSTE object.
+        file (str): The content file.
+        key (str): The key of the value.
+
+    Returns:
+        Any: The value, an empty string if it is not set.
+    """
+    metadata = lste.content_index.get_header(file)["metadata"]
+    if key in metadata:
+        return metadata[key]
+    if key == "date":
+        match = DATE_PREFIX.match(posixpath.basename(file))
+        if match:
+            return match.group(1)
+    return ""
+
+
+class Paginator:
+    """
+    Slices a sorted list of items into pages. Pages are only sliced when they are requested.
+
+    Attributes:
+        items (List[Any]): The sorted items.
+        per_page (int): The number of items per page, 0 puts all items on one page.
+
+    Methods:
+        get_page_count() -> int:
+            Returns the number of pages.
+        get_page(number: int) -> List[Any]:
+            Returns the items of a page.
+    """
+
+    def __init__(self, items: List[Any], per_page: int) -> None:
+        """
+        Initializes the paginator.
+
+        Parameters:
+            items (List[Any]): The sorted items.
+            per_page (int): The number of items per page, 0 puts all items on one page.
+
+        Returns:
+            None
+        """
+        self.items = items
+        self.per_page = per_page
+
+    def get_page_count(self) -> int:
+        """
+        Returns the number of pages. A listing without items still has one page.
+
+        Returns:
+            int: The number of pages.
+        """
+        if self.per_page <= 0 or not self.items:
+            return 1
+        return (len(self.items) + self.per_page - 1) // self.per_page
+
+    def get_page(self, number: int) -> List[Any]:
+        """
+        Returns the items of a page.
+
+        Parameters:
+            number (int): The number of the page, starting with 1.
+
+        Returns:
+            List[Any]: The items of the page.
+        """
+        if self.per_page <= 0:
+            return self.items if number == 1 else []
+        start = (number - 1) * self.per_page
+        return self.items[start:start + self.per_page]
+
+
+class Listing:
+    """
+    A single configured listing.
+
+    Attributes:
+        name (str): The name of the listing, the part after `listing:` of its section.
+        source (str): The folder in the content folder whose files are the items.
+        sort (str): The front matter key the items are sorted by.
+        reverse (bool): True if the items are sorted in descending order.
+        per_page (int): The number of items per page.
+        location (str): The content file of the first page.
+        template (str): The template of the item fragments.
+        date_format (str): The format of the `date` of the items, like `d.m.Y`.
+        items (List[str]): The content files of the items in their sorted order.
+        paginator (Paginator): The pages of the items.
+        pages (Dict[str, int]): The number of every listing page by content file.
+
+    Methods:
+        collect(lste) -> None:
+            Collects and sorts the items.
+        get_page_file(number: int) -> str:
+            Returns the content file of a page.
+        get_item_context(lste, file: str) -> Dict[str, str]:
+            Returns the values of the placeholders of an item fragment.
+    """
+
+    def __init__(self, name: str, options: Dict[str, str]) -> None:
+        """
+        Initializes the listing with the options of its config section.
+
+        Parameters:
+            name (str): The name of the listing.
+            options (Dict[str, str]): The options of the config section.
+
+        Returns:
+            None
+        """
+        self.name = name
+        self.source = options.get("source", "articles").strip("/")
+        self.sort = options.get("sort", "date")
+        self.reverse = options.get("order", "desc").lower() != "asc"
+        self.per_page = int(options.get("per_page", "10"))
+        self.location = options.get("location", "index")
+        if not self.location.endswith(".md"):
+            self.location += ".md"
+        self.template = options.get("template", "listing-item.html")
+        self.date_format = options.get("date_format", "")
+        self.items = []
+        self.paginator = Paginator([], self.per_page)
+        self.pages = {}
+
+    def collect(self, lste) -> None:
+        """
+        Collects the items from the content index and sorts them by their sort key. Only the
+        headers of the items are read.
+
+        Parameters:
+            lste (obj): The LSTE object.
+
+        Returns:
+            None
+        """
+        prefix = self.source + "/"
+        files = [file for file in lste.content_index.files if file.startswith(prefix)]
+
+        # sort by name first, so items with the same key keep a stable order
+        files.sort(reverse=self.reverse)
+        files.sort(key=lambda file: str(self.get_value(lste, file, self.sort)), reverse=self.reverse)
+
+        self.items = files
+        self.paginator = Paginator(files, self.per_page)
+        self.pages = {
+            self.get_page_file(number): number
+            for number in range(1, self.paginator.get_page_count() + 1)
+        }
+
+    def get_page_file(self, number: int) -> str:
+        """
+        Returns the content file of a page: the location for the first page and the location
+        with the number of the page for all others.
+
+        Parameters:
+            number (int): The number of the page.
+
+        Returns:
+            str: The content file.
+        """
+        if number == 1:
+            return self.location
+        return f"{self.location[:-3]}-{number}.md"
+
+    def get_value(self, lste, file: str, key: str) -> Any:
+        """
+        Returns a value of the front matter of an item, see `get_value`.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            file (str): The content file of the item.
+            key (str): The key of the value.
+
+        Returns:
+            Any: The value, an empty string if it is not set.
+        """
+        return get_value(lste, file, key)
+
+    def get_item_context(self, lste, file: str) -> Dict[str, str]:
+        """
+        Returns the values of the placeholders of an item fragment: the front matter and the
+        `title`, `excerpt`, `date`, `slug` and `permalink` of the item.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            file (str): The content file of the item.
+
+        Returns:
+            Dict[str, str]: The values by placeholder name.
+        """
+        header = lste.content_index.get_header(file)
+        context = {}
+        for key, value in header["metadata"].items():
+            if isinstance(value, list):
+                value = ", ".join(str(item) for item in value)
+            context[key] = str(value)
+
+        context["title"] = str(header["metadata"].get("title", header["title"]))
+        context["excerpt"] = lste.hooks.apply("excerpt", header["excerpt"], file, lste)
+        context["date"] = self.format_date(str(self.get_value(lste, file, "date")))
+        context["slug"] = lste.content_index.files[file]["slug"]
+        context["permalink"] = file[:-3] + ".html" if file.endswith(".md") else file
+        return context
+
+    def format_date(self, value: str) -> str:
+        """
+        Formats an ISO date with the `date_format` of the listing. The letters `d`, `j`, `m`,
+        `n`, `Y` and `y` are replaced like in PHP, all other characters are kept.
+
+        Parameters:
+            value (str): The date, like `2024-08-02`.
+
+        Returns:
+            str: The formatted date, or the value itself if it is no ISO date.
+        """
+        if not self.date_format or not value:
+            return value
+        try:
+            date = datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            return value
+        return "".join(
+            DATE_FORMAT_LETTERS[letter](date) if letter in DATE_FORMAT_LETTERS else letter
+            for letter in self.date_format
+        )
+
+
+class Listings:
+    """
+    All listings of a website, with the cached fragments of their items.
+
+    Attributes:
+        path (str): The path of the fragment cache.
+        listings (List[Listing]): The configured listings.
+        pages (Dict[str, Tuple[Listing, int]]): The listing and page number of every listing page.
+        fragments (Dict[str, Dict[str, str]]): The 'digest' and 'html' of every item fragment
+            by listing name and content file.
+        modified (bool): True if the fragment cache needs to be written to disk.
+
+    Methods:
+        load(lste) -> None:
+            Reads the listings from the config and adds their pages to the content.
+        get_sections(lste) -> List[Tuple[str, Dict[str, str]]]:
+            Returns the config sections of the listings, `[articles]` as a fallback.
+        update(lste) -> None:
+            Renders the fragments of all items which changed.
+        get_digest(file: str) -> Optional[str]:
+            Returns the digest of the fragments on a listing page.
+        render_items(file: str, lste) -> str:
+            Returns the fragments of the items on a listing page.
+        render_pages(file: str, lste) -> str:
+            Returns the links to all pages of a listing.
+        save() -> None:
+            Writes the fragment cache to disk.
+    """
+    version = 1
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the listings and loads the fragment cache.
+
+        Parameters:
+            path (str): The path of the fragment cache.
+
+        Returns:
+            None
+        """
+        self.path = path
+        self.listings = []
+        self.pages = {}
+        self.fragments = {}
+        self.modified = False
+        self.load_cache()
+
+    def load(self, lste) -> None:
+        """
+        Reads the listings from the config, collects and sorts their items and adds the
+        listing pages to the content. The items become pages as well. The placeholders
+        `{{listing}}` and `{{listing-pages}}` are registered as template variables.
+
+        Parameters:
+            lste (obj): The LSTE object, after the content has been indexed.
+
+        Returns:
+            None
+        """
+        self.listings = []
+        self.pages = {}
+        for section, options in self.get_sections(lste):
+            listing = Listing(section.partition(":")[2], options)
+            if listing.location not in lste.content:
+                print(f"The location {listing.location} of the listing [{section}] doesn't exist.")
+                continue
+            if listing.template not in lste.templates:
+                print(f"The template {listing.template} of the listing [{section}] doesn't exist.")
+                continue
+            listing.collect(lste)
+            self.listings.append(listing)
+
+        for listing in self.listings:
+            # the items are pages, even if the content folder isn't rendered recursively
+            for file in listing.items:
+                if file not in lste.content:
+                    lste.content.add(file)
+
+            location = lste.content[listing.location]
+            location["content"] = self.wrap_placeholders(location["content"], lste)
+            for file, number in listing.pages.items():
+                self.pages[file] = (listing, number)
+                if number > 1:
+                    lste.content[file] = dict(location)
+                lste.content[file]["listing"] = {"name": listing.name, "page": number}
+
+        if self.listings:
+            lste.variables.add("listing", self.render_items)
+            lste.variables.add("listing-pages", self.render_pages)
+
+    def get_sections(self, lste) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Returns the config sections of the listings with their options. Without a `[listing]`
+        section the `[articles]` section of the articles plugin is used if it opts in with
+        `listing = yes` and the plugin isn't configured to paginate the articles itself:
+        `articles_per_page` becomes `per_page`, the items are the files in `articles` and their
+        template is `articles-excerpt.html`.
+
+        Parameters:
+            lste (obj): The LSTE object.
+
+        Returns:
+            List[Tuple[str, Dict[str, str]]]: The name and the options of every section.
+        """
+        config_file = lste.config_file
+        sections = [
+            (section, dict(config_file.items(section, raw=True)))
+            for section in config_file.sections()
+            if section == "listing" or section.startswith("listing:")
+        ]
+        if (
+            sections
+            or not config_file.getboolean("articles", "listing", fallback=False)
+            or config_file.has_option("plugins", "articles")
+        ):
+            return sections
+
+        options = {"source": "articles", "template": "articles-excerpt.html"}
+        for key, value in config_file.items("articles", raw=True):
+            if key != "listing":
+                options["per_page" if key == "articles_per_page" else key] = value
+        return [("articles", options)]
+
+    def wrap_placeholders(self, content: str, lste) -> str:
+        """
+        Puts the placeholders of a listing on their own line into HTML blocks, so the markdown
+        conversion doesn't wrap the rendered listing into a paragraph.
+
+        Parameters:
+            content (str): The markdown of the location page.
+            lste (obj): The LSTE object.
+
+        Returns:
+            str: The markdown with the wrapped placeholders.
+        """
+        blocks = {
+            "listing": ("<div class=\"listing\">", "</div>"),
+            "listing-pages": ("<nav class=\"listing-pages\">", "</nav>"),
+        }
+        lines = content.split("\n")
+        for position, line in enumerate(lines):
+            stripped = line.strip()
+            for name, (start, end) in blocks.items():
+                if stripped == f"{lste.brackets_start}{name}{lste.brackets_end}":
+                    lines[position] = f"\n{start}{stripped}{end}\n"
+        return "\n".join(lines)
+
+    def update(self, lste) -> None:
+        """
+        Renders the fragments of all items. A fragment is only rendered again if the header
+        of its item, the template or the configuration of the listing changed.
+
+        Parameters:
+            lste (obj): The LSTE object.
+
+        Returns:
+            None
+        """
+        fragments = {}
+        for listing in self.listings:
+            template = lste.template_cache.get(listing.template)
+            cache = self.fragments.get(listing.name, {})
+            rendered = fragments[listing.name] = {}
+            for file in listing.items:
+                fragment_digest = digest(
+                    lste.content_index.get_header(file),
+                    template.sources,
+                    listing.location,
+                    listing.date_format,
+                    lste.plugin_versions,
+                )
+                cached = cache.get(file)
+                if cached is None or cached["digest"] != fragment_digest:
+                    context = listing.get_item_context(lste, file)
+                    context["permalink"] = self.get_link(listing.location, context["permalink"])
+                    cached = {
+                        "digest": fragment_digest,
+                        "html": substitute(template.html, context, lste.brackets_start, lste.brackets_end),
+                    }
+                    self.modified = True
+                rendered[file] = cached
+
+        if fragments != self.fragments:
+            self.modified = True
+        self.fragments = fragments
+
+    def get_link(self, page_file: str, target: str) -> str:
+        """
+        Returns the link from a page to another output file.
+
+        Parameters:
+            page_file (str): The content file of the page.
+            target (str): The output file relative to the dist folder.
+
+        Returns:
+            str: The relative link.
+        """
+        return posixpath.relpath(target, posixpath.dirname(page_file) or ".")
+
+    def get_digest(self, file: str) -> Optional[str]:
+        """
+        Returns the digest of the fragments on a listing page and the number of pages.
+
+        Parameters:
+            file (str): The content file.
+
+        Returns:
+            Optional[str]: The digest, None if the file is no listing page.
+        """
+        if file not in self.pages:
+            return None
+        listing, number = self.pages[file]
+        fragments = self.fragments.get(listing.name, {})
+        return digest(
+            [fragments[item]["digest"] for item in listing.paginator.get_page(number)],
+            listing.paginator.get_page_count(),
+        )
+
+    def render_items(self, file: str, lste) -> str:
+        """
+        Returns the fragments of the items on a listing page.
+
+        Parameters:
+            file (str): The content file of the page.
+            lste (obj): The LSTE object.
+
+        Returns:
+            str: The HTML of the items.
+        """
+        if file not in self.pages:
+            return ""
+        listing, number = self.pages[file]
+        fragments = self.fragments.get(listing.name, {})
+        return "\n".join(fragments[item]["html"] for item in listing.paginator.get_page(number))
+
+    def render_pages(self, file: str, lste) -> str:
+        """
+        Returns the links to the previous, the next and all pages of a listing.
+
+        Parameters:
+            file (str): The content file of the page.
+            lste (obj): The LSTE object.
+
+        Returns:
+            str: The HTML of the links.
+        """
+        if file not in self.pages:
+            return ""
+        listing, number = self.pages[file]
+        page_count = listing.paginator.get_page_count()
+        if page_count == 1:
+            return ""
+
+        def link(target: int, label: str, css_class: str) -> str:
+            href = self.get_link(file, listing.get_page_file(target)[:-3] + ".html")
+            return f"<a class=\"{css_class}\" href=\"{href}\">{label}</a>"
+
+        links = []
+        if number > 1:
+            links.append(link(number - 1, "&laquo;", "previous"))
+        for target in range(1, page_count + 1):
+            if target == number:
+                links.append(f"<span class=\"current\">{target}</span>")
+            else:
+                links.append(link(target, str(target), "page"))
+        if number < page_count:
+            links.append(link(number + 1, "&raquo;", "next"))
+        return " ".join(links)
+
+    def load_cache(self) -> None:
+        """
+        Loads the fragment cache from disk.
+
+        Returns:
+            None
+        """
+        self.fragments = {}
+        try:
+            with open(self.path) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == self.version:
+            self.fragments = data.get("fragments", {})
+
+    def save(self) -> None:
+        """
+        Writes the fragment cache to disk if it changed.
+
+        Returns:
+            None
+        """
+        if not self.modified:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {"version": self.version, "fragments": self.fragments}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump(data, handle, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+        self.modified = False
@@ -13,14 +13,90 @@ Usage:
     - Create an instance of the `Plugins` class with a `ConfigParser` object.
     - Call the `init_plugins` method to load and initialize plugins.
     - Call the `load_plugins` method to download and update plugins.
+
+Plugins are imported lazily: the plugin manifest in `~/.local/share/lste/plugins.manifest.json`
+lists the hooks every plugin registers, and a plugin is only imported on the first dispatch of
+one of them. The manifest entry of a plugin is rebuilt whenever its files change.
+
+The release information is fetched from `https://api.github.com`. The environment variable
+`LSTE_GITHUB_API` points LSTE to another server with the same API, like a local stand-in
+for testing.
 """
 
 import os
+import ast
+import json
+import functools
+import py_compile
+import shutil
+import tempfile
+import configparser
+import time
+import threading
 import importlib.util
 import requests
+import requests.adapters
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from packaging import version
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+# the format of the plugin manifest, entries of other formats are rebuilt
+MANIFEST_VERSION = 1
+
+
+def get_registered_hooks(tree: ast.Module) -> Optional[List[str]]:
+    """
+    Reads the names of the hooks a plugin registers from the syntax tree of its module.
+
+    This only succeeds if `register_hooks` consists of nothing but calls like
+    `lste.hooks.add("name", callback)` with a fixed hook name. A plugin which does anything
+    else there, like registering template variables, has to be imported right away.
+
+    Parameters:
+        tree (ast.Module): The syntax tree of the plugin module.
+
+    Returns:
+        Optional[List[str]]: The names of the hooks, or None if they can't be determined.
+    """
+    functions = [
+        node for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "register_hooks"
+    ]
+    if not functions:
+        return []
+    if len(functions) > 1 or isinstance(functions[0], ast.AsyncFunctionDef):
+        return None
+
+    function = functions[0]
+    if function.decorator_list or not function.args.args:
+        return None
+    lste_name = function.args.args[0].arg
+
+    hook_names = []
+    for position, statement in enumerate(function.body):
+        if not isinstance(statement, ast.Expr):
+            return None
+        call = statement.value
+
+        # skip the docstring
+        if position == 0 and isinstance(call, ast.Constant) and isinstance(call.value, str):
+            continue
+
+        if not (
+            isinstance(call, ast.Call)
+            and isinstance(call.func, ast.Attribute) and call.func.attr == "add"
+            and isinstance(call.func.value, ast.Attribute) and call.func.value.attr == "hooks"
+            and isinstance(call.func.value.value, ast.Name) and call.func.value.value.id == lste_name
+            and call.args
+            and isinstance(call.args[0], ast.Constant) and isinstance(call.args[0].value, str)
+        ):
+            return None
+        if call.args[0].value not in hook_names:
+            hook_names.append(call.args[0].value)
+
+    return hook_names
+
 
 class Plugins:
     """
@@ -33,6 +109,16 @@ class Plugins:
         config_file (Optional[ConfigParser]): The configuration file object containing plugin details.
         plugins (Dict[str, Any]): A dictionary where keys are plugin names and values are the plugin modules.
         plugins_folder (str): The path to the folder where plugins are stored.
+        versions (Dict[str, str]): A dictionary where keys are plugin names and values are the installed versions.
+        positions (Dict[str, int]): The positions of the plugins in the config by name.
+        manifest_file (str): The path of the plugin manifest.
+        manifest (Dict[str, Dict[str, Any]]): The version and the registered hooks of every plugin by name.
+        api_url (str): The base URL of the GitHub API, can be set with `LSTE_GITHUB_API`.
+        cache_file (str): The path of the cached release information.
+        cache_ttl (int): The seconds the cached release information is used without asking GitHub.
+        timeout (int): The timeout of every request in seconds.
+        chunk_size (int): The number of bytes downloaded and extracted at once.
+        release_cache (Dict[str, Dict[str, Any]]): The cached release information by repository.
 
     Methods:
         __init__(config_file=None) -> None:
@@ -40,14 +126,55 @@ class Plugins:
         init_plugins(lste) -> Dict[str, Any]:
             Initializes and loads plugins into memory based on the configuration.
             Returns a dictionary where keys are plugin names and values are the loaded plugin modules.
+        import_plugin(lste, plugin_name: str) -> Any:
+            Imports a plugin module and calls its `register_hooks` method.
+        get_stamp(*paths: str) -> List[int]:
+            Returns the sizes and modification times of the files of a plugin.
+        compile_plugin(lste, config_location: str, module_location: str, stamp: List[int]) -> Dict[str, Any]:
+            Creates the manifest entry of a plugin and compiles its bytecode.
+        load_manifest() -> None:
+            Loads the plugin manifest from disk.
+        save_manifest() -> None:
+            Writes the plugin manifest to disk.
+        get_versions() -> Dict[str, str]:
+            Returns the installed versions of the loaded plugins.
         load_plugins(lste) -> None:
             Downloads and updates plugins from their repositories based on the configuration.
-        download_and_install_plugin(repo: str, local_plugin_path: str, latest_release: Dict[str, Any]) -> None:
+            The release information is fetched concurrently and cached on disk.
+        refresh_plugin(lste, plugin_name: str) -> None:
+            Rebuilds the manifest entry of a plugin updated during this run and imports it.
+        get_session(pool_size: int) -> requests.Session:
+            Creates the HTTP session shared by all requests of an update check.
+        get_latest_release(session: requests.Session, repo: str) -> Optional[Dict[str, Any]]:
+            Returns the latest release of a repository, from the cache if possible.
+        load_release_cache() -> None:
+            Loads the cached release information from disk.
+        save_release_cache() -> None:
+            Writes the cached release information to disk.
+        download_and_install_plugin(repo: str, local_plugin_path: str, latest_release: Dict[str, Any], session=None) -> None:
             Downloads and installs or updates the plugin from the given repository using the latest release information.
+        download_file(session, url: str, target) -> None:
+            Streams a download into an open file in chunks.
+        extract_plugin(zip_path: str, target_path: str) -> None:
+            Extracts the top-level folder of a zipball into a folder.
+        verify_plugin(plugin_path: str, plugin_name: str, expected_version: str) -> None:
+            Checks that an extracted release is a plugin of the expected version.
+        swap_plugin(staging_path: str, local_plugin_path: str) -> None:
+            Moves a staged plugin into place.
     """
     config_file = None
     plugins: Dict[str, Any] = {}
+    versions: Dict[str, str] = {}
+    positions: Dict[str, int] = {}
     plugins_folder = os.path.expanduser("~/.local/share/lste/plugins")
+    manifest_file = os.path.expanduser("~/.local/share/lste/plugins.manifest.json")
+    manifest: Dict[str, Dict[str, Any]] = {}
+    api_url = "https://api.github.com"
+    cache_file = os.path.expanduser("~/.local/share/lste/releases.json")
+    cache_ttl = 3600
+    timeout = 10
+    chunk_size = 1024 * 1024
+    release_cache: Dict[str, Dict[str, Any]] = {}
 
     def __init__(self, config_file=None) -> None:
         """
@@ -61,19 +188,29 @@ class Plugins:
         """
         self.config_file = config_file
         self.plugins = {}
+        self.versions = {}
+        self.positions = {}
+        self.manifest = {}
+        self.release_cache = {}
+        self.cache_lock = threading.Lock()
+        self.api_url = os.environ.get("LSTE_GITHUB_API", self.api_url).rstrip("/")
 
     def init_plugins(self, lste) -> Dict[str, Any]:
         """
         Initializes and loads plugins into memory.
 
-        This method reads the plugin configuration from the provided `ConfigParser` object,
-        dynamically loads the plugin modules, and stores them in the `self.plugins` dictionary.
+        This method reads the plugin configuration from the provided `ConfigParser` object and
+        registers the plugins with the hooks. A plugin whose `register_hooks` only adds callbacks
+        to hooks with fixed names is imported lazily, on the first dispatch of one of these hooks.
+        All other plugins are imported right away. The hooks of every plugin are read from the
+        plugin manifest, which is only rebuilt for plugins whose files changed.
 
         Parameters:
             lste (obj): The LSTE object used for plugin registration.
 
         Returns:
             Dict[str, Any]: A dictionary where keys are plugin names and values are the loaded plugin modules.
+            Lazy plugins are added once they have been imported.
         """
         # Check if the configuration file is not present
         if not self.config_file:
@@ -89,14 +226,18 @@ class Plugins:
             return {}
 
         # Define the plugin folder path and ensure it exists
-        plugins_folder = os.path.expanduser("~/.local/share/lste/plugins")
+        plugins_folder = self.plugins_folder
         os.makedirs(plugins_folder, exist_ok=True)
 
         # Initialize the plugins dictionary
         self.plugins.clear()  # Clear existing plugins if any
+        self.load_manifest()
+        manifest_changed = False
 
-        # Iterate over each plugin item and load it
-        for plugin_name, plugin_path in plugin_items:
+        # Iterate over each plugin item and register it, the callbacks of the plugins run in
+        # the order of the config however late a plugin is imported
+        for position, (plugin_name, plugin_path) in enumerate(plugin_items):
+            self.positions[plugin_name] = position
             plugin_realpath = os.path.join(plugins_folder, plugin_name)
             plugin_file_realpath = os.path.join(plugin_realpath, f"{plugin_name}.py")
 
@@ -105,21 +246,162 @@ class Plugins:
             if not os.path.isfile(plugin_config_location):
                 continue
 
-            # Load the plugin module
-            plugin_spec = importlib.util.spec_from_file_location(plugin_name, plugin_file_realpath)
-            plugin = importlib.util.module_from_spec(plugin_spec)
-            plugin_spec.loader.exec_module(plugin)
+            # Rebuild the manifest entry if the plugin changed
+            stamp = self.get_stamp(plugin_config_location, plugin_file_realpath)
+            entry = self.manifest.get(plugin_name)
+            if entry is None or entry.get("stamp") != stamp:
+                entry = self.compile_plugin(lste, plugin_config_location, plugin_file_realpath, stamp)
+                self.manifest[plugin_name] = entry
+                manifest_changed = True
 
-            # Add the plugin to the self.plugins dictionary
-            self.plugins[plugin_name] = plugin
-            
-            # Call the register_hooks method if it exists
-            if hasattr(plugin, 'register_hooks') and callable(getattr(plugin, 'register_hooks')):
-                plugin.register_hooks(lste)
-                print(f"Using plugin: {plugin_name}")
+            # Remember the installed version of the plugin
+            self.versions[plugin_name] = entry["version"]
+
+            if entry["hooks"] is None:
+                self.import_plugin(lste, plugin_name)
+                continue
+
+            loader = functools.partial(self.import_plugin, lste, plugin_name)
+            for hook_name in entry["hooks"]:
+                lste.hooks.add_loader(hook_name, loader)
+
+        if manifest_changed:
+            self.save_manifest()
 
         return self.plugins
-    
+
+    def import_plugin(self, lste, plugin_name: str) -> Any:
+        """
+        Imports a plugin module and calls its `register_hooks` method. Plugins which have
+        already been imported are returned right away.
+
+        Parameters:
+            lste (obj): The LSTE object used for plugin registration.
+            plugin_name (str): The name of the plugin.
+
+        Returns:
+            Any: The plugin module.
+        """
+        if plugin_name in self.plugins:
+            return self.plugins[plugin_name]
+
+        plugin_file_realpath = os.path.join(self.plugins_folder, plugin_name, f"{plugin_name}.py")
+
+        # Load the plugin module, the bytecode compiled by the manifest is used if it is current
+        plugin_spec = importlib.util.spec_from_file_location(plugin_name, plugin_file_realpath)
+        plugin = importlib.util.module_from_spec(plugin_spec)
+        plugin_spec.loader.exec_module(plugin)
+
+        # Add the plugin to the self.plugins dictionary
+        self.plugins[plugin_name] = plugin
+
+        # Call the register_hooks method if it exists
+        if hasattr(plugin, 'register_hooks') and callable(getattr(plugin, 'register_hooks')):
+            position = lste.hooks.position
+            lste.hooks.position = self.positions.get(plugin_name)
+            try:
+                plugin.register_hooks(lste)
+            finally:
+                lste.hooks.position = position
+            print(f"Using plugin: {plugin_name}")
+
+        return plugin
+
+    def get_stamp(self, *paths: str) -> List[int]:
+        """
+        Returns the sizes and modification times of the files of a plugin.
+
+        Parameters:
+            *paths (str): The paths of the files.
+
+        Returns:
+            List[int]: The size and the modification time in nanoseconds of every file.
+        """
+        stamp = []
+        for path in paths:
+            stat = os.stat(path)
+            stamp += [stat.st_size, stat.st_mtime_ns]
+        return stamp
+
+    def compile_plugin(self, lste, config_location: str, module_location: str, stamp: List[int]) -> Dict[str, Any]:
+        """
+        Creates the manifest entry of a plugin: its version and the hooks it registers. The
+        module is compiled to bytecode in its `__pycache__` folder, so importing it later
+        doesn't need to compile it again.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            config_location (str): The path of the `lste.conf` of the plugin.
+            module_location (str): The path of the plugin module.
+            stamp (List[int]): The stamp of the plugin files, see `get_stamp`.
+
+        Returns:
+            Dict[str, Any]: The manifest entry. 'hooks' is None if the plugin can't be imported lazily.
+        """
+        plugin_config = lste.helpers.load_config(config_location)
+        entry = {
+            "stamp": stamp,
+            "version": plugin_config.get("lste", "version", fallback=""),
+            "hooks": None,
+        }
+
+        with open(module_location, 'rb') as module_file:
+            source = module_file.read()
+        try:
+            tree = ast.parse(source, module_location)
+        except SyntaxError:
+            # the import reports the error
+            return entry
+        entry["hooks"] = get_registered_hooks(tree)
+
+        try:
+            py_compile.compile(module_location, doraise=True)
+        except (py_compile.PyCompileError, OSError):
+            pass
+
+        return entry
+
+    def load_manifest(self) -> None:
+        """
+        Loads the plugin manifest from disk.
+
+        Returns:
+            None
+        """
+        self.manifest = {}
+        try:
+            with open(self.manifest_file) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            self.manifest = data.get("plugins", {})
+
+    def save_manifest(self) -> None:
+        """
+        Writes the plugin manifest to disk.
+
+        Returns:
+            None
+        """
+        os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+        temp_file = f"{self.manifest_file}.tmp"
+        with open(temp_file, "w") as handle:
+            json.dump({"version": MANIFEST_VERSION, "plugins": self.manifest}, handle, indent=1, sort_keys=True)
+        os.replace(temp_file, self.manifest_file)
+
+    def get_versions(self) -> Dict[str, str]:
+        """
+        Returns the installed versions of the loaded plugins.
+
+        The versions are part of the inputs of every page, so an updated plugin
+        results in a rebuild of the pages during incremental builds.
+
+        Returns:
+            Dict[str, str]: A dictionary where keys are plugin names and values are the versions.
+        """
+        return self.versions
+
     def load_plugins(self, lste) -> None:
         """
         Downloads and updates plugins from their repositories.
@@ -128,12 +410,21 @@ class Plugins:
         latest version available on GitHub. If an update is available, it downloads and installs
         the latest version of the plugin.
 
+        The release information of all plugins is fetched concurrently through one shared session.
+        It is cached on disk: within the cache TTL no request is sent at all, afterwards the cached
+        release is revalidated with its ETag. If GitHub can't be reached the cached release is used.
+        In offline mode no request is sent and only installed plugins are used.
+
         Parameters:
             lste (obj): The LSTE object used for managing plugins and configuration.
 
         Returns:
             None
         """
+        # offline builds never touch the network
+        if getattr(lste, "offline", False):
+            return
+
         # Check if the "plugins" section exists before retrieving its items
         if not self.config_file.has_section("plugins"):
             return {}
@@ -142,76 +433,328 @@ class Plugins:
         plugin_items = self.config_file.items("plugins")
         if not plugin_items:
             return
-        
-        # Parse the config_file to get the list of plugins and their repositories
-        for plugin_name, repo in plugin_items:
-
-            # Check if the plugin is already installed locally
-            local_plugin_path = os.path.join(self.plugins_folder, plugin_name)
-            local_version = None
-            local_version_file = os.path.join(local_plugin_path, "lste.conf")
-
-            if os.path.exists(local_version_file):
-                local_config = lste.helpers.load_config(local_version_file)
-                if 'lste' in local_config and 'version' in local_config['lste']:
-                    local_version = local_config['lste']['version']
-
-            # Step 4: Fetch the latest release version from GitHub
-            github_api_url = f"https://api.github.com/repos/{repo}/releases/latest"
-            response = requests.get(github_api_url)
-            if response.status_code != 200:
-                continue
 
-            response.raise_for_status()
-            latest_release = response.json()
-            remote_version = latest_release['tag_name']
+        self.cache_ttl = self.config_file.getint("updates", "ttl", fallback=self.cache_ttl)
+        self.load_release_cache()
+
+        # Fetch the latest release versions from GitHub concurrently
+        repos = sorted({repo for plugin_name, repo in plugin_items})
+        workers = min(len(repos), 8)
+        with self.get_session(workers) as session:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                releases = dict(zip(repos, executor.map(
+                    lambda repo: self.get_latest_release(session, repo), repos
+                )))
+            self.save_release_cache()
+
+            # Parse the config_file to get the list of plugins and their repositories
+            for plugin_name, repo in plugin_items:
+                latest_release = releases.get(repo)
+                if latest_release is None:
+                    continue
+
+                # Check if the plugin is already installed locally
+                local_plugin_path = os.path.join(self.plugins_folder, plugin_name)
+                local_version = None
+                local_version_file = os.path.join(local_plugin_path, "lste.conf")
+
+                if os.path.exists(local_version_file):
+                    local_config = lste.helpers.load_config(local_version_file)
+                    if 'lste' in local_config and 'version' in local_config['lste']:
+                        local_version = local_config['lste']['version']
+
+                remote_version = latest_release['tag_name']
+
+                # Compare versions and update if necessary
+                if local_version is None or version.parse(remote_version) > version.parse(local_version):
+                    print(f"Updating plugin {plugin_name} to version {remote_version}")
+                    # Download and install/update the plugin, a failed update keeps the installed version
+                    try:
+                        self.download_and_install_plugin(repo, local_plugin_path, latest_release, session)
+                    except (requests.RequestException, zipfile.BadZipFile, ValueError, OSError) as error:
+                        print(f"Couldn't update plugin {plugin_name}: {error}")
+                    else:
+                        self.refresh_plugin(lste, plugin_name)
 
-            # Compare versions and update if necessary
-            if local_version is None or version.parse(remote_version) > version.parse(local_version):
-                print(f"Updating plugin {plugin_name} to version {remote_version}")
-                # Download and install/update the plugin
-                self.download_and_install_plugin(repo, local_plugin_path, latest_release)
+    def refresh_plugin(self, lste, plugin_name: str) -> None:
+        """
+        Rebuilds the manifest entry and the version of a plugin which has been updated during
+        this run and imports it right away. Otherwise a lazy loader registered before the update
+        would import the new files under the hooks and the version of the old ones. A plugin
+        which has already been imported keeps running until the next run.
+
+        Parameters:
+            lste (obj): The LSTE object used for plugin registration.
+            plugin_name (str): The name of the plugin.
 
-    def download_and_install_plugin(self, repo: str, local_plugin_path: str, latest_release: Dict[str, Any]) -> None:
+        Returns:
+            None
+        """
+        if plugin_name in self.plugins:
+            return
+
+        plugin_realpath = os.path.join(self.plugins_folder, plugin_name)
+        plugin_config_location = os.path.join(plugin_realpath, "lste.conf")
+        plugin_file_realpath = os.path.join(plugin_realpath, f"{plugin_name}.py")
+        stamp = self.get_stamp(plugin_config_location, plugin_file_realpath)
+        entry = self.compile_plugin(lste, plugin_config_location, plugin_file_realpath, stamp)
+        self.manifest[plugin_name] = entry
+        self.save_manifest()
+
+        self.versions[plugin_name] = entry["version"]
+        self.import_plugin(lste, plugin_name)
+
+    def get_session(self, pool_size: int) -> requests.Session:
+        """
+        Creates the HTTP session shared by all requests of an update check.
+
+        Parameters:
+            pool_size (int): The number of connections kept open per host.
+
+        Returns:
+            requests.Session: The session.
+        """
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Accept"] = "application/vnd.github+json"
+        return session
+
+    def get_latest_release(self, session: requests.Session, repo: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the latest release of a repository, from the cache if possible.
+
+        Parameters:
+            session (requests.Session): The shared HTTP session.
+            repo (str): The repository name in the format 'owner/repo'.
+
+        Returns:
+            Optional[Dict[str, Any]]: The release with 'tag_name' and 'zipball_url', or None if unknown.
+        """
+        cached = self.release_cache.get(repo)
+        if cached and time.time() - cached["checked"] < self.cache_ttl:
+            return cached["release"]
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        github_api_url = f"{self.api_url}/repos/{repo}/releases/latest"
+        try:
+            response = session.get(github_api_url, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            return cached["release"] if cached else None
+
+        # the cached release is still the latest one
+        if response.status_code == 304 and cached:
+            with self.cache_lock:
+                cached["checked"] = time.time()
+            return cached["release"]
+
+        if response.status_code != 200:
+            return cached["release"] if cached else None
+
+        data = response.json()
+        release = {key: data.get(key) for key in ("tag_name", "zipball_url")}
+        with self.cache_lock:
+            self.release_cache[repo] = {
+                "etag": response.headers.get("ETag", ""),
+                "checked": time.time(),
+                "release": release,
+            }
+        return release
+
+    def load_release_cache(self) -> None:
+        """
+        Loads the cached release information from disk.
+
+        Returns:
+            None
+        """
+        self.release_cache = {}
+        try:
+            with open(self.cache_file) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self.release_cache = data
+
+    def save_release_cache(self) -> None:
+        """
+        Writes the cached release information to disk.
+
+        Returns:
+            None
+        """
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temp_file = f"{self.cache_file}.tmp"
+        with open(temp_file, "w") as handle:
+            json.dump(self.release_cache, handle, indent=1, sort_keys=True)
+        os.replace(temp_file, self.cache_file)
+
+    def download_and_install_plugin(self, repo: str, local_plugin_path: str, latest_release: Dict[str, Any],
+                                    session: Optional[requests.Session] = None) -> None:
         """
         Downloads and installs or updates the plugin from the given repository using the latest release information.
 
+        The zipball is streamed to a temporary file and extracted member by member into a staging
+        folder next to the plugin. Only if the extracted release is a valid plugin of the expected
+        version the staging folder replaces the installed plugin, so a failed update never leaves a
+        half-installed plugin behind.
+
         Parameters:
             repo (str): The repository name in the format 'owner/repo'.
             local_plugin_path (str): The local path where the plugin will be installed.
             latest_release (Dict[str, Any]): The latest release information including the zipball URL.
+            session (requests.Session, optional): The HTTP session to use.
 
         Returns:
             None
+
+        Raises:
+            requests.RequestException: If the download fails.
+            zipfile.BadZipFile: If the download is not a zip file.
+            ValueError: If the release is not a valid plugin.
         """
-        # Implement the method to download and install the plugin from GitHub
-        zip_url = latest_release['zipball_url']
-        response = requests.get(zip_url)
-        response.raise_for_status()
+        plugins_folder = os.path.dirname(local_plugin_path)
+        plugin_name = os.path.basename(local_plugin_path)
+        os.makedirs(plugins_folder, exist_ok=True)
 
-        # Create the plugin directory if it does not exist
-        if not os.path.exists(local_plugin_path):
-            os.makedirs(local_plugin_path)
+        # everything is staged next to the plugin, so the final rename stays on one filesystem
+        zip_handle, zip_path = tempfile.mkstemp(prefix=f".{plugin_name}.", suffix=".zip", dir=plugins_folder)
+        staging_path = tempfile.mkdtemp(prefix=f".{plugin_name}.staging.", dir=plugins_folder)
+        try:
+            with os.fdopen(zip_handle, "wb") as zip_file:
+                self.download_file(session, latest_release['zipball_url'], zip_file)
+            self.extract_plugin(zip_path, staging_path)
+            self.verify_plugin(staging_path, plugin_name, latest_release['tag_name'])
+            self.swap_plugin(staging_path, local_plugin_path)
+        finally:
+            os.remove(zip_path)
+            if os.path.isdir(staging_path):
+                shutil.rmtree(staging_path)
 
-        # Unzip the content to the local plugin path
-        zip_path = os.path.join(local_plugin_path, "latest_release.zip")
-        with open(zip_path, 'wb') as f:
-            f.write(response.content)
+        print(f"Installed plugin {repo} to {local_plugin_path}")
 
-        # Extract the zip file
+    def download_file(self, session: Optional[requests.Session], url: str, target) -> None:
+        """
+        Streams a download into an open file in chunks.
+
+        Parameters:
+            session (requests.Session, optional): The HTTP session to use.
+            url (str): The URL of the file.
+            target (BinaryIO): The file the download is written to.
+
+        Returns:
+            None
+        """
+        with (session or requests).get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                target.write(chunk)
+
+    def extract_plugin(self, zip_path: str, target_path: str) -> None:
+        """
+        Extracts the content of the top-level folder of a zipball into a folder. Every member
+        is copied in chunks, members which would end up outside of the folder are refused.
+
+        Parameters:
+            zip_path (str): The path of the zipball.
+            target_path (str): The folder the plugin is extracted to.
+
+        Returns:
+            None
+        """
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            members = zip_ref.infolist()
+            if not members:
+                raise ValueError("the release is empty")
+
             # Find the top-level directory in the zip file
-            top_level_dir = zip_ref.namelist()[0].split('/')[0]
-            for member in zip_ref.infolist():
-                # Skip the top-level directory itself
-                if member.filename.startswith(top_level_dir):
-                    # Extract everything under the top-level directory
-                    extracted_path = os.path.join(local_plugin_path, os.path.relpath(member.filename, top_level_dir))
-                    if member.is_dir():
-                        os.makedirs(extracted_path, exist_ok=True)
-                    else:
-                        with open(extracted_path, 'wb') as extracted_file:
-                            extracted_file.write(zip_ref.read(member.filename))
+            top_level_dir = members[0].filename.split('/')[0]
+            for member in members:
+                # Skip everything outside of the top-level directory
+                if not member.filename.startswith(top_level_dir + '/'):
+                    continue
+
+                relative_path = os.path.normpath(os.path.relpath(member.filename, top_level_dir))
+                if relative_path == '.':
+                    continue
+                if os.path.isabs(relative_path) or relative_path.split(os.sep)[0] == '..':
+                    raise ValueError(f"the release contains an invalid path: {member.filename}")
+
+                extracted_path = os.path.join(target_path, relative_path)
+                if member.is_dir():
+                    os.makedirs(extracted_path, exist_ok=True)
+                    continue
+
+                os.makedirs(os.path.dirname(extracted_path), exist_ok=True)
+                with zip_ref.open(member) as source, open(extracted_path, 'wb') as extracted_file:
+                    shutil.copyfileobj(source, extracted_file, self.chunk_size)
+
+    def verify_plugin(self, plugin_path: str, plugin_name: str, expected_version: str) -> None:
+        """
+        Checks that an extracted release is a plugin of the expected version: it needs an
+        `lste.conf` with the version of the release and a module which compiles.
 
-        os.remove(zip_path)
-        print(f"Installed plugin {repo} to {local_plugin_path}")
+        Parameters:
+            plugin_path (str): The folder of the extracted plugin.
+            plugin_name (str): The name of the plugin.
+            expected_version (str): The tag name of the release.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the plugin is invalid.
+        """
+        config_location = os.path.join(plugin_path, "lste.conf")
+        if not os.path.isfile(config_location):
+            raise ValueError("the release has no lste.conf")
+
+        plugin_config = configparser.ConfigParser()
+        plugin_config.read(config_location)
+        plugin_version = plugin_config.get("lste", "version", fallback="")
+        try:
+            matches = version.parse(plugin_version) == version.parse(expected_version)
+        except version.InvalidVersion:
+            matches = False
+        if not matches:
+            raise ValueError(f"the release {expected_version} contains version {plugin_version or 'unknown'}")
+
+        # compiling also stores the bytecode, so the first import doesn't need to
+        module_location = os.path.join(plugin_path, f"{plugin_name}.py")
+        if not os.path.isfile(module_location):
+            raise ValueError(f"the release has no {plugin_name}.py")
+        try:
+            py_compile.compile(module_location, doraise=True)
+        except py_compile.PyCompileError as error:
+            raise ValueError(f"{plugin_name}.py doesn't compile: {error.msg}")
+
+    def swap_plugin(self, staging_path: str, local_plugin_path: str) -> None:
+        """
+        Moves a staged plugin into place. The installed plugin is renamed out of the way first
+        and only removed after the staged plugin took its place.
+
+        Parameters:
+            staging_path (str): The folder of the verified plugin.
+            local_plugin_path (str): The folder of the installed plugin.
+
+        Returns:
+            None
+        """
+        if not os.path.exists(local_plugin_path):
+            os.rename(staging_path, local_plugin_path)
+            return
+
+        old_path = f"{staging_path}.old"
+        os.rename(local_plugin_path, old_path)
+        try:
+            os.rename(staging_path, local_plugin_path)
+        except OSError:
+            # put the installed plugin back
+            os.rename(old_path, local_plugin_path)
+            raise
+        shutil.rmtree(old_path)
@@ -0,0 +1,210 @@
+#!/usr/bin/python3
+
+"""
+This module provides the `Profiler` class which measures where the time of a build is spent.
+
+The profiler records the call count, the cumulative and the maximum wall time of every
+callback of every hook, together with the plugin the callback belongs to, and of the core
+phases of a build like loading the templates or converting the markdown. At the end of a
+build it prints a table sorted by the cumulative time and optionally writes the numbers as
+JSON, so runs can be compared with each other.
+
+Hooks which are applied inside worker processes (see `--jobs`) are not recorded, the time
+they take is part of the phase they run in.
+
+Usage:
+    profiler = Profiler()
+    with profiler.phase("load_content"):
+        ...
+    profiler.record("hook", "excerpt", "meta", "excerpt_callback", 0.002)
+    print(profiler.report())
+    profiler.save("profile.json")
+"""
+
+import json
+import time
+import functools
+import contextlib
+from typing import Any, Callable, Dict, Iterator, List
+
+
+def profiled(phase_name: str) -> Callable:
+    """
+    Decorates a method of the LSTE object to be recorded as a phase if profiling is enabled.
+
+    Args:
+        phase_name (str): The name of the phase.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.profiler is None:
+                return method(self, *args, **kwargs)
+            with self.profiler.phase(phase_name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Profiler:
+    """
+    Records the time spent in hooks and build phases.
+
+    Attributes:
+        records (Dict[Tuple[str, str, str, str], List[float]]): The call count, the cumulative
+            and the maximum time by kind, name, plugin and callback.
+
+    Methods:
+        record(kind: str, name: str, plugin: str, callback: str, elapsed: float) -> None:
+            Records a single measurement.
+        phase(name: str) -> Iterator[None]:
+            A context manager which records the time of a build phase.
+        call(hook_name: str, callback: Callable[..., Any], *args, **kwargs) -> Any:
+            Calls a hook callback and records its time.
+        get_rows() -> List[Dict[str, Any]]:
+            Returns all records sorted by their cumulative time.
+        report() -> str:
+            Returns the records as a table.
+        save(path: str) -> None:
+            Writes the records as JSON.
+        reset() -> None:
+            Drops all records.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the profiler with no records.
+
+        Returns:
+            None
+        """
+        self.records = {}
+
+    def record(self, kind: str, name: str, plugin: str, callback: str, elapsed: float) -> None:
+        """
+        Records a single measurement.
+
+        Parameters:
+            kind (str): Either 'hook' or 'phase'.
+            name (str): The name of the hook or phase.
+            plugin (str): The plugin or core module the callback belongs to.
+            callback (str): The name of the callback.
+            elapsed (float): The wall time in seconds.
+
+        Returns:
+            None
+        """
+        key = (kind, name, plugin, callback)
+        record = self.records.get(key)
+        if record is None:
+            self.records[key] = [1, elapsed, elapsed]
+        else:
+            record[0] += 1
+            record[1] += elapsed
+            record[2] = max(record[2], elapsed)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        A context manager which records the time of a build phase.
+
+        Parameters:
+            name (str): The name of the phase.
+
+        Returns:
+            Iterator[None]: The context.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record("phase", name, "lste", "", time.perf_counter() - start)
+
+    def call(self, hook_name: str, callback: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Calls a hook callback and records its time.
+
+        Parameters:
+            hook_name (str): The name of the hook.
+            callback (Callable[..., Any]): The callback.
+            *args: The arguments of the callback.
+            **kwargs: The keyword arguments of the callback.
+
+        Returns:
+            Any: The result of the callback.
+        """
+        start = time.perf_counter()
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            self.record(
+                "hook",
+                hook_name,
+                getattr(callback, "__module__", None) or "",
+                getattr(callback, "__qualname__", repr(callback)),
+                time.perf_counter() - start,
+            )
+
+    def get_rows(self) -> List[Dict[str, Any]]:
+        """
+        Returns all records sorted by their cumulative time, the slowest first.
+
+        Returns:
+            List[Dict[str, Any]]: The records.
+        """
+        rows = []
+        for (kind, name, plugin, callback), (count, total, maximum) in self.records.items():
+            rows.append({
+                "kind": kind,
+                "name": name,
+                "plugin": plugin,
+                "callback": callback,
+                "calls": count,
+                "total": total,
+                "max": maximum,
+            })
+        rows.sort(key=lambda row: row["total"], reverse=True)
+        return rows
+
+    def report(self) -> str:
+        """
+        Returns the records as a table, the slowest first.
+
+        Returns:
+            str: The table.
+        """
+        lines = [
+            f"{'kind':<6} {'name':<28} {'plugin':<20} {'callback':<32} {'calls':>7} {'total ms':>10} {'max ms':>9}"
+        ]
+        for row in self.get_rows():
+            lines.append(
+                f"{row['kind']:<6} {row['name'][:28]:<28} {row['plugin'][:20]:<20} "
+                f"{row['callback'][:32]:<32} {row['calls']:>7} "
+                f"{row['total'] * 1000:>10.2f} {row['max'] * 1000:>9.2f}"
+            )
+        return "\n".join(lines)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the records as JSON.
+
+        Parameters:
+            path (str): The path of the JSON file.
+
+        Returns:
+            None
+        """
+        with open(path, "w") as handle:
+            json.dump(self.get_rows(), handle, indent=1)
+
+    def reset(self) -> None:
+        """
+        Drops all records.
+
+        Returns:
+            None
+        """
+        self.records = {}
@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+
+"""
+This module makes builds of the same inputs produce the same bytes.
+
+Without it, every build stamps the current time into `{{timestamp}}`, so two builds of an
+unchanged website never match and caches, ETags and uploads which skip unchanged files see
+every page as changed. A reproducible build takes the time from `SOURCE_DATE_EPOCH` (see
+https://reproducible-builds.org/specs/source-date-epoch/) or from the content file of each page:
+the `date` of its front matter or its modification time.
+
+The self-check builds two copies of the website in fresh processes, with different hash seeds
+and without caches, and compares both `dist` folders. The `dist` folder of the website itself
+isn't compared, it may hold files which an earlier build left behind.
+
+The primary functions include:
+- `get_source_date`: Returns the time which is stamped into a page.
+- `get_file_date`: Returns the time of a content file.
+- `compare_trees`: Returns the files which differ between two folders.
+- `check_build`: Builds the website twice and returns the files which differ.
+"""
+
+import os
+import sys
+import calendar
+import datetime
+import shutil
+import filecmp
+import tempfile
+import subprocess
+from typing import List
+
+from src.pagination import get_value
+
+# the folders and files of a website which are copied for the self-check
+SOURCES = ["content", "template", "assets", "lste.conf"]
+
+# the command-line interface which builds the copy
+LSTE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lste.py")
+
+
+def get_source_date(lste, file: str) -> int:
+    """
+    Returns the unix timestamp of a page of a reproducible build: `SOURCE_DATE_EPOCH` if it is
+    set, otherwise the time of its content file. A listing page takes the newest time of its
+    location and of the items on it.
+
+    Args:
+        lste (obj): The LSTE object.
+        file (str): The content file of the page.
+
+    Returns:
+        int: The unix timestamp.
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH", "")
+    if epoch.isdigit():
+        return int(epoch)
+
+    if lste.listings and file in lste.listings.pages:
+        listing, number = lste.listings.pages[file]
+        files = [listing.location] + listing.paginator.get_page(number)
+        return max(get_file_date(lste, item) for item in files)
+    return get_file_date(lste, file)
+
+
+def get_file_date(lste, file: str) -> int:
+    """
+    Returns the unix timestamp of a content file: the `date` of its front matter, or of its
+    file name, in UTC, otherwise its modification time. Files which aren't indexed, like pages
+    added by plugins, get 0.
+
+    Args:
+        lste (obj): The LSTE object.
+        file (str): The content file.
+
+    Returns:
+        int: The unix timestamp.
+    """
+    entry = lste.content_index.files.get(file)
+    if entry is None:
+        return 0
+
+    value = str(get_value(lste, file, "date"))
+    try:
+        date = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            date = datetime.datetime.fromisoformat(value[:10])
+        except ValueError:
+            return entry["mtime"] // 10 ** 9
+    if date.tzinfo is not None:
+        return int(date.timestamp())
+    return calendar.timegm(date.timetuple())
+
+
+def compare_trees(left: str, right: str) -> List[str]:
+    """
+    Returns the files which only exist in one of the folders or whose bytes differ.
+
+    Args:
+        left (str): The first folder.
+        right (str): The second folder.
+
+    Returns:
+        List[str]: The sorted paths relative to the folders.
+    """
+    differences = []
+    comparison = filecmp.dircmp(left, right)
+    stack = [("", comparison)]
+    while stack:
+        prefix, comparison = stack.pop()
+        differences += [prefix + name for name in comparison.left_only + comparison.right_only]
+        differences += [prefix + name for name in comparison.funny_files]
+        _, mismatch, errors = filecmp.cmpfiles(
+            comparison.left, comparison.right, comparison.common_files, shallow=False
+        )
+        differences += [prefix + name for name in mismatch + errors]
+        for name, subdirectory in comparison.subdirs.items():
+            stack.append((f"{prefix}{name}/", subdirectory))
+    return sorted(differences)
+
+
+def check_build(lste) -> List[str]:
+    """
+    Copies the sources of the website to two temporary folders, builds each in a new process
+    with another hash seed and without caches, and compares both results.
+
+    Args:
+        lste (obj): The LSTE object.
+
+    Raises:
+        subprocess.CalledProcessError: If a build fails.
+
+    Returns:
+        List[str]: The files which differ, empty if the build is reproducible.
+    """
+    with tempfile.TemporaryDirectory(prefix="lste-check-") as temp_path:
+        builds = []
+        for seed in ("1", "2"):
+            build_path = os.path.join(temp_path, seed)
+            for name in SOURCES:
+                source = os.path.join(lste.base_path, name)
+                target = os.path.join(build_path, name)
+                if os.path.isdir(source):
+                    shutil.copytree(source, target)
+                elif os.path.isfile(source):
+                    shutil.copy2(source, target)
+
+            # the copies keep the modification times, so the source date stays the same
+            environment = dict(os.environ, PYTHONHASHSEED=seed)
+            subprocess.run(
+                [sys.executable, LSTE, "--reproducible", "--offline", "-p", build_path],
+                env=environment, stdout=subprocess.DEVNULL, check=True,
+            )
+            builds.append(os.path.join(build_path, "dist"))
+        return compare_trees(*builds)
@@ -0,0 +1,296 @@
+#!/usr/bin/python3
+
+"""
+This module provides the development server of LSTE with live reload.
+
+The server is built on the `http.server` module of the standard library and runs in a
+background thread next to the file watcher. Pages are served straight from the latest
+`rendered_html` in memory, so a rebuilt page is available before it has been written to
+`dist`. Everything else, like the assets, is served from `dist_path`.
+
+Every served HTML page gets a small script which listens for server-sent events on
+`/__lste/events`. After each rebuild the server sends a reload event to all connected
+browsers.
+
+Classes:
+    DevServer: Serves the website and notifies the browsers about rebuilds.
+
+Usage:
+    server = DevServer(lste, "127.0.0.1", 8000)
+    server.start()
+"""
+
+import os
+import mimetypes
+import posixpath
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from src.views import PageView
+
+EVENTS_PATH = "/__lste/events"
+RELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + EVENTS_PATH + "\")"
+    ".onmessage = function () { location.reload(); };</script>"
+)
+
+
+class DevServer:
+    """
+    Serves the website from memory and notifies the browsers about rebuilds.
+
+    Attributes:
+        lste (obj): The LSTE object.
+        host (str): The address the server listens on.
+        port (int): The port the server listens on.
+        pages (Dict[str, bytes]): The rendered pages by their path relative to `dist_path`.
+        version (int): The number of rebuilds, increased on every reload event.
+
+    Methods:
+        start() -> None:
+            Registers the hooks and starts the server in a background thread.
+        register_hooks() -> None:
+            Registers the hooks which keep the server up to date.
+        publish(lste) -> obj:
+            Takes the rendered pages into memory and sends a reload event.
+        notify_assets(changed) -> None:
+            Sends a reload event after assets changed.
+        notify() -> None:
+            Sends a reload event to all connected browsers.
+        stop() -> None:
+            Stops the server.
+    """
+
+    def __init__(self, lste, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """
+        Initializes the server.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            host (str): The address the server listens on.
+            port (int): The port the server listens on.
+
+        Returns:
+            None
+        """
+        self.lste = lste
+        self.host = host
+        self.port = port
+        self.pages = {}
+        self.version = 0
+        self.condition = threading.Condition()
+        self.httpd = None
+
+    def start(self) -> None:
+        """
+        Registers the hooks which keep the server up to date and starts the server
+        in a background thread.
+
+        Returns:
+            None
+        """
+        self.register_hooks()
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self.create_handler())
+        self.httpd.daemon_threads = True
+        thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        thread.start()
+        print(f"Serving {self.lste.dist_path} on http://{self.host}:{self.port}/")
+
+    def register_hooks(self) -> None:
+        """
+        Registers the hooks which keep the server up to date. Loading the website again
+        creates new hooks, so this is called again after every load.
+
+        Returns:
+            None
+        """
+        self.lste.hooks.add("after_render_content", self.publish, 100)
+        self.lste.hooks.add("assets_changed", self.notify_assets, 100)
+
+    def stop(self) -> None:
+        """
+        Stops the server.
+
+        Returns:
+            None
+        """
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def publish(self, lste):
+        """
+        Takes the pages rendered by this build into memory and sends a reload event. The
+        other pages stay as they are, pages whose content file has been removed are dropped
+        and pages written by a streaming build are served from disk. This is called through
+        the `after_render_content` hook, so the browsers reload before the pages are written
+        to disk.
+
+        Parameters:
+            lste (obj): The LSTE object.
+
+        Returns:
+            obj: The unchanged LSTE object.
+        """
+        pages = {
+            html_filename: body for html_filename, body in self.pages.items()
+            if html_filename[:-len(".html")] + ".md" in lste.content
+        }
+
+        # only the pages which have been set are rendered, the others are read on access
+        rendered = lste.rendered_html
+        if isinstance(rendered, PageView):
+            if lste.stream:
+                for filename in rendered:
+                    pages.pop(filename.replace(".md", ".html"), None)
+            rendered = rendered.assigned
+        for filename, html in rendered.items():
+            pages[filename.replace(".md", ".html")] = html.lstrip().encode("utf-8")
+
+        # swap the whole dictionary so the request threads never see a partial update
+        self.pages = pages
+        self.notify()
+        return lste
+
+    def notify_assets(self, changed) -> None:
+        """
+        Sends a reload event after assets changed.
+
+        Parameters:
+            changed (Set[str]): The paths of the changed assets.
+
+        Returns:
+            None
+        """
+        self.notify()
+
+    def notify(self) -> None:
+        """
+        Sends a reload event to all connected browsers.
+
+        Returns:
+            None
+        """
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait_for_reload(self, version: int, timeout: float) -> int:
+        """
+        Blocks until a reload event is sent or the timeout passed.
+
+        Parameters:
+            version (int): The last version known to the caller.
+            timeout (float): The seconds to wait at most.
+
+        Returns:
+            int: The current version.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def create_handler(self):
+        """
+        Creates the request handler class bound to this server.
+
+        Returns:
+            type: The request handler class.
+        """
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Handles the requests of the browsers: pages, files from `dist_path` and the
+            server-sent events stream.
+            """
+
+            def do_GET(self) -> None:
+                """
+                Serves a page from memory, a file from `dist_path` or the events stream.
+                """
+                path = unquote(urlsplit(self.path).path)
+                if path == EVENTS_PATH:
+                    self.send_events()
+                    return
+
+                path = posixpath.normpath(path).lstrip("/")
+                if path in ("", "."):
+                    path = "index.html"
+                elif self.path.endswith("/"):
+                    path = posixpath.join(path, "index.html")
+
+                body = server.pages.get(path)
+                if body is None:
+                    body = self.read_file(path)
+                if body is None:
+                    self.send_error(404)
+                    return
+
+                content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                if content_type == "text/html":
+                    body = self.inject_script(body)
+                    content_type = "text/html; charset=utf-8"
+
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def read_file(self, path: str):
+                """
+                Reads a file from `dist_path`, returns None for missing files and paths outside of it.
+                """
+                dist_path = os.path.realpath(server.lste.dist_path)
+                file_path = os.path.realpath(os.path.join(dist_path, path))
+                if not file_path.startswith(dist_path + os.sep):
+                    return None
+                if not os.path.isfile(file_path):
+                    return None
+                with open(file_path, "rb") as handle:
+                    return handle.read()
+
+            def inject_script(self, body: bytes) -> bytes:
+                """
+                Adds the live reload script to an HTML page.
+                """
+                script = RELOAD_SCRIPT.encode("utf-8")
+                position = body.rfind(b"</body>")
+                if position == -1:
+                    return body + script
+                return body[:position] + script + body[position:]
+
+            def send_events(self) -> None:
+                """
+                Streams a reload event after every rebuild until the browser disconnects.
+                """
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+
+                version = server.version
+                try:
+                    while True:
+                        current = server.wait_for_reload(version, 15)
+                        if current != version:
+                            self.wfile.write(b"data: reload\n\n")
+                            version = current
+                        else:
+                            # keep the connection alive
+                            self.wfile.write(b": ping\n\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+
+            def log_message(self, format: str, *args) -> None:
+                """
+                Keeps the output of the watcher readable by not logging requests.
+                """
+                return
+
+        return Handler
@@ -0,0 +1,1118 @@
+#!/usr/bin/python3
+
+"""
+This module provides the `Site` class, which loads, renders and writes a website.
+
+All state of a build lives on the `Site` instance, so a long-running process can build several
+websites without restarting. Nothing is read from the command line and a missing `lste.conf`
+raises `FileNotFoundError` instead of exiting. `lste.py` is the command-line interface on top.
+
+Usage:
+    site = Site("./example-simple")
+    site.load()
+    site.render()
+    site.write()
+
+    # a single page, rendered in memory
+    html = site.render_to_string("index.md")
+"""
+
+import os
+import time
+import errno
+import posixpath
+import contextlib
+from typing import List
+import src.helpers as helpers
+import src.workers as workers
+import src.assets as assets
+import src.reproducible as reproducible
+from src.plugins import Plugins
+from src.hooks import Hooks
+from src.manifest import Manifest, digest
+from src.templates import TemplateCache
+from src.content import ContentIndex, LazyContent, get_stamp
+from src.views import PageView
+from src.pagination import Listings
+from src.feeds import Feeds
+from src.variables import Variables, substitute
+from src.converter import MarkdownConverter
+from src.output import OutputWriter
+from src.profiler import Profiler, profiled
+
+
+class Site:
+    """
+    Loads, renders and writes a website. All state of a build lives on the instance.
+
+    Attributes:
+        version (str): the current LSTE version
+        base_path (str): The base directory for the website content.
+        content_path (str): The directory containing content files.
+        template_path (str): The directory containing template files.
+        assets_path (str): The directory containing asset files.
+        dist_path (str): The directory where the generated website is saved.
+        cache_path (str): The directory where LSTE keeps data between builds, like the manifest.
+        templates (dict): A dictionary of loaded templates.
+        template_cache (TemplateCache): The compiled templates with expanded parts.
+        content (LazyContent): The content entries by file name, each file is read on its first access.
+        content_index (ContentIndex): The path, size, modification time and slug of every file
+            in the content directory and its subdirectories.
+        listings (Listings): The paginated listings configured in the `[listing]` sections.
+        feeds (Feeds): Writes the feed and the sitemap configured in `[feed]` and `[sitemap]`.
+        content_rendered (dict): Rendered content for each content file.
+        rendered_html (dict): Final rendered HTML for each content file.
+        prerendered_html (dict): HTML before applying custom functions.
+        config_file (str): Path to the configuration file.
+        file_stack (dict): A dictionary of files and their modification times.
+        server (DevServer): The development server, if the website is served.
+        incremental (bool): Flag to indicate whether only changed pages should be rendered.
+        jobs (int): The number of worker processes used for rendering. 0 uses one per CPU core.
+        page_hooks (list): The hooks which are applied per page and may run in worker processes.
+        build_time (int): The unix timestamp of the current build.
+        profiler (Profiler): Records the time of hooks and build phases if `--profile` is set.
+        profile_file (str): The path the profile is written to as JSON.
+        offline (bool): Flag to indicate whether plugin updates should be skipped.
+        reproducible (bool): Flag to indicate whether `{{timestamp}}` comes from the inputs.
+        stream (bool): Flag to indicate whether pages are rendered and written in batches.
+        stream_batch_size (int): The number of pages of a batch in a streaming build.
+        page_writer (OutputWriter): The writer of the pages of a streaming build.
+        manifest (Manifest): The input digests and outputs of the last build.
+        page_digests (dict): The digests of the current inputs for each content file.
+        plugin_versions (dict): The installed versions of the loaded plugins.
+        brackets_start (str): The start delimiter for template variables.
+        brackets_end (str): The end delimiter for template variables.
+        rcfile (ConfigParser): Configuration file object.
+        hooks (Hooks): Hooks object for managing hooks.
+        variables (Variables): Registry of the template variables like `{{title}}`.
+        markdown_converter (MarkdownConverter): The cached markdown converter.
+        markdown_extensions (list): The default markdown extensions, see `[markdown]` in `lste.conf`.
+        plugins (dict): Dictionary of loaded plugins.
+        plugin_vars (dict): Variables for plugins.
+        helpers (module): Module providing helper functions.
+
+    Methods:
+        __init__(base_path: str = None, incremental: bool = False, jobs: int = 1, offline: bool = False,
+                 reproducible: bool = False, profiler: Profiler = None, profile_file: str = "",
+                 stream: bool = False) -> None:
+            Sets up the paths and the empty state of a website without reading anything.
+
+        load() -> None:
+            Reads the configuration, initializes the plugins and loads the templates and the content.
+
+        render() -> None:
+            Renders all pages, or with `incremental` the pages whose inputs changed.
+
+        write(copy_assets: bool = True) -> None:
+            Writes the rendered pages, the assets, the feed and the sitemap to the `dist` directory.
+
+        render_to_string(file: str) -> str:
+            Renders a single page and returns its HTML without writing anything.
+
+        load_templates() -> None:
+            Loads all template files from the template directory into memory. Applies the 'templates'
+            hook to modify the loaded templates and invalidates the compiled templates which changed.
+
+        load_content() -> None:
+            Indexes all content files from the content directory, including its subdirectories. The
+            files are read lazily. Applies the 'load_content' hook to modify the loaded content.
+
+        load_content_file(file: str) -> dict:
+            Reads a content file and extracts content, title, and excerpt from it.
+
+        render_site() -> None:
+            Renders the website by applying templates and custom functions to the content. Processes
+            each content file, applies templates, and performs custom function replacements.
+            Applies the 'after_render_content' hook.
+
+        get_build_time() -> int:
+            Returns the unix timestamp of the build.
+
+        is_reproducible() -> bool:
+            Checks if `{{timestamp}}` is taken from the inputs of a page.
+
+        get_timestamp(file) -> int:
+            Returns the unix timestamp of a page for `{{timestamp}}`.
+
+        stream_pages() -> None:
+            Renders and writes the pages in batches, so only one batch is held in memory.
+
+        render_batch(pages: list, parallel: bool) -> None:
+            Renders and writes the pages of a batch of a streaming build.
+
+        render_markdown(file: str) -> tuple:
+            Renders the markdown of a content file to HTML.
+
+        render_page(file: str) -> tuple:
+            Renders a single page by applying the templates, the per page hooks and the custom functions.
+
+        is_parallel_safe(hook_names: list) -> bool:
+            Checks if the callbacks of the given hooks may run in worker processes.
+
+        get_pages_to_render() -> list:
+            Calculates the input digests of all content files and returns the files which need to
+            be rendered. During incremental builds these are only the files whose inputs changed.
+
+        get_page_digest(file: str) -> str:
+            Returns the digest of all inputs of a content file: the content, the resolved template
+            chain, the configuration and the plugin versions.
+
+        resolve_template_chain(template_file_name: str) -> list:
+            Returns the template file and all template parts it includes.
+
+        load_template_file(template_file_name: str) -> str:
+            Loads a template file and processes any included parts. Replaces template part references
+            within the content. Templates are compiled once and served from the template cache.
+
+        load_template_parts(content: str) -> str:
+            Loads and replaces template part references within a given template content.
+
+        profile_phase(phase_name: str) -> ContextManager:
+            Returns a context manager which records the time of a build phase if profiling is enabled.
+
+        print_profile() -> None:
+            Prints the recorded profile and writes it as JSON if `--profile-json` is set.
+
+        register_variables() -> None:
+            Registers the built-in template variables: title, keywords, description and timestamp.
+
+        load_custom_functions(html: str, file: str = None) -> str:
+            Applies custom functions to the rendered HTML by resolving all registered template
+            variables, including the title, keywords, description, and timestamp, in one pass.
+
+        prepare_dist() -> None:
+            Creates the `dist` directory.
+
+        get_outputs(writers: List[OutputWriter]) -> List[str]:
+            Returns all files this build produced, relative to the `dist` directory.
+
+        get_stale_outputs(outputs: List[str]) -> List[str]:
+            Returns the files in the `dist` directory which this build didn't produce.
+
+        save_site(copy_assets: bool = True) -> None:
+            Saves the rendered site content to the `dist` directory. Synchronizes the assets, writes
+            HTML files for each rendered content item, the feed and the sitemap and removes the
+            files this build didn't produce. Unchanged files are skipped and changed files are
+            replaced atomically.
+
+        check_build() -> List[str]:
+            Builds two copies of the website and returns the files which differ.
+
+        sync_assets() -> dict:
+            Copies new and changed assets to the `dist` directory and removes deleted ones.
+    """
+
+    version = "0.2"
+    brackets_start = "{{"
+    brackets_end = "}}"
+    markdown_extensions = ["fenced_code", "tables"]
+    page_hooks = ["excerpt", "single_content", "pre_load_custom_functions"]
+    stream_batch_size = 100
+
+    def __init__(self, base_path: str = None, incremental: bool = False, jobs: int = 1, offline: bool = False,
+                 reproducible: bool = False, profiler: Profiler = None, profile_file: str = "",
+                 stream: bool = False) -> None:
+        """
+        Sets up the paths and the empty state of a website. Nothing is read before `load`.
+
+        Parameters:
+            base_path (str, optional): The base directory of the website. Defaults to the current directory.
+            incremental (bool): Only render and write the pages whose inputs changed.
+            jobs (int): The number of worker processes used for rendering. 0 uses one per CPU core.
+            offline (bool): Use the installed plugins without checking for updates.
+            reproducible (bool): Take `{{timestamp}}` from the inputs instead of the clock.
+            profiler (Profiler, optional): Records the time of hooks and build phases.
+            profile_file (str): The path the profile is written to as JSON.
+            stream (bool): Render and write the pages in batches to keep the memory use flat.
+
+        Returns:
+            None
+        """
+        self.helpers = helpers
+
+        # paths
+        self.base_path = os.path.abspath(base_path or os.getcwd())
+        self.content_path = self.base_path + "/content"
+        self.template_path = self.base_path + "/template"
+        self.assets_path = self.base_path + "/assets"
+        self.dist_path = self.base_path + "/dist"
+        self.cache_path = self.base_path + "/.lste-cache"
+
+        # options
+        self.incremental = incremental
+        self.jobs = jobs
+        self.offline = offline
+        self.reproducible = reproducible
+        self.profiler = profiler
+        self.profile_file = profile_file
+        self.stream = stream
+
+        # the state of the build
+        self.config_file = None
+        self.rcfile = None
+        self.hooks = None
+        self.variables = None
+        self.plugins = {}
+        self.plugin_vars = {}
+        self.plugin_versions = {}
+        self.manifest = None
+        self.markdown_converter = None
+        self.template_cache = None
+        self.templates = {}
+        self.content = {}
+        self.content_index = None
+        self.listings = None
+        self.feeds = None
+        self.content_rendered = {}
+        self.prerendered_html = {}
+        self.rendered_html = {}
+        self.page_digests = {}
+        self.file_stack = {}
+        self.build_time = 0
+        self.page_writer = None
+        self.server = None
+
+    def load(self) -> None:
+        """
+        Reads the configuration files, initializes and updates the plugins and loads the
+        templates and the content.
+
+        Raises:
+            FileNotFoundError: If the website has no `lste.conf`.
+
+        Returns:
+            None
+        """
+        # without a lste.conf there is no website to build
+        config_path = self.base_path + "/lste.conf"
+        self.config_file = self.helpers.load_config(config_path)
+        if self.config_file == False:
+            raise FileNotFoundError(errno.ENOENT, "No lste file found in this project", config_path)
+
+        # init the rcfile
+        self.rcfile = self.helpers.load_config(f"{os.path.expanduser('~')}/.lsterc")
+
+        # set basic modules
+        self.hooks = Hooks()
+        self.hooks.profiler = self.profiler
+        self.variables = Variables(self.brackets_start, self.brackets_end)
+        self.register_variables()
+        plugins = Plugins(self.config_file)
+        with self.profile_phase("init_plugins"):
+            self.plugins = plugins.init_plugins(self)
+        self.plugin_versions = plugins.get_versions()
+        with self.profile_phase("load_plugins"):
+            plugins.load_plugins(self)
+
+        # the manifest of the last build
+        self.manifest = Manifest(self.cache_path + "/manifest.json")
+        self.manifest.load()
+
+        # first hook for the plugins here
+        self = self.hooks.apply("plugins_loaded", self)
+
+        # the new hooks need the callbacks of the server again
+        if self.server:
+            self.server.register_hooks()
+
+        # the markdown extensions can be set in the config
+        extensions = self.markdown_extensions
+        if self.config_file.has_option("markdown", "extensions"):
+            extensions = self.config_file.get("markdown", "extensions").split(",")
+            extensions = [extension.strip() for extension in extensions if extension.strip()]
+        self.markdown_converter = MarkdownConverter(
+            extensions, self.cache_path + "/markdown", memory=not self.stream
+        )
+
+        # load all the needed data
+        self.template_cache = TemplateCache(self.brackets_start, self.brackets_end)
+        self.content_index = ContentIndex(self.content_path, self.cache_path + "/content.json")
+        self.listings = Listings(self.cache_path + "/listings.json")
+        self.feeds = Feeds(self.cache_path + "/feeds.json")
+        self.load_templates()
+        self.load_content()
+
+    def render(self) -> None:
+        """
+        Renders all pages, or with `incremental` only the pages whose inputs changed.
+
+        Returns:
+            None
+        """
+        self.render_site()
+
+    def write(self, copy_assets: bool = True) -> None:
+        """
+        Writes the rendered pages to the `dist` directory and synchronizes the assets, the
+        feed and the sitemap.
+
+        Parameters:
+            copy_assets (bool): False if the assets are already up to date.
+
+        Returns:
+            None
+        """
+        self.save_site(copy_assets)
+
+    def render_to_string(self, file: str) -> str:
+        """
+        Renders a single page and returns its HTML without writing anything. The hooks which
+        run once for the whole website, `pre_render_content` and `after_render_content`, are
+        not applied.
+
+        Parameters:
+            file (str): The name of the content file, like `index.md`.
+
+        Returns:
+            str: The HTML of the page.
+        """
+        self.build_time = self.get_build_time()
+        self.listings.update(self)
+
+        file, self.content_rendered[file] = self.render_markdown(file)
+        self.prerendered_html[file] = self.load_template_file("index.html")
+        _, _, rendered_html = self.render_page(file)
+        return rendered_html.lstrip()
+
+    @profiled("load_templates")
+    def load_templates(self) -> None:
+        """
+        Loads all template files from the template directory into memory.
+        Applies the 'templates' hook to modify the loaded templates. Compiled templates
+        are only dropped from the template cache if one of their files changed.
+
+        Returns:
+            None
+        """
+        self.templates = {}
+        files = sorted(os.listdir(self.template_path))
+        for file in files:
+            filepath = self.template_path + "/" + file
+            with open(filepath) as handle:
+                content = handle.read()
+            self.templates[file] = content
+
+        self.templates = self.hooks.apply("templates", self.templates)
+        self.template_cache.update(self.templates)
+
+    @profiled("load_content")
+    def load_content(self) -> None:
+        """
+        Indexes all content files of the content directory. The files are only read when their
+        entry is accessed for the first time, see `load_content_file`. Files in subdirectories
+        only become pages if `recursive` is set in the `[content]` section of `lste.conf`, the
+        index contains them either way. The pages of the listings are added, then the
+        'load_content' hook is applied to modify the loaded content.
+
+        Returns:
+            None
+        """
+        self.content_index.scan()
+        recursive = self.config_file.getboolean("content", "recursive", fallback=False)
+        self.content = LazyContent(self.content_index.get_pages(recursive), self.load_content_file)
+        self.listings.load(self)
+        self.content = self.hooks.apply("load_content", self.content, self)
+
+    def load_content_file(self, file: str) -> dict:
+        """
+        Reads a content file and extracts content, title, and excerpt from it in a single pass.
+        The metadata of the front matter block is added to the entry, so a page can set its
+        `template` or `skip_markdown` itself.
+
+        Parameters:
+            file (str): The path of the content file relative to the content directory.
+
+        Returns:
+            dict: The content entry of the file.
+        """
+        metadata, content = self.content_index.read(file)
+        title, excerpt, start, end = self.helpers.extract_parts(content)
+        self.content_index.set_header(file, {"metadata": metadata, "title": title, "excerpt": excerpt})
+
+        # the content without its title heading
+        entry = {}
+        if start == 0:
+            entry["content"] = content[end:]
+        else:
+            entry["content"] = content[:start] + content[end:]
+        entry["excerpt"] = excerpt
+        entry["title"] = title
+
+        # the front matter wins over the extracted values
+        for key, value in metadata.items():
+            if key != "content":
+                entry[key] = value
+        return entry
+
+    @profiled("render_site")
+    def render_site(self) -> None:
+        """
+        Renders the website by applying templates and custom functions to the content.
+        It processes each content file, applies templates, and performs custom function replacements.
+        It then applies the 'after_render_content' hook.
+
+        Returns:
+            None
+        """
+        # reset the output of the last run
+        self.content_rendered = {}
+        self.prerendered_html = {}
+        self.rendered_html = {}
+        self.build_time = self.get_build_time()
+
+        # the listing pages need the fragments of their items for their digests
+        self.listings.update(self)
+
+        if self.stream:
+            self.stream_pages()
+            return
+
+        # pre render
+        pages = self.get_pages_to_render()
+        for file in pages:
+            print(f"Rendering template for: {file}")
+
+        # the hooks for the whole website expect all pages, the pages which aren't rendered
+        # again are computed when a plugin reads them
+        layout_html = self.load_template_file("index.html")
+        partial = len(pages) < len(self.content)
+        if partial:
+            self.content_rendered = PageView(list(self.content), lambda file: self.render_markdown(file)[1])
+            self.prerendered_html = PageView(list(self.content), lambda file: layout_html)
+            self.rendered_html = PageView(list(self.content), self.read_page)
+
+        with self.profile_phase("markdown"):
+            for file, file_content_rendered in workers.map_pages(
+                self, "render_markdown", pages
+            ):
+                self.content_rendered[file] = file_content_rendered
+                if "skip_markdown" not in self.content[file]:
+                    self.markdown_converter.store(
+                        self.content[file]["content"], file_content_rendered
+                    )
+
+                # load the base template and then recursively the parts
+                self.prerendered_html[file] = layout_html
+
+        # drop the cached markdown of removed or changed content, only a build which
+        # rendered every page knows all markdown which is still in use
+        if not partial:
+            self.markdown_converter.prune_keys({
+                self.markdown_converter.get_key(self.content[file]["content"])
+                for file in pages
+                if "skip_markdown" not in self.content[file]
+            })
+
+        # hook right before the custom functions which has potential
+        # to overwrite certain template variables
+        self = self.hooks.apply("pre_render_content", self)
+
+        # render the prerendered_html with the builtin functions, the
+        # per page hooks only run in workers if all plugins allow it.
+        # pages which plugins changed are rendered as well
+        parallel = self.is_parallel_safe(self.page_hooks)
+        if partial:
+            files = list(dict.fromkeys(
+                pages + list(self.prerendered_html.assigned) + list(self.content_rendered.assigned)
+            ))
+        else:
+            files = list(self.prerendered_html)
+        with self.profile_phase("template_assembly"):
+            for file, prerendered_html, rendered_html in workers.map_pages(
+                self, "render_page", files, parallel
+            ):
+                self.prerendered_html[file] = prerendered_html
+                self.rendered_html[file] = rendered_html
+
+        # the other pages are rendered again if a plugin reads their html before the custom
+        # functions, their final html is read from the written pages
+        if partial:
+            self.prerendered_html.compute = self.render_page_again
+
+        # hook right after the custom functions which has potential
+        # to overwrite certain template variables
+        self = self.hooks.apply("after_render_content", self)
+
+    def stream_pages(self) -> None:
+        """
+        Renders and writes the pages in batches of `stream_batch_size`, so the memory use stays
+        flat however large the website is. Content entries which are loaded for a batch are
+        unloaded again afterwards, entries loaded by plugins before are kept.
+
+        The hooks which run for the whole website get lazy views: in `pre_render_content`,
+        `content_rendered` converts the markdown of a page when it is read and `prerendered_html`
+        returns the base template. In `after_render_content`, `rendered_html` reads the written
+        pages. Values which plugins set are used instead and are written by `save_site`.
+
+        Returns:
+            None
+        """
+        layout_html = self.load_template_file("index.html")
+        lazy = isinstance(self.content, LazyContent)
+        keep = {file for file in self.content if not lazy or self.content.is_loaded(file)}
+
+        self.prepare_dist()
+        self.page_writer = OutputWriter()
+        self.page_digests = {}
+        self.content_rendered = PageView(list(self.content), lambda file: self.render_markdown(file)[1])
+        self.prerendered_html = PageView(list(self.content), lambda file: layout_html)
+        self.rendered_html = PageView([], self.read_page)
+
+        # hook right before the custom functions which has potential
+        # to overwrite certain template variables
+        self = self.hooks.apply("pre_render_content", self)
+
+        parallel = self.is_parallel_safe(self.page_hooks)
+        markdown_keys = set()
+        complete = True
+        files = list(self.prerendered_html)
+        for start in range(0, len(files), self.stream_batch_size):
+            batch = files[start:start + self.stream_batch_size]
+
+            pages = []
+            for file in batch:
+                if file in self.content:
+                    self.page_digests[file] = self.get_page_digest(file)
+                    if self.incremental and self.manifest.is_current(file, self.page_digests[file], self.dist_path):
+                        complete = False
+                        continue
+                    if "skip_markdown" not in self.content[file]:
+                        markdown_keys.add(self.markdown_converter.get_key(self.content[file]["content"]))
+                pages.append(file)
+
+            for file in pages:
+                print(f"Rendering template for: {file}")
+            self.render_batch(pages, parallel)
+
+            if lazy:
+                for file in batch:
+                    if file not in keep:
+                        self.content.unload(file)
+
+        # drop the cached markdown of removed or changed content, only a build which
+        # rendered every page knows all markdown which is still in use
+        if complete:
+            self.markdown_converter.prune_keys(markdown_keys)
+
+        # hook right after the custom functions which has potential
+        # to overwrite certain template variables
+        self = self.hooks.apply("after_render_content", self)
+
+    def render_batch(self, pages, parallel) -> None:
+        """
+        Renders the pages of a batch of a streaming build and writes them. Their HTML is
+        released afterwards and can be read from the written files.
+
+        Parameters:
+            pages (list): The names of the content files.
+            parallel (bool): False if the per page hooks must run in the main process.
+
+        Returns:
+            None
+        """
+        with self.profile_phase("markdown"):
+            files = [file for file in pages if file not in self.content_rendered.assigned]
+            for file, file_content_rendered in workers.map_pages(self, "render_markdown", files):
+                self.content_rendered[file] = file_content_rendered
+                if "skip_markdown" not in self.content[file]:
+                    self.markdown_converter.store(self.content[file]["content"], file_content_rendered)
+
+        with self.profile_phase("template_assembly"):
+            for file, prerendered_html, rendered_html in workers.map_pages(
+                self, "render_page", pages, parallel
+            ):
+                html_filename = file.replace(".md", ".html")
+                self.page_writer.write(f"{self.dist_path}/{html_filename}", rendered_html.lstrip())
+                if file in self.page_digests:
+                    self.manifest.update(file, self.page_digests[file], html_filename)
+
+                self.content_rendered.release(file)
+                self.prerendered_html.release(file)
+                self.rendered_html.add(file)
+                self.rendered_html.release(file)
+
+    def render_page_again(self, file) -> str:
+        """
+        Renders a page which an incremental build didn't render, when a plugin reads its HTML
+        before the custom functions. The page is written again like the rendered pages.
+
+        Parameters:
+            file (str): The name of the content file.
+
+        Returns:
+            str: The HTML of the page before applying the custom functions.
+        """
+        self.prerendered_html[file] = self.load_template_file("index.html")
+        file, prerendered_html, rendered_html = self.render_page(file)
+        return prerendered_html
+
+    def read_page(self, file) -> str:
+        """
+        Reads a page which has been written by a streaming build.
+
+        Parameters:
+            file (str): The name of the content file.
+
+        Returns:
+            str: The HTML of the page.
+        """
+        with open(f"{self.dist_path}/{file.replace('.md', '.html')}") as handle:
+            return handle.read()
+
+    def get_build_time(self) -> int:
+        """
+        Returns the unix timestamp of the build.
+
+        Returns:
+            int: The unix timestamp.
+        """
+        return int(time.time())
+
+    def is_reproducible(self) -> bool:
+        """
+        Checks if `{{timestamp}}` is taken from the inputs of a page instead of the build time,
+        which is the case in a reproducible build and if `SOURCE_DATE_EPOCH` is set.
+
+        Returns:
+            bool: True if the timestamp is taken from the inputs.
+        """
+        return self.reproducible or bool(os.environ.get("SOURCE_DATE_EPOCH"))
+
+    def get_timestamp(self, file) -> int:
+        """
+        Returns the unix timestamp of a page for `{{timestamp}}`: the time of the build, or in a
+        reproducible build the time of its content file, see `reproducible.get_source_date`.
+
+        Parameters:
+            file (str): The name of the content file.
+
+        Returns:
+            int: The unix timestamp.
+        """
+        if self.is_reproducible():
+            return reproducible.get_source_date(self, file)
+        return self.build_time
+
+    def render_markdown(self, file) -> tuple:
+        """
+        Renders the markdown of a content file to HTML. Content files with a
+        `skip_markdown` key, whatever its value, are used as they are. Markdown which
+        has been converted before is taken from the cache.
+
+        Parameters:
+            file (str): The name of the content file.
+
+        Returns:
+            tuple: The name of the content file and the rendered content.
+        """
+        # render the file content
+        file_content = self.content[file]["content"]
+
+        # some content maybe doesn't want to have markdown enabled
+        if "skip_markdown" in self.content[file]:
+            file_content_rendered = file_content
+        else:
+            file_content_rendered = self.markdown_converter.convert(file_content)
+        return file, file_content_rendered
+
+    def render_page(self, file) -> tuple:
+        """
+        Renders a single page: puts the rendered content into the single template and the
+        base template, applies the per page hooks and the custom functions.
+
+        Parameters:
+            file (str): The name of the content file.
+
+        Returns:
+            tuple: The name of the content file, the HTML before and after applying the custom functions.
+        """
+        layout = self.template_cache.get("index.html")
+
+        # set the template
+        if "template" in self.content[file]:
+            single_template = self.template_cache.get(self.content[file]["template"])
+        else:
+            single_template = self.template_cache.get("page.html")
+
+        # load the template
+        excerpt = self.hooks.apply(
+            "excerpt", self.content[file]["excerpt"], file, self
+        )
+        single_content = single_template.render(
+            {
+                "title": self.content[file]["title"],
+                "content": self.content_rendered[file],
+                "excerpt": excerpt,
+            }
+        )
+
+        single_content = self.hooks.apply(
+            "single_content", single_content, file, self
+        )
+
+        # plugins may have changed the base template of the page
+        if self.prerendered_html[file] is layout.html:
+            self.prerendered_html[file] = layout.render({"content": single_content})
+        else:
+            self.prerendered_html[file] = substitute(
+                self.prerendered_html[file],
+                {"content": single_content},
+                self.brackets_start,
+                self.brackets_end,
+            )
+
+        # hook right before the custom functions executes
+        self.prerendered_html[file] = self.hooks.apply(
+            "pre_load_custom_functions", self.prerendered_html[file], file, self
+        )
+
+        # load the template functions
+        self.rendered_html[file] = self.load_custom_functions(
+            self.prerendered_html[file], file
+        )
+
+        return file, self.prerendered_html[file], self.rendered_html[file]
+
+    def is_parallel_safe(self, hook_names) -> bool:
+        """
+        Checks if the callbacks of the given hooks and the registered template variables
+        may run in worker processes. Callbacks of plugins are only considered safe if the
+        plugin module sets `parallel_safe = True`.
+
+        Parameters:
+            hook_names (list): The names of the hooks.
+
+        Returns:
+            bool: True if all callbacks may run in worker processes.
+        """
+        callbacks = [value for value in self.variables.variables.values() if callable(value)]
+        for hook_name in hook_names:
+            callbacks += self.hooks.get_callbacks(hook_name)
+
+        for callback in callbacks:
+            plugin = self.plugins.get(getattr(callback, "__module__", None))
+            if plugin is not None and not getattr(plugin, "parallel_safe", False):
+                return False
+        return True
+
+    def get_pages_to_render(self) -> list:
+        """
+        Calculates the input digests of all content files and returns the files which need to
+        be rendered. Without the incremental mode every content file gets rendered.
+
+        Returns:
+            list: The names of the content files which need to be rendered.
+        """
+        self.page_digests = {}
+        for file in self.content:
+            self.page_digests[file] = self.get_page_digest(file)
+
+        if not self.incremental:
+            return list(self.content)
+
+        pages = []
+        for file in self.content:
+            if not self.manifest.is_current(file, self.page_digests[file], self.dist_path):
+                pages.append(file)
+        return pages
+
+    def get_page_digest(self, file) -> str:
+        """
+        Returns the digest of all inputs of a content file. These are the content data, or
+        the stamp of a content file which hasn't been set, the resolved template chain, the
+        configuration, the versions of LSTE and the plugins and in a reproducible build the
+        timestamp of the page.
+
+        Parameters:
+            file (str): The name of the content file.
+
+        Returns:
+            str: The digest of the inputs.
+        """
+        # a content file is represented by the size and the modification time in the content
+        # index, whether it has been loaded or not, so unchanged files aren't read
+        if (
+            isinstance(self.content, LazyContent)
+            and file not in self.content.assigned
+            and file in self.content_index.files
+        ):
+            content_data = get_stamp(self.content_index.files[file])
+            metadata = self.content_index.get_header(file)["metadata"]
+        else:
+            content_data = metadata = self.content[file]
+        single_template_name = metadata.get("template", "page.html")
+
+        templates = {}
+        templates.update(self.template_cache.get("index.html").sources)
+        templates.update(self.template_cache.get(single_template_name).sources)
+
+        config = {}
+        for section in self.config_file.sections():
+            config[section] = dict(self.config_file.items(section, raw=True))
+
+        return digest(
+            self.version,
+            content_data,
+            templates,
+            config,
+            self.plugin_versions,
+            self.listings.get_digest(file),
+            self.get_timestamp(file) if self.is_reproducible() else None,
+        )
+
+    def resolve_template_chain(self, template_file_name) -> list:
+        """
+        Returns the template file and all template parts it includes, recursively.
+
+        Parameters:
+            template_file_name (str): The filename of the template.
+
+        Returns:
+            list: The filenames of the template and its parts.
+        """
+        return self.template_cache.get(template_file_name).chain
+
+    def load_template_file(self, template_file_name) -> str:
+        """
+        Loads a template file and processes any included parts. The template is
+        compiled once and served from the template cache afterwards.
+
+        Parameters:
+            template_file_name (str): The filename of the template to load.
+
+        Returns:
+            str: The rendered HTML of the template.
+        """
+        return self.template_cache.get(template_file_name).html
+
+    def load_template_parts(self, content) -> str:
+        """
+        Loads and replaces template part references within a given template content.
+
+        Parameters:
+            content (str): The content of the template file.
+
+        Returns:
+            str: The rendered HTML with all template parts replaced.
+        """
+        return self.template_cache.compile_text("", content).html
+
+    def profile_phase(self, phase_name):
+        """
+        Returns a context manager which records the time of a build phase if profiling
+        is enabled.
+
+        Parameters:
+            phase_name (str): The name of the phase.
+
+        Returns:
+            ContextManager: The context manager.
+        """
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.phase(phase_name)
+
+    def print_profile(self) -> None:
+        """
+        Prints the recorded profile, writes it to the JSON file if one is set and
+        starts a new profile.
+
+        Returns:
+            None
+        """
+        if self.profiler is None:
+            return
+
+        print(self.profiler.report())
+        if self.profile_file:
+            self.profiler.save(self.profile_file)
+        self.profiler.reset()
+
+    def register_variables(self) -> None:
+        """
+        Registers the built-in template variables. Plugins can add their own variables
+        or overwrite these through `self.variables.add()`.
+
+        Returns:
+            None
+        """
+        # timestamp
+        self.variables.add("timestamp", lambda file, lste: str(lste.get_timestamp(file)))
+
+        # config variables
+        self.variables.add("title", lambda file, lste: lste.config_file["lste"]["title"])
+        self.variables.add("keywords", lambda file, lste: lste.config_file["lste"]["keywords"])
+        self.variables.add("description", lambda file, lste: lste.config_file["lste"]["description"])
+
+    def load_custom_functions(self, html, file=None) -> str:
+        """
+        Applies custom functions to the rendered HTML, including setting the title, keywords,
+        description, and timestamp. All registered variables are resolved in one pass.
+
+        Parameters:
+            html (str): The currently generated HTML.
+            file (str, optional): The name of the content file the HTML belongs to.
+
+        Returns:
+            str: The manipulated HTML with custom functions applied.
+        """
+        return self.variables.render(html, file, self)
+
+    def prepare_dist(self) -> None:
+        """
+        Creates the `dist` directory. Existing pages are replaced atomically when they are
+        written, so the directory is never cleared.
+
+        Returns:
+            None
+        """
+        os.makedirs(self.dist_path, exist_ok=True)
+
+    def get_outputs(self, writers: List[OutputWriter]) -> List[str]:
+        """
+        Returns all files this build produced: the pages of the manifest, which includes the
+        pages which weren't written again, and the files the writers wrote or skipped.
+
+        Parameters:
+            writers (List[OutputWriter]): The writers of this build.
+
+        Returns:
+            List[str]: The sorted paths relative to the `dist` directory.
+        """
+        outputs = {page["output"] for page in self.manifest.pages.values()}
+        for writer in writers:
+            outputs.update(
+                os.path.relpath(path, self.dist_path).replace(os.sep, "/") for path in writer.paths
+            )
+        return sorted(outputs)
+
+    def get_stale_outputs(self, outputs: List[str]) -> List[str]:
+        """
+        Returns the files in the `dist` directory which this build didn't produce: the
+        outputs of the last build which are gone, or without a manifest every file on disk
+        which isn't an output. The assets are synchronized on their own.
+
+        Parameters:
+            outputs (List[str]): The files this build produced.
+
+        Returns:
+            List[str]: The paths relative to the `dist` directory.
+        """
+        outputs = set(outputs)
+        if self.manifest.loaded:
+            return [name for name in self.manifest.outputs if name not in outputs]
+
+        stale = []
+        for dirpath, dirnames, filenames in os.walk(self.dist_path):
+            relative_path = os.path.relpath(dirpath, self.dist_path)
+            if relative_path == ".":
+                relative_path = ""
+                dirnames[:] = [name for name in dirnames if name != "assets"]
+            dirnames.sort()
+            for filename in sorted(filenames):
+                name = posixpath.join(relative_path.replace(os.sep, "/"), filename)
+                if name not in outputs:
+                    stale.append(name)
+        return stale
+
+    @profiled("save_site")
+    def save_site(self, copy_assets=True) -> None:
+        """
+        Saves the rendered site content to the `dist` directory. Synchronizes the assets,
+        writes HTML files for each rendered content item, the feed and the sitemap and removes
+        the files the last build produced but this one didn't, like the pages of deleted content
+        files. If the last build is unknown, every file on disk this build didn't produce is
+        removed. Files whose content didn't change are not written again and changed files are
+        replaced atomically, so a reader never sees a missing or half-written page.
+
+        Parameters:
+            copy_assets (bool): False if the watcher already copied the changed assets.
+
+        Returns:
+            None
+        """
+        # a streaming build already wrote its pages
+        if self.stream:
+            writer = self.page_writer
+        else:
+            self.prepare_dist()
+            writer = OutputWriter()
+
+        # the pages which haven't been rendered are already written, only the pages plugins
+        # changed are left
+        if isinstance(self.rendered_html, PageView):
+            pages = dict(self.rendered_html.assigned)
+        else:
+            pages = self.rendered_html
+
+        # only copy new and changed assets
+        asset_stats = None
+        if copy_assets:
+            asset_stats = self.sync_assets()
+
+        # unchanged pages are skipped, changed pages are replaced atomically
+        for filename in pages:
+            html_filename = filename.replace(".md", ".html")
+            content = pages[filename]
+            content = content.lstrip()
+
+            writer.write(f"{self.dist_path}/{html_filename}", content)
+
+            if filename in self.page_digests:
+                self.manifest.update(filename, self.page_digests[filename], html_filename)
+
+        # remove the pages whose content file has been deleted
+        for filename, html_filename in self.manifest.orphans(list(self.content)):
+            writer.delete(f"{self.dist_path}/{html_filename}")
+            self.manifest.remove(filename)
+
+        # the feed and the sitemap are streamed from the content index
+        writers = [writer]
+        if self.config_file.has_section("feed") or self.config_file.has_section("sitemap"):
+            writers.append(OutputWriter())
+            self.feeds.write(self, writers[-1])
+
+        # remove the files of the last build which this build didn't produce, like an old
+        # feed, without a manifest every other file on disk
+        outputs = self.get_outputs(writers)
+        for name in self.get_stale_outputs(outputs):
+            writer.delete(f"{self.dist_path}/{name}")
+        self.manifest.outputs = outputs
+
+        self.manifest.save()
+        self.content_index.save()
+        self.listings.save()
+
+        summary = f"Saved pages: {writer.summary()}"
+        if asset_stats:
+            summary += f"; assets: {asset_stats['copied']} copied, {asset_stats['removed']} removed"
+        print(summary)
+        if len(writers) > 1:
+            print(f"Saved feeds: {writers[1].summary()}")
+
+        self = self.hooks.apply("after_save_site", self)
+
+    def check_build(self) -> List[str]:
+        """
+        Builds two copies of the sources of the website and compares both outputs.
+
+        Returns:
+            List[str]: The files which differ, empty if the build is reproducible.
+        """
+        return reproducible.check_build(self)
+
+    def sync_assets(self) -> dict:
+        """
+        Copies new and changed assets to the `dist` directory and removes the assets which
+        have been deleted. The behaviour can be changed in the `[assets]` section of the config:
+        `checksum` compares file digests instead of modification times and `hardlink` links
+        the assets instead of copying them.
+
+        Returns:
+            dict: The number of 'copied', 'unchanged' and 'removed' assets.
+        """
+        checksum = self.config_file.getboolean("assets", "checksum", fallback=False)
+        link = self.config_file.getboolean("assets", "hardlink", fallback=False)
+        return assets.sync_assets(
+            self.assets_path, self.dist_path + "/assets", checksum, link
+        )
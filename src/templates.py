@@ -0,0 +1,268 @@
+#!/usr/bin/python3
+
+"""
+This module provides the compiled template cache of LSTE.
+
+Templates are compiled once into a `CompiledTemplate`: all `{{part: ...}}` references are
+expanded recursively and the result is split into a list of literal and placeholder segments.
+Rendering a page afterwards only fills the placeholder segments and joins the list, instead
+of scanning and replacing the whole template again for every page.
+
+Classes:
+    CompiledTemplate: A template with expanded parts, split into segments.
+    TemplateCache: Compiles templates on demand and keeps them until their files change.
+
+Functions:
+    tokenize: Splits a text into literal and placeholder segments.
+
+Usage Example:
+    cache = TemplateCache("{{", "}}")
+    cache.update({"index.html": "<main>{{part: page.html}}</main>", "page.html": "{{content}}"})
+    html = cache.get("index.html").render({"content": "Hello"})
+    print(html)  # Output: "<main>Hello</main>"
+"""
+
+from typing import Dict, List, Tuple
+
+
+def tokenize(text: str, brackets_start: str = "{{", brackets_end: str = "}}") -> List[Tuple[str, str]]:
+    """
+    Splits a text into literal and placeholder segments.
+
+    Every segment is a tuple of the original text of the segment and the name of the
+    placeholder. Literal segments have an empty name. Placeholders can't span several lines,
+    brackets without a matching end on the same line are kept as literal text. A placeholder
+    begins at the last start delimiter before its end, extra brackets around it stay literal.
+
+    Args:
+        text (str): The text to split.
+        brackets_start (str): The start delimiter of placeholders.
+        brackets_end (str): The end delimiter of placeholders.
+
+    Returns:
+        List[Tuple[str, str]]: The segments of the text.
+    """
+    segments = []
+    position = 0
+    literal_start = 0
+    length = len(text)
+
+    while position < length:
+        start = text.find(brackets_start, position)
+        if start == -1:
+            break
+
+        end = text.find(brackets_end, start + len(brackets_start))
+        if end == -1:
+            break
+
+        # the placeholder starts at the last start delimiter before its end, like in
+        # `{{{title}}}` or `{{a {{title}}`
+        start = text.rfind(brackets_start, start, end)
+
+        name = text[start + len(brackets_start):end]
+        if "\n" in name:
+            position = start + len(brackets_start)
+            continue
+
+        if start > literal_start:
+            segments.append((text[literal_start:start], ""))
+
+        position = end + len(brackets_end)
+        segments.append((text[start:position], name.strip()))
+        literal_start = position
+
+    if literal_start < length:
+        segments.append((text[literal_start:], ""))
+
+    return segments
+
+
+class CompiledTemplate:
+    """
+    A template with all parts expanded, split into literal and placeholder segments.
+
+    Attributes:
+        name (str): The filename of the template.
+        segments (List[str]): The text of all segments. Placeholders keep their original text.
+        slots (List[Tuple[int, str]]): The index and the name of every placeholder segment.
+        chain (List[str]): The filename of the template and of all parts it includes.
+        sources (Dict[str, str]): The source of every file in the chain, used for invalidation.
+        html (str): The template with all parts expanded.
+
+    Methods:
+        render(context: Dict[str, str]) -> str:
+            Fills the placeholders with the values of the context and returns the result.
+    """
+
+    def __init__(self, name: str, segments: List[str], slots: List[Tuple[int, str]],
+                 chain: List[str], sources: Dict[str, str]) -> None:
+        """
+        Initializes a new compiled template.
+
+        Parameters:
+            name (str): The filename of the template.
+            segments (List[str]): The text of all segments.
+            slots (List[Tuple[int, str]]): The index and the name of every placeholder segment.
+            chain (List[str]): The filename of the template and of all parts it includes.
+            sources (Dict[str, str]): The source of every file in the chain.
+
+        Returns:
+            None
+        """
+        self.name = name
+        self.segments = segments
+        self.slots = slots
+        self.chain = chain
+        self.sources = sources
+        self.html = "".join(segments)
+
+    def render(self, context: Dict[str, str]) -> str:
+        """
+        Fills the placeholders with the values of the context and returns the result.
+        Placeholders which are not part of the context are kept as they are.
+
+        Parameters:
+            context (Dict[str, str]): The values of the placeholders.
+
+        Returns:
+            str: The rendered template.
+        """
+        segments = self.segments.copy()
+        for index, name in self.slots:
+            if name in context:
+                segments[index] = context[name]
+        return "".join(segments)
+
+
+class TemplateCache:
+    """
+    Compiles templates on demand and keeps them until one of their files changes.
+
+    Attributes:
+        brackets_start (str): The start delimiter of placeholders.
+        brackets_end (str): The end delimiter of placeholders.
+        templates (Dict[str, str]): The sources of all templates.
+        compiled (Dict[str, CompiledTemplate]): The compiled templates.
+
+    Methods:
+        update(templates: Dict[str, str]) -> None:
+            Sets the sources of the templates and drops compiled templates whose files changed.
+        get(template_file_name: str) -> CompiledTemplate:
+            Returns the compiled template, compiling it if needed.
+        compile_text(name: str, text: str) -> CompiledTemplate:
+            Compiles a text which references the known templates as parts.
+    """
+
+    def __init__(self, brackets_start: str = "{{", brackets_end: str = "}}") -> None:
+        """
+        Initializes a new, empty template cache.
+
+        Parameters:
+            brackets_start (str): The start delimiter of placeholders.
+            brackets_end (str): The end delimiter of placeholders.
+
+        Returns:
+            None
+        """
+        self.brackets_start = brackets_start
+        self.brackets_end = brackets_end
+        self.templates = {}
+        self.compiled = {}
+
+    def update(self, templates: Dict[str, str]) -> None:
+        """
+        Sets the sources of the templates. Compiled templates are only dropped if the source
+        of the template itself or of one of its parts changed.
+
+        Parameters:
+            templates (Dict[str, str]): The sources of all templates.
+
+        Returns:
+            None
+        """
+        self.templates = templates
+        for name in list(self.compiled):
+            sources = self.compiled[name].sources
+            for file, source in sources.items():
+                if templates.get(file) != source:
+                    del self.compiled[name]
+                    break
+
+    def get(self, template_file_name: str) -> CompiledTemplate:
+        """
+        Returns the compiled template, compiling it if it is not cached yet.
+
+        Parameters:
+            template_file_name (str): The filename of the template.
+
+        Returns:
+            CompiledTemplate: The compiled template.
+        """
+        if template_file_name not in self.compiled:
+            self.compiled[template_file_name] = self.compile_text(
+                template_file_name, self.templates[template_file_name]
+            )
+        return self.compiled[template_file_name]
+
+    def compile_text(self, name: str, text: str) -> CompiledTemplate:
+        """
+        Compiles a text: parts are expanded recursively and the result is split into segments.
+
+        Parameters:
+            name (str): The name of the text, used for the chain.
+            text (str): The text to compile.
+
+        Returns:
+            CompiledTemplate: The compiled text.
+        """
+        segments = []
+        chain = [name]
+        self._expand(text, segments, chain, [name])
+
+        # merge the literals between the placeholders
+        merged = []
+        slots = []
+        literal = []
+        for segment, placeholder in segments:
+            if placeholder:
+                if literal:
+                    merged.append("".join(literal))
+                    literal = []
+                slots.append((len(merged), placeholder))
+                merged.append(segment)
+            else:
+                literal.append(segment)
+        if literal:
+            merged.append("".join(literal))
+
+        sources = {file: self.templates.get(file) for file in chain}
+        if name not in self.templates:
+            sources.pop(name)
+
+        return CompiledTemplate(name, merged, slots, chain, sources)
+
+    def _expand(self, text: str, segments: List[Tuple[str, str]], chain: List[str], stack: List[str]) -> None:
+        """
+        Tokenizes a text and expands its parts recursively into the given segments.
+
+        Parameters:
+            text (str): The text to expand.
+            segments (List[Tuple[str, str]]): The list the segments are appended to.
+            chain (List[str]): The list the names of the included parts are appended to.
+            stack (List[str]): The parts which are currently expanded, used to detect loops.
+
+        Returns:
+            None
+        """
+        for segment, placeholder in tokenize(text, self.brackets_start, self.brackets_end):
+            if not placeholder.startswith("part:"):
+                segments.append((segment, placeholder))
+                continue
+
+            part_name = placeholder[len("part:"):].strip()
+            if part_name in stack:
+                raise ValueError(f"template part {part_name} includes itself")
+
+            chain.append(part_name)
+            self._expand(self.templates[part_name], segments, chain, stack + [part_name])
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+
+"""
+This module defines the `Variables` class, a registry for the template variables of LSTE
+like `{{title}}` or `{{timestamp}}`.
+
+Instead of running one `str.replace` over the whole page per variable, the page is split into
+literal and placeholder segments once and every known placeholder is resolved while joining
+the segments. Plugins register their own variables in the registry and don't need to run
+their own replace passes.
+
+Classes:
+    Variables: A registry of template variables which resolves them in a single pass.
+
+Usage Example:
+    variables = Variables("{{", "}}")
+    variables.add("title", "My Website")
+    variables.add("slug", lambda file, lste: file.replace(".md", ""))
+    html = variables.render("<h1>{{title}}</h1><p>{{slug}}</p>", "index.md", lste)
+    print(html)  # Output: "<h1>My Website</h1><p>index</p>"
+"""
+
+from typing import Any, Callable, Dict, Optional, Union
+from src.templates import tokenize
+
+
+def substitute(text: str, context: Dict[str, str], brackets_start: str = "{{", brackets_end: str = "}}") -> str:
+    """
+    Replaces all placeholders of a text with the values of the context in one pass.
+    Placeholders which are not part of the context are kept as they are.
+
+    Args:
+        text (str): The text containing the placeholders.
+        context (Dict[str, str]): The values of the placeholders.
+        brackets_start (str): The start delimiter of placeholders.
+        brackets_end (str): The end delimiter of placeholders.
+
+    Returns:
+        str: The text with the placeholders replaced.
+    """
+    if brackets_start not in text:
+        return text
+
+    segments = []
+    for segment, name in tokenize(text, brackets_start, brackets_end):
+        if name and name in context:
+            segment = context[name]
+        segments.append(segment)
+    return "".join(segments)
+
+
+class Variables:
+    """
+    A registry of template variables which resolves all of them in a single pass.
+
+    A variable is either a string or a callback. Callbacks are called with the name of the
+    content file and the LSTE object and are only called if the variable is used on the page.
+
+    Attributes:
+        brackets_start (str): The start delimiter of placeholders.
+        brackets_end (str): The end delimiter of placeholders.
+        variables (Dict[str, Union[str, Callable[[str, Any], str]]]): The registered variables.
+
+    Methods:
+        add(name: str, value: Union[str, Callable[[str, Any], str]]) -> None:
+            Registers a variable, replacing a variable with the same name.
+        remove(name: str) -> None:
+            Removes a variable.
+        render(text: str, file: Optional[str] = None, lste: Any = None, context: Optional[Dict[str, str]] = None) -> str:
+            Replaces all registered variables and the given context in one pass.
+    """
+    variables: Dict[str, Union[str, Callable[[str, Any], str]]] = {}
+
+    def __init__(self, brackets_start: str = "{{", brackets_end: str = "}}") -> None:
+        """
+        Initializes a new, empty registry.
+
+        Parameters:
+            brackets_start (str): The start delimiter of placeholders.
+            brackets_end (str): The end delimiter of placeholders.
+
+        Returns:
+            None
+        """
+        self.brackets_start = brackets_start
+        self.brackets_end = brackets_end
+        self.variables = {}
+
+    def add(self, name: str, value: Union[str, Callable[[str, Any], str]]) -> None:
+        """
+        Registers a variable, replacing a variable with the same name.
+
+        Parameters:
+            name (str): The name of the variable as used between the brackets.
+            value (Union[str, Callable[[str, Any], str]]): The value or a callback returning the value.
+
+        Returns:
+            None
+        """
+        self.variables[name] = value
+
+    def remove(self, name: str) -> None:
+        """
+        Removes a variable.
+
+        Parameters:
+            name (str): The name of the variable.
+
+        Returns:
+            None
+        """
+        self.variables.pop(name, None)
+
+    def render(self, text: str, file: Optional[str] = None, lste: Any = None,
+               context: Optional[Dict[str, str]] = None) -> str:
+        """
+        Replaces all registered variables in one pass over the text. Values of the given
+        context take precedence over the registered variables. Every callback is called at
+        most once per call, and only if its variable is used in the text.
+
+        Parameters:
+            text (str): The text containing the placeholders.
+            file (Optional[str]): The name of the content file which is rendered.
+            lste (Any): The LSTE object, passed to the callbacks.
+            context (Optional[Dict[str, str]]): Additional values for this call.
+
+        Returns:
+            str: The text with the variables replaced.
+        """
+        if self.brackets_start not in text:
+            return text
+
+        context = dict(context) if context else {}
+        segments = []
+        for segment, name in tokenize(text, self.brackets_start, self.brackets_end):
+            if name:
+                if name not in context and name in self.variables:
+                    value = self.variables[name]
+                    context[name] = value(file, lste) if callable(value) else value
+                if name in context:
+                    segment = context[name]
+            segments.append(segment)
+        return "".join(segments)
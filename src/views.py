@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+
+"""
+This module provides `PageView`, a dictionary of pages whose values are computed on access.
+
+A streaming build never holds the HTML of all pages at once, but the hooks which run for the
+whole website, like `pre_render_content` and `after_render_content`, expect dictionaries of all
+pages. A `PageView` lists all pages and computes the value of a page only when it is read, for
+example by reading the written page from disk. Values which are set, for example by a plugin,
+are kept and win over the computed ones until they are released.
+
+Usage:
+    view = PageView(["index.md"], lambda file: read_page(file))
+    html = view["index.md"]          # computed
+    view["index.md"] = "<html>"      # kept until released
+    view.release("index.md")
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Callable, Iterator, List
+
+
+class PageView(MutableMapping):
+    """
+    A dictionary of pages whose values are computed on access unless they have been set.
+
+    Attributes:
+        files (Dict[str, None]): The pages in their order.
+        compute (Callable[[str], Any]): Returns the value of a page which hasn't been set.
+        assigned (Dict[str, Any]): The values which have been set.
+
+    Methods:
+        add(file: str) -> None:
+            Adds a page whose value is computed on access.
+        release(file: str) -> None:
+            Drops the value which has been set for a page, the page stays in the view.
+    """
+
+    def __init__(self, files: List[str], compute: Callable[[str], Any]) -> None:
+        """
+        Initializes the view without computing any value.
+
+        Parameters:
+            files (List[str]): The pages.
+            compute (Callable[[str], Any]): Returns the value of a page.
+
+        Returns:
+            None
+        """
+        self.files = dict.fromkeys(files)
+        self.compute = compute
+        self.assigned = {}
+
+    def __getitem__(self, file: str) -> Any:
+        if file in self.assigned:
+            return self.assigned[file]
+        if file not in self.files:
+            raise KeyError(file)
+        return self.compute(file)
+
+    def __setitem__(self, file: str, value: Any) -> None:
+        self.files[file] = None
+        self.assigned[file] = value
+
+    def __delitem__(self, file: str) -> None:
+        del self.files[file]
+        self.assigned.pop(file, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __contains__(self, file: object) -> bool:
+        return file in self.files
+
+    def __repr__(self) -> str:
+        return f"PageView({list(self.files)!r})"
+
+    def add(self, file: str) -> None:
+        """
+        Adds a page whose value is computed on access.
+
+        Parameters:
+            file (str): The page.
+
+        Returns:
+            None
+        """
+        self.files[file] = None
+
+    def release(self, file: str) -> None:
+        """
+        Drops the value which has been set for a page, so it is computed again on its next
+        access. The page stays in the view.
+
+        Parameters:
+            file (str): The page.
+
+        Returns:
+            None
+        """
+        self.assigned.pop(file, None)
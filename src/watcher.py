@@ -4,9 +4,22 @@
 This module provides functionality for monitoring changes in a specified directory
 and triggering site updates in response to file changes.
 
+On Linux the changes are reported by the kernel through inotify, which is accessed through
+ctypes. On other platforms, or if inotify is not available, the files are polled for changed
+modification times every 500 ms. Both backends ignore the `dist` and the cache folder,
+collect bursts of events for a short debounce period and hand the set of changed paths to
+the rebuild step. The rebuild step sorts the changes into config, template, content and asset
+changes and does only the work they need.
+
 The primary functions include:
 - `setup_filestack`: Initializes or updates a stack of files and their modification times for monitoring.
 - `run_file_watcher`: Continuously monitors files for changes and triggers site rendering and updating processes when changes are detected.
+- `classify_changes`: Sorts changed paths into config, template, content and asset changes.
+- `rebuild`: Renders and saves only what the changed files affect.
+
+Classes:
+    InotifyWatcher: Waits for changed files using Linux inotify.
+    PollingWatcher: Waits for changed files by comparing modification times.
 
 Usage:
     - Call `setup_filestack(lste)` to populate the file stack with current files and their modification times.
@@ -14,12 +27,94 @@ Usage:
 
 The `lste` object is expected to have:
     - `base_path`: The root directory to watch for file changes.
+    - `dist_path` and `cache_path`: The directories which are ignored.
     - `file_stack`: A dictionary to store file paths and their modification times.
     - Methods such as `load_templates`, `load_content`, `render_site`, and `save_site` for handling site rendering and updating processes.
 """
 
 import os
 import time
+import select
+import struct
+import ctypes
+import ctypes.util
+from typing import Dict, List, Set
+import src.assets as assets
+
+# inotify flags, see inotify(7)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o0004000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def get_ignored_paths(lste) -> List[str]:
+    """
+    Returns the directories which are written by LSTE itself and must not trigger a rebuild.
+
+    Parameters:
+        lste (obj): The LSTE object, which should have `dist_path` and `cache_path` attributes.
+
+    Returns:
+        List[str]: The absolute paths of the ignored directories.
+    """
+    return [os.path.abspath(lste.dist_path), os.path.abspath(lste.cache_path)]
+
+
+def is_ignored(path: str, ignored_paths: List[str]) -> bool:
+    """
+    Checks if a path is one of the ignored directories or inside of one.
+
+    Parameters:
+        path (str): The absolute path to check.
+        ignored_paths (List[str]): The absolute paths of the ignored directories.
+
+    Returns:
+        bool: True if the path is ignored.
+    """
+    for ignored_path in ignored_paths:
+        if path == ignored_path or path.startswith(ignored_path + os.sep):
+            return True
+    return False
+
+
+def walk_files(lste) -> List[str]:
+    """
+    Lists all files in the base path, skipping the ignored directories.
+
+    Parameters:
+        lste (obj): The LSTE object, which should have a `base_path` attribute.
+
+    Returns:
+        List[str]: The paths of all watched files.
+    """
+    ignored_paths = get_ignored_paths(lste)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(lste.base_path):
+        dirnames[:] = [
+            dirname for dirname in dirnames
+            if not is_ignored(os.path.join(dirpath, dirname), ignored_paths)
+        ]
+        files += [os.path.join(dirpath, filename) for filename in filenames]
+    return files
+
 
 def setup_filestack(lste):
     """
@@ -35,21 +130,388 @@ def setup_filestack(lste):
     Returns:
         None
     """
-    # Create a list of all files in the base path
-    files = [os.path.join(dp, f) for dp, dn, filenames in os.walk(lste.base_path) for f in filenames]
+    lste.file_stack = {}
 
     # Initialize or update the file stack with modification times
-    for file in files:
-        mtime = os.path.getmtime(file)
-        lste.file_stack[file] = mtime
+    for file in walk_files(lste):
+        try:
+            lste.file_stack[file] = os.path.getmtime(file)
+        except OSError:
+            continue
+
+
+class PollingWatcher:
+    """
+    Waits for changed files by comparing the modification times of all files.
+
+    Attributes:
+        lste (obj): The LSTE object holding the `file_stack`.
+        interval (float): The seconds between two checks.
+
+    Methods:
+        wait() -> Set[str]:
+            Blocks until files changed and returns their paths.
+        close() -> None:
+            Does nothing, exists for compatibility with the `InotifyWatcher`.
+    """
+
+    def __init__(self, lste, interval: float = 0.5) -> None:
+        """
+        Initializes the watcher and populates the file stack.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            interval (float): The seconds between two checks.
+
+        Returns:
+            None
+        """
+        self.lste = lste
+        self.interval = interval
+        setup_filestack(lste)
+
+    def wait(self) -> Set[str]:
+        """
+        Blocks until files changed, were added or were deleted and returns their paths.
+
+        Returns:
+            Set[str]: The paths of the changed files.
+        """
+        while True:
+            changed = set()
+
+            # Check if any files have changed or been added
+            for file in walk_files(self.lste):
+                try:
+                    mtime = os.path.getmtime(file)
+                except OSError:
+                    continue
+                if self.lste.file_stack.get(file) != mtime:
+                    self.lste.file_stack[file] = mtime
+                    changed.add(file)
+
+            # Remove files that no longer exist
+            for check_file in list(self.lste.file_stack):
+                if not os.path.isfile(check_file):
+                    self.lste.file_stack.pop(check_file)
+                    changed.add(check_file)
+
+            if changed:
+                return changed
+
+            # Sleep for a short period before checking again
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        """
+        Does nothing, exists for compatibility with the `InotifyWatcher`.
+
+        Returns:
+            None
+        """
+
+
+class InotifyWatcher:
+    """
+    Waits for changed files using the inotify API of the Linux kernel.
+
+    Every directory below the base path, except the ignored ones, gets its own watch.
+    Directories which are created while watching are added automatically.
+
+    Attributes:
+        lste (obj): The LSTE object.
+        debounce (float): The seconds without new events before the changes are reported.
+        fd (int): The inotify file descriptor.
+        watches (Dict[int, str]): The watched directories by watch descriptor.
+
+    Methods:
+        wait() -> Set[str]:
+            Blocks until files changed and returns their paths.
+        close() -> None:
+            Closes the inotify file descriptor.
+    """
+
+    def __init__(self, lste, debounce: float = 0.05) -> None:
+        """
+        Initializes inotify and watches all directories below the base path.
+
+        Parameters:
+            lste (obj): The LSTE object.
+            debounce (float): The seconds without new events before the changes are reported.
+
+        Raises:
+            OSError: If inotify is not available on this platform.
+
+        Returns:
+            None
+        """
+        self.lste = lste
+        self.debounce = debounce
+        self.ignored_paths = get_ignored_paths(lste)
+        self.watches = {}
+
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self.libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self.add_directory(lste.base_path)
+
+    def add_directory(self, path: str) -> List[str]:
+        """
+        Watches a directory and all its subdirectories.
+
+        Parameters:
+            path (str): The directory to watch.
+
+        Returns:
+            List[str]: The files found in the directories.
+        """
+        files = []
+        for dirpath, dirnames, filenames in os.walk(path):
+            if is_ignored(os.path.abspath(dirpath), self.ignored_paths):
+                dirnames[:] = []
+                continue
+
+            watch = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if watch < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, os.strerror(errno), dirpath)
+            self.watches[watch] = dirpath
+            files += [os.path.join(dirpath, filename) for filename in filenames]
+        return files
+
+    def read_events(self, changed: Set[str]) -> None:
+        """
+        Reads all pending events and adds the affected paths to the given set.
+
+        Parameters:
+            changed (Set[str]): The set of changed paths.
+
+        Returns:
+            None
+        """
+        while True:
+            try:
+                buffer = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return
+
+            offset = 0
+            while offset < len(buffer):
+                watch, mask, cookie, length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(buffer[offset:offset + length].rstrip(b"\0"))
+                offset += length
+
+                # the kernel dropped events, rebuild everything
+                if mask & IN_Q_OVERFLOW:
+                    changed.add(self.lste.base_path)
+                    continue
+
+                if mask & IN_IGNORED:
+                    self.watches.pop(watch, None)
+                    continue
+
+                directory = self.watches.get(watch)
+                if directory is None:
+                    continue
+
+                path = os.path.join(directory, name) if name else directory
+                if is_ignored(os.path.abspath(path), self.ignored_paths):
+                    continue
+
+                # new directories are watched as well
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self.add_directory(path))
+                changed.add(path)
+
+    def wait(self) -> Set[str]:
+        """
+        Blocks until files changed and returns their paths. Events are collected until
+        no new events arrived for the debounce period.
+
+        Returns:
+            Set[str]: The paths of the changed files and directories.
+        """
+        changed = set()
+        while not changed:
+            select.select([self.fd], [], [])
+            self.read_events(changed)
+
+        while select.select([self.fd], [], [], self.debounce)[0]:
+            self.read_events(changed)
+
+        return changed
+
+    def close(self) -> None:
+        """
+        Closes the inotify file descriptor.
+
+        Returns:
+            None
+        """
+        os.close(self.fd)
+
+
+def create_watcher(lste):
+    """
+    Creates the best available watcher: inotify on Linux, polling everywhere else.
+
+    Parameters:
+        lste (obj): The LSTE object.
+
+    Returns:
+        InotifyWatcher | PollingWatcher: The watcher.
+    """
+    try:
+        return InotifyWatcher(lste)
+    except (OSError, AttributeError):
+        return PollingWatcher(lste)
+
+
+def classify_changes(lste, changed: Set[str]) -> Dict[str, Set[str]]:
+    """
+    Sorts the changed paths into the buckets `config`, `template`, `content` and `asset`.
+    Paths outside of these locations are dropped.
+
+    Parameters:
+        lste (obj): The LSTE object, which should have the `base_path`, `template_path`,
+                    `content_path` and `assets_path` attributes.
+        changed (Set[str]): The paths of the changed files.
+
+    Returns:
+        Dict[str, Set[str]]: The changed paths by bucket.
+    """
+    buckets = {"config": set(), "template": set(), "content": set(), "asset": set()}
+    locations = [
+        ("template", os.path.abspath(lste.template_path)),
+        ("content", os.path.abspath(lste.content_path)),
+        ("asset", os.path.abspath(lste.assets_path)),
+    ]
+    config_file = os.path.abspath(os.path.join(lste.base_path, "lste.conf"))
+
+    for path in changed:
+        path = os.path.abspath(path)
+
+        # the config and unknown changes of the whole tree need a full rebuild
+        if path in (config_file, os.path.abspath(lste.base_path)):
+            buckets["config"].add(path)
+            continue
+
+        for bucket, location in locations:
+            if path == location or path.startswith(location + os.sep):
+                buckets[bucket].add(path)
+                break
+
+    return buckets
+
+
+def copy_asset(lste, path: str) -> None:
+    """
+    Copies a single changed asset to the `dist` folder or removes it from there if the
+    asset has been deleted.
+
+    Parameters:
+        lste (obj): The LSTE object, which should have `assets_path` and `dist_path` attributes.
+        path (str): The path of the changed asset.
+
+    Returns:
+        None
+    """
+    relative_path = os.path.relpath(path, lste.assets_path)
+    target = os.path.join(lste.dist_path, "assets", relative_path)
+
+    link = lste.config_file.getboolean("assets", "hardlink", fallback=False)
+
+    if os.path.isdir(path):
+        os.makedirs(target, exist_ok=True)
+    elif os.path.isfile(path):
+        assets.copy_file(path, target, link)
+    else:
+        assets.remove_path(target)
+
+
+def rebuild(lste, changed: Set[str]) -> None:
+    """
+    Renders and saves the site after files changed, doing only the work the changes need:
+
+    - a changed config loads the site again, with its plugins and variables, and rebuilds
+      the whole site
+    - changed templates and content only re-render the pages whose inputs changed,
+      like the pages whose template chain includes a changed template part
+    - changed assets are copied one by one
+
+    Parameters:
+        lste (obj): The LSTE object, which should have methods like `load_templates`,
+                    `load_content`, `render_site`, and `save_site`.
+        changed (Set[str]): The paths of the changed files.
+
+    Returns:
+        None
+    """
+    for path in sorted(changed):
+        print(f"Changed: {os.path.relpath(path, lste.base_path)}")
+
+    buckets = classify_changes(lste, changed)
+
+    # a changed config affects every page and may change the plugins and the caches
+    if buckets["config"]:
+        try:
+            lste.load()
+        except FileNotFoundError:
+            print("No lste file found in this project.")
+            return
+
+        incremental = lste.incremental
+        lste.incremental = False
+        try:
+            lste.render_site()
+            lste.save_site()
+        finally:
+            lste.incremental = incremental
+        lste.print_profile()
+        return
+
+    for path in sorted(buckets["asset"]):
+        copy_asset(lste, path)
+    if buckets["asset"]:
+        lste.hooks.exec("assets_changed", buckets["asset"])
+
+    if not buckets["template"] and not buckets["content"]:
+        return
+
+    if buckets["template"]:
+        lste.load_templates()
+    lste.load_content()
+
+    # only the pages whose inputs changed are rendered again, the hooks for the whole
+    # website still see all pages
+    incremental = lste.incremental
+    lste.incremental = True
+    try:
+        lste.render_site()
+        lste.save_site(copy_assets=False)
+    finally:
+        lste.incremental = incremental
+    lste.print_profile()
+
 
 def run_file_watcher(lste):
     """
     Watches the specified path for file changes and triggers site rendering when changes are detected.
 
-    This function continuously monitors the files in `lste.base_path` for changes by comparing
-    modification times. If a change is detected, it calls methods to load templates and content,
-    render the site, and save the output. The file stack is then updated to reflect the current state.
+    This function waits for changed files, reported either by inotify or by comparing
+    modification times. If a change is detected, it calls `rebuild` with the set of
+    changed paths, which renders and saves the pages affected by the changes.
 
     Parameters:
         lste (obj): The LSTE object, which should have `base_path`, `file_stack`, and methods
@@ -58,33 +520,12 @@ def run_file_watcher(lste):
     Returns:
         None
     """
+    file_watcher = create_watcher(lste)
     print(f'Watching folders in {lste.base_path} for changed files ...')
 
-    while True:
-        change_found = False
-
-        # List all files in the base path
-        files = [os.path.join(dp, f) for dp, dn, filenames in os.walk(lste.base_path) for f in filenames]
-        
-        # Check if any files have changed or been deleted
-        for file in files:
-            mtime = os.path.getmtime(file)
-            if file not in lste.file_stack or lste.file_stack[file] != mtime:
-                change_found = True
-
-        # Remove files that no longer exist
-        for check_file in list(lste.file_stack):
-            if not os.path.isfile(check_file):
-                lste.file_stack.pop(check_file)
-                change_found = True
-
-        # If changes are detected, trigger site rendering
-        if change_found:
-            lste.load_templates()
-            lste.load_content()
-            lste.render_site()
-            lste.save_site()
-            setup_filestack(lste)  # Reinitialize the file stack with current modification times
-
-        # Sleep for a short period before checking again
-        time.sleep(500 / 1000)
+    try:
+        while True:
+            changed = file_watcher.wait()
+            rebuild(lste, changed)
+    finally:
+        file_watcher.close()
@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+
+"""
+This module provides the functions which render pages in a process pool.
+
+The worker processes are forked from the main process, so every worker starts with a copy
+of the fully loaded LSTE object including the content, the compiled templates and the
+registered hooks. Nothing but the names of the content files and the rendered results is
+sent between the processes.
+
+The primary functions include:
+- `map_pages`: Calls a render method of the LSTE object for every given file, serially or in a process pool.
+- `init_worker`: Stores the LSTE object in a worker process.
+- `run`: Calls a render method of the stored LSTE object inside a worker process.
+
+Usage:
+    - Call `map_pages(lste, "render_markdown", files, parallel)` and iterate over the results.
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Iterator, List
+
+# the LSTE object of the worker process
+_lste = None
+
+
+def can_fork() -> bool:
+    """
+    Checks if worker processes can be forked on this platform. Without fork the LSTE
+    object would have to be pickled, which is not possible with loaded plugin modules.
+
+    Returns:
+        bool: True if the fork start method is available.
+    """
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def init_worker(lste) -> None:
+    """
+    Stores the LSTE object in the worker process.
+
+    Parameters:
+        lste (obj): The LSTE object inherited from the main process.
+
+    Returns:
+        None
+    """
+    global _lste
+    _lste = lste
+
+
+def run(method_name: str, file: str) -> Any:
+    """
+    Calls a render method of the stored LSTE object for a content file.
+
+    Parameters:
+        method_name (str): The name of the method, like `render_markdown`.
+        file (str): The name of the content file.
+
+    Returns:
+        Any: The result of the method.
+    """
+    return getattr(_lste, method_name)(file)
+
+
+def map_pages(lste, method_name: str, files: List[str], parallel: bool = True) -> Iterator[Any]:
+    """
+    Calls a render method of the LSTE object for every given file and yields the results
+    in the order of the files.
+
+    The files are rendered in a process pool with `lste.jobs` workers if more than one job
+    is configured, `parallel` is set and the platform supports forking. Otherwise the files
+    are rendered one after another in the current process.
+
+    Parameters:
+        lste (obj): The LSTE object.
+        method_name (str): The name of the render method, like `render_markdown`.
+        files (List[str]): The names of the content files.
+        parallel (bool): False if the method must run in the main process.
+
+    Returns:
+        Iterator[Any]: The results of the method for each file.
+    """
+    jobs = lste.jobs if lste.jobs > 0 else os.cpu_count() or 1
+    if jobs < 2 or len(files) < 2 or not parallel or not can_fork():
+        method = getattr(lste, method_name)
+        for file in files:
+            yield method(file)
+        return
+
+    jobs = min(jobs, len(files))
+    chunksize = max(1, len(files) // (jobs * 4))
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(
+        max_workers=jobs, mp_context=context, initializer=init_worker, initargs=(lste,)
+    ) as pool:
+        yield from pool.map(partial(run, method_name), files, chunksize=chunksize)
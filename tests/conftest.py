@@ -0,0 +1,74 @@
+"""
+Shared setup of the tests: the modules of LSTE are imported from the repository root.
+"""
+
+import os
+import sys
+import shutil
+
+import pytest
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
+
+
+def copy_site(name: str, target: str) -> str:
+    """
+    Copies the sources of an example website, without its output and caches.
+    """
+    source = os.path.join(ROOT_PATH, name)
+    shutil.copytree(source, target, ignore=shutil.ignore_patterns("dist", ".lste-cache"))
+    return target
+
+
+@pytest.fixture
+def simple_site(tmp_path):
+    return copy_site("example-simple", str(tmp_path / "site"))
+
+
+def write_file(path: str, content: str) -> None:
+    """
+    Writes a file and creates its folder.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as handle:
+        handle.write(content)
+
+
+def create_blog(path: str, config: str, articles: int = 3) -> str:
+    """
+    Creates a small website with articles in `content/articles` and the given `lste.conf`.
+    """
+    write_file(f"{path}/lste.conf", "[lste]\ntitle = Blog\nkeywords = blog\ndescription = A blog\n\n" + config)
+    write_file(f"{path}/template/index.html", "<html>\n<title>{{title}}</title>\n{{content}}\n</html>\n")
+    write_file(f"{path}/template/page.html", "<h1>{{title}}</h1>\n{{content}}\n")
+    write_file(f"{path}/template/articles-excerpt.html", "<a href=\"{{permalink}}\">{{title}}</a> {{date}}\n")
+    write_file(f"{path}/content/index.md", "# Start\n\n{{listing}}\n\n{{listing-pages}}\n")
+    for number in range(1, articles + 1):
+        write_file(
+            f"{path}/content/articles/2024-01-{number:02d}-article-{number}.md",
+            f"# Article {number}\n\nThe excerpt of article {number}.\n",
+        )
+    return path
+
+
+def build_site(path: str, **options) -> "Site":
+    """
+    Loads, renders and writes a website in this process and returns it.
+    """
+    from src.site import Site
+
+    site = Site(path, offline=True, **options)
+    site.load()
+    site.render()
+    site.write()
+    return site
+
+
+def read_file(path: str) -> str:
+    """
+    Returns the content of a file.
+    """
+    with open(path) as handle:
+        return handle.read()
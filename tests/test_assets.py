@@ -0,0 +1,36 @@
+"""
+Tests the synchronization of the assets folder.
+"""
+
+import os
+
+from src.assets import sync_assets
+
+
+def test_only_changed_assets_are_copied_and_removed_ones_are_deleted(tmp_path):
+    source = tmp_path / "assets"
+    target = tmp_path / "dist" / "assets"
+    (source / "css").mkdir(parents=True)
+    (source / "css" / "style.css").write_text("body {}")
+    (source / "logo.svg").write_text("<svg/>")
+
+    assert sync_assets(str(source), str(target)) == {"copied": 2, "unchanged": 0, "removed": 0}
+    assert (target / "css" / "style.css").read_text() == "body {}"
+    assert sync_assets(str(source), str(target)) == {"copied": 0, "unchanged": 2, "removed": 0}
+
+    (source / "logo.svg").unlink()
+    (source / "css" / "style.css").write_text("body { margin: 0 }")
+    assert sync_assets(str(source), str(target), checksum=True) == {"copied": 1, "unchanged": 0, "removed": 1}
+    assert sorted(os.listdir(target)) == ["css"]
+    assert (target / "css" / "style.css").read_text() == "body { margin: 0 }"
+
+
+def test_hardlinks(tmp_path):
+    source = tmp_path / "assets"
+    source.mkdir()
+    (source / "app.js").write_text("run()")
+    target = tmp_path / "dist"
+
+    sync_assets(str(source), str(target), link=True)
+    assert os.stat(target / "app.js").st_ino == os.stat(source / "app.js").st_ino
+    assert sync_assets(str(source), str(target), link=True)["unchanged"] == 1
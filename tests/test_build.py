@@ -0,0 +1,135 @@
+"""
+Builds the example websites with the command-line interface in every build mode and compares
+the outputs byte for byte.
+"""
+
+import os
+import sys
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import ROOT_PATH, copy_site, create_blog, read_file
+from src.reproducible import compare_trees
+
+MODES = [
+    [],
+    ["--incremental"],
+    ["--jobs=2"],
+    ["--stream"],
+    ["--stream", "--jobs=2", "--incremental"],
+]
+
+BLOG = """[listing]
+per_page = 2
+template = articles-excerpt.html
+date_format = d.m.Y
+
+[content]
+recursive = yes
+
+[feed]
+url = https://example.com
+source = articles
+
+[sitemap]
+url = https://example.com
+"""
+
+
+def run(path: str, home: str, arguments: list) -> str:
+    environment = dict(os.environ, HOME=home, SOURCE_DATE_EPOCH="1700000000")
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT_PATH, "lste.py"), "--offline", "-p", path] + arguments,
+        env=environment, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+def create(name: str, path: str) -> str:
+    if name == "blog":
+        create_blog(path, BLOG, articles=5)
+    else:
+        copy_site(name, path)
+
+    # the copies only differ in the build mode, not in the modification times of their files
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            os.utime(os.path.join(dirpath, filename), (1600000000, 1600000000))
+    return path
+
+
+@pytest.fixture
+def home(tmp_path):
+    return str(tmp_path / "home")
+
+
+@pytest.mark.parametrize("name", ["example-full", "blog"])
+def test_all_modes_build_the_same_bytes(name, tmp_path, home):
+    reference = create(name, str(tmp_path / "reference"))
+    run(reference, home, [])
+    for number, arguments in enumerate(MODES[1:]):
+        path = create(name, str(tmp_path / f"mode-{number}"))
+        run(path, home, arguments)
+        assert compare_trees(f"{reference}/dist", f"{path}/dist") == [], arguments
+
+
+@pytest.mark.parametrize("arguments", [["--incremental"], ["--incremental", "--stream"]])
+def test_incremental_build_after_changes_matches_a_full_build(arguments, tmp_path, home):
+    path = create("blog", str(tmp_path / "incremental"))
+    run(path, home, arguments)
+
+    # a changed article, a new one, a deleted one and a changed template part
+    with open(f"{path}/content/articles/2024-01-02-article-2.md", "a") as handle:
+        handle.write("\nAn update.\n")
+    with open(f"{path}/content/articles/2024-02-01-new.md", "w") as handle:
+        handle.write("# New\n\nA new article.\n")
+    os.remove(f"{path}/content/articles/2024-01-05-article-5.md")
+    with open(f"{path}/template/page.html", "a") as handle:
+        handle.write("<footer></footer>\n")
+    output = run(path, home, arguments)
+    assert "Rendering template for: articles/2024-01-03-article-3.md" in output
+
+    # only the listing pages change when an article is touched
+    with open(f"{path}/content/articles/2024-01-04-article-4.md", "a") as handle:
+        handle.write("\nAnother update.\n")
+    output = run(path, home, arguments)
+    assert "Rendering template for: articles/2024-01-03-article-3.md" not in output
+
+    reference = str(tmp_path / "reference")
+    shutil.copytree(path, reference, ignore=shutil.ignore_patterns("dist", ".lste-cache"))
+    run(reference, home, [])
+    assert compare_trees(f"{reference}/dist", f"{path}/dist") == []
+
+
+def test_build_without_cache_removes_stale_pages(tmp_path, home):
+    path = create("example-simple", str(tmp_path / "site"))
+    os.makedirs(f"{path}/dist/old")
+    for file in ("dist/old/page.html", "dist/gone.html", "dist/robots.txt"):
+        with open(f"{path}/{file}", "w") as handle:
+            handle.write("stale")
+
+    output = run(path, home, [])
+    assert "3 deleted" in output
+    assert sorted(os.listdir(f"{path}/dist")) == ["assets", "index.html", "old", "other.html", "sample.html"]
+
+
+def test_outputs_which_are_not_produced_anymore_are_removed(tmp_path, home):
+    path = create("blog", str(tmp_path / "site"))
+    run(path, home, [])
+    assert os.path.isfile(f"{path}/dist/feed.xml") and os.path.isfile(f"{path}/dist/sitemap.xml")
+
+    # a file of the user which isn't an output of the last build is kept
+    with open(f"{path}/dist/robots.txt", "w") as handle:
+        handle.write("kept")
+    config = read_file(f"{path}/lste.conf").replace("[feed]", "[old-feed]")
+    with open(f"{path}/lste.conf", "w") as handle:
+        handle.write(config)
+
+    output = run(path, home, ["--incremental"])
+    assert "1 deleted" in output
+    assert not os.path.exists(f"{path}/dist/feed.xml")
+    assert os.path.isfile(f"{path}/dist/sitemap.xml")
+    assert read_file(f"{path}/dist/robots.txt") == "kept"
@@ -0,0 +1,94 @@
+"""
+Tests the front matter, the content index and the lazy content entries.
+"""
+
+import os
+
+from conftest import build_site
+from src.content import ContentIndex, LazyContent, get_stamp, split_front_matter
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as handle:
+        handle.write(text)
+
+
+def test_front_matter():
+    metadata, body = split_front_matter(
+        "---\ntemplate: article.html\ndraft = no\ntags: [python, \"hooks\"]\n---\n# Title\n"
+    )
+    assert metadata == {"template": "article.html", "draft": False, "tags": ["python", "hooks"]}
+    assert body == "# Title\n"
+    assert split_front_matter("# Title\n") == ({}, "# Title\n")
+
+
+def test_index_tracks_changes_and_keeps_headers(tmp_path):
+    content_path = str(tmp_path / "content")
+    write(f"{content_path}/index.md", "---\ntitle: Start\n---\n# Home\n\nThe excerpt.\n\nThe rest.\n")
+    write(f"{content_path}/articles/first.md", "# First\n\nHello.\n")
+    cache_file = str(tmp_path / "content.json")
+
+    index = ContentIndex(content_path, cache_file)
+    index.scan()
+    assert index.get_pages() == ["index.md"]
+    assert index.get_pages(recursive=True) == ["articles/first.md", "index.md"]
+    assert index.changed == {"index.md", "articles/first.md"}
+    header = index.get_header("index.md")
+    assert header == {"metadata": {"title": "Start"}, "title": "Home", "excerpt": "The excerpt."}
+    index.save()
+
+    # the next run only sees the changed file, the header comes from the stored index
+    write(f"{content_path}/articles/first.md", "# First\n\nChanged.\n")
+    os.remove(f"{content_path}/articles/first.md")
+    write(f"{content_path}/articles/second.md", "# Second\n")
+    index = ContentIndex(content_path, cache_file)
+    index.scan()
+    assert index.changed == {"articles/second.md"}
+    assert index.removed == {"articles/first.md"}
+    assert index.files["index.md"]["header"] == header
+    assert get_stamp(index.files["index.md"]) == (
+        os.stat(f"{content_path}/index.md").st_size, os.stat(f"{content_path}/index.md").st_mtime_ns
+    )
+
+
+def test_lazy_content_loads_on_access():
+    loaded = []
+
+    def load(file):
+        loaded.append(file)
+        return {"content": file}
+
+    content = LazyContent(["a.md", "b.md"], load)
+    assert list(content) == ["a.md", "b.md"] and "a.md" in content
+    assert loaded == []
+
+    assert content["a.md"] == {"content": "a.md"}
+    assert content["a.md"] == {"content": "a.md"}
+    assert loaded == ["a.md"]
+    assert content.is_loaded("a.md") and not content.is_loaded("b.md")
+
+    content.unload("a.md")
+    assert not content.is_loaded("a.md")
+    content["c.md"] = {"content": "set"}
+    assert content.assigned == {"c.md"}
+    assert content.copy() == {"a.md": {"content": "a.md"}, "b.md": {"content": "b.md"}, "c.md": {"content": "set"}}
+
+
+def test_loaded_content_keeps_its_digest(simple_site):
+    site = build_site(simple_site)
+    digests = {file: site.get_page_digest(file) for file in site.content}
+    site.content.copy()
+    assert {file: site.get_page_digest(file) for file in site.content} == digests
+
+    site.content["other.md"] = dict(site.content["other.md"], content="# Set by a plugin\n")
+    assert site.get_page_digest("other.md") != digests["other.md"]
+
+
+def test_any_skip_markdown_key_keeps_the_content(simple_site):
+    for name, value in (("empty", ""), ("off", " no")):
+        write(f"{simple_site}/content/{name}.md", f"---\nskip_markdown:{value}\n---\n# Title\n\n*kept*\n")
+    build_site(simple_site)
+    for name in ("empty", "off"):
+        with open(f"{simple_site}/dist/{name}.html") as handle:
+            assert "*kept*" in handle.read()
@@ -0,0 +1,38 @@
+"""
+Tests the markdown converter and its caches.
+"""
+
+import os
+
+from src.converter import MarkdownConverter
+
+
+def test_convert_uses_the_disk_cache(tmp_path):
+    cache_path = str(tmp_path / "markdown")
+    converter = MarkdownConverter(["fenced_code"], cache_path)
+    html = converter.convert("# Hello")
+    assert html == "<h1>Hello</h1>"
+    converter.store("# Hello", html)
+    assert os.listdir(cache_path) == [f"{converter.get_key('# Hello')}.html"]
+
+    # a new converter reads the cached html instead of converting again
+    converter = MarkdownConverter(["fenced_code"], cache_path, memory=False)
+    with open(os.path.join(cache_path, f"{converter.get_key('# Hello')}.html"), "w") as handle:
+        handle.write("<h1>cached</h1>")
+    assert converter.convert("# Hello") == "<h1>cached</h1>"
+    assert converter.cache == {}
+
+
+def test_key_covers_the_extensions():
+    assert MarkdownConverter(["tables"]).get_key("a") != MarkdownConverter(["fenced_code"]).get_key("a")
+
+
+def test_prune_keys(tmp_path):
+    cache_path = str(tmp_path / "markdown")
+    converter = MarkdownConverter([], cache_path)
+    for text in ("one", "two"):
+        converter.store(text, converter.convert(text))
+
+    converter.prune_keys({converter.get_key("two")})
+    assert list(converter.cache) == [converter.get_key("two")]
+    assert os.listdir(cache_path) == [f"{converter.get_key('two')}.html"]
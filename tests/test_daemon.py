@@ -0,0 +1,60 @@
+"""
+Tests the build daemon over a real Unix socket.
+"""
+
+import os
+import threading
+
+import pytest
+
+from src.daemon import BuildDaemon, send_request
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    socket_path = str(tmp_path / "lste.sock")
+    daemon = BuildDaemon(socket_path)
+    thread = threading.Thread(target=daemon.run, daemon=True)
+    thread.start()
+    yield socket_path
+    send_request(socket_path, {"command": "shutdown"}, timeout=10)
+    thread.join(10)
+    assert not os.path.exists(socket_path)
+
+
+def test_ping(daemon):
+    assert send_request(daemon, {"command": "ping"}, timeout=10) == {"ok": True, "sites": []}
+
+
+@pytest.mark.parametrize("request_data, error", [
+    ({"command": "build"}, "build needs: path"),
+    ({"command": "render"}, "render needs: path, file"),
+    ({"command": "render", "path": "/tmp"}, "render needs: file"),
+    ({"command": "build", "path": 1}, "build needs: path"),
+    (["build"], "the request must be a JSON object"),
+    ({"command": "deploy"}, "unknown command: deploy"),
+])
+def test_invalid_requests_are_answered_with_an_error(daemon, request_data, error):
+    assert send_request(daemon, request_data, timeout=10) == {"ok": False, "error": error}
+
+
+def test_build_and_render(daemon, simple_site, monkeypatch):
+    # the rendered page has the same timestamp as the written one
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+
+    answer = send_request(daemon, {"command": "build", "path": simple_site}, timeout=60)
+    assert answer["ok"], answer
+    assert "Saved pages: 3 written" in answer["output"]
+    assert os.path.isfile(os.path.join(simple_site, "dist", "index.html"))
+
+    # the second build keeps the site loaded and skips the unchanged pages
+    answer = send_request(daemon, {"command": "build", "path": simple_site, "incremental": True}, timeout=60)
+    assert "Rendering template" not in answer["output"]
+    assert send_request(daemon, {"command": "ping"}, timeout=10)["sites"] == [simple_site]
+
+    answer = send_request(daemon, {"command": "render", "path": simple_site, "file": "other.md"}, timeout=60)
+    with open(os.path.join(simple_site, "dist", "other.html")) as handle:
+        assert answer == {"ok": True, "html": handle.read()}
+
+    answer = send_request(daemon, {"command": "render", "path": simple_site, "file": "missing.md"}, timeout=60)
+    assert answer == {"ok": False, "error": "unknown page: missing.md"}
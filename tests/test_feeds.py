@@ -0,0 +1,52 @@
+"""
+Tests the feed and the sitemap.
+"""
+
+import xml.etree.ElementTree as ElementTree
+
+from conftest import build_site, create_blog
+
+FEEDS = """[listing]
+per_page = 2
+template = articles-excerpt.html
+
+[feed]
+url = https://example.com/
+source = articles
+limit = 2
+
+[sitemap]
+url = https://example.com
+"""
+
+
+def test_feed_and_sitemap(tmp_path, capsys):
+    path = create_blog(str(tmp_path), FEEDS)
+    build_site(path)
+
+    channel = ElementTree.parse(f"{path}/dist/feed.xml").getroot().find("channel")
+    assert channel.findtext("title") == "Blog"
+    assert [item.findtext("title") for item in channel.findall("item")] == ["Article 3", "Article 2"]
+    assert channel.find("item").findtext("link") == "https://example.com/articles/2024-01-03-article-3.html"
+
+    namespace = {"sitemap": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+    urls = [url.text for url in ElementTree.parse(f"{path}/dist/sitemap.xml").getroot().iterfind(
+        "sitemap:url/sitemap:loc", namespace
+    )]
+    assert "https://example.com/index.html" in urls
+    assert "https://example.com/index-2.html" in urls
+    assert "https://example.com/articles/2024-01-01-article-1.html" in urls
+
+    # unchanged entries aren't written again
+    capsys.readouterr()
+    build_site(path)
+    assert "Saved feeds: 0 written, 2 skipped" in capsys.readouterr().out
+
+
+def test_atom_feed(tmp_path):
+    path = create_blog(str(tmp_path), FEEDS.replace("limit = 2", "format = atom"))
+    build_site(path)
+
+    root = ElementTree.parse(f"{path}/dist/feed.xml").getroot()
+    assert root.tag == "{http://www.w3.org/2005/Atom}feed"
+    assert len(root.findall("{http://www.w3.org/2005/Atom}entry")) == 3
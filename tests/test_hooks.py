@@ -0,0 +1,42 @@
+"""
+Tests the hooks and the loaders of lazily imported plugins.
+"""
+
+from src.hooks import Hooks
+
+
+def test_callbacks_run_by_priority():
+    hooks = Hooks()
+    hooks.add("title", lambda value: value + " late", priority=20)
+    hooks.add("title", lambda value, file: f"{value} {file}")
+    assert hooks.apply("title", "Hello", "index.md") == "Hello index.md late"
+    assert hooks.apply("unknown", "Hello") == "Hello"
+
+
+def test_loader_runs_once_before_the_first_dispatch():
+    hooks = Hooks()
+    loads = []
+
+    def loader():
+        loads.append(True)
+        hooks.add("title", lambda value: value.upper())
+
+    hooks.add_loader("title", loader)
+    hooks.add_loader("other", loader)
+    assert loads == []
+
+    assert hooks.apply("title", "hello") == "HELLO"
+    assert hooks.apply("title", "again") == "AGAIN"
+    assert loads == [True]
+
+
+def test_callbacks_of_plugins_keep_the_order_of_the_config():
+    hooks = Hooks()
+    hooks.add("title", lambda value: value + " core")
+    hooks.position = 1
+    hooks.add("title", lambda value: value + " second")
+    hooks.position = 0
+    hooks.add("title", lambda value: value + " first")
+    hooks.add("title", lambda value: value + " early", priority=5)
+    hooks.position = None
+    assert hooks.apply("title", "Hello") == "Hello early first second core"
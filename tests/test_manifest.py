@@ -0,0 +1,41 @@
+"""
+Tests the manifest of the pages of the last build.
+"""
+
+from src.manifest import Manifest, digest
+
+
+def test_digest_is_stable_and_ordered():
+    assert digest({"b": 1, "a": 2}) == digest({"a": 2, "b": 1})
+    assert digest("a", "b") != digest("b", "a")
+    assert digest("ab") != digest("a", "b")
+
+
+def test_saved_manifest_knows_the_current_pages(tmp_path):
+    dist_path = tmp_path / "dist"
+    dist_path.mkdir()
+    (dist_path / "index.html").write_text("<html>")
+
+    manifest = Manifest(str(tmp_path / "cache" / "manifest.json"))
+    assert not manifest.load()
+    manifest.update("index.md", "one", "index.html")
+    manifest.update("gone.md", "two", "gone.html")
+    manifest.outputs = ["feed.xml", "gone.html", "index.html"]
+    manifest.save()
+
+    manifest = Manifest(str(tmp_path / "cache" / "manifest.json"))
+    assert manifest.load() and manifest.loaded
+    assert manifest.is_current("index.md", "one", str(dist_path))
+    assert not manifest.is_current("index.md", "changed", str(dist_path))
+    # the output is missing
+    assert not manifest.is_current("gone.md", "two", str(dist_path))
+    assert manifest.orphans(["index.md"]) == [("gone.md", "gone.html")]
+    assert manifest.outputs == ["feed.xml", "gone.html", "index.html"]
+
+
+def test_broken_manifest_is_empty(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{broken")
+    manifest = Manifest(str(path))
+    assert not manifest.load()
+    assert manifest.pages == {} and not manifest.loaded
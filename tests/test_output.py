@@ -0,0 +1,47 @@
+"""
+Tests the writer of the generated files.
+"""
+
+import os
+
+from src.output import OutputWriter
+
+
+def test_unchanged_files_are_skipped(tmp_path):
+    path = str(tmp_path / "dist" / "index.html")
+    writer = OutputWriter()
+    assert writer.write(path, "<html>")
+    mtime = os.stat(path).st_mtime_ns
+
+    assert not writer.write(path, "<html>")
+    assert os.stat(path).st_mtime_ns == mtime
+    assert writer.write(path, "<html lang=\"en\">")
+    assert writer.summary() == "2 written, 1 skipped, 0 deleted"
+    assert os.listdir(tmp_path / "dist") == ["index.html"]
+
+
+def test_stream_replaces_the_file_only_on_success(tmp_path):
+    path = str(tmp_path / "feed.xml")
+    writer = OutputWriter()
+    with writer.stream(path) as handle:
+        handle.write(b"<rss/>")
+
+    try:
+        with writer.stream(path) as handle:
+            handle.write(b"<broken")
+            raise RuntimeError("interrupted")
+    except RuntimeError:
+        pass
+
+    with open(path, "rb") as handle:
+        assert handle.read() == b"<rss/>"
+    assert os.listdir(tmp_path) == ["feed.xml"]
+
+
+def test_delete(tmp_path):
+    path = tmp_path / "old.html"
+    path.write_text("old")
+    writer = OutputWriter()
+    assert writer.delete(str(path))
+    assert not writer.delete(str(path))
+    assert writer.stats["deleted"] == 1
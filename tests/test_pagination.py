@@ -0,0 +1,58 @@
+"""
+Tests the listings: pagination, rendered items and the opt-in `[articles]` fallback.
+"""
+
+import os
+
+from conftest import build_site as build, create_blog, read_file as read
+from src.pagination import Paginator
+
+
+def test_paginator_slices_pages():
+    paginator = Paginator(list(range(5)), 2)
+    assert paginator.get_page_count() == 3
+    assert paginator.get_page(3) == [4]
+    assert Paginator([], 2).get_page_count() == 1
+
+
+def test_listing_pages(tmp_path):
+    path = create_blog(str(tmp_path), "[listing]\nsource = articles\nper_page = 2\nlocation = index\n"
+                       "template = articles-excerpt.html\ndate_format = d.m.Y\n")
+    build(path)
+
+    first = read(f"{path}/dist/index.html")
+    assert "Article 3" in first and "Article 2" in first and "Article 1" not in first
+    assert "03.01.2024" in first
+    second = read(f"{path}/dist/index-2.html")
+    assert "Article 1" in second and "Article 3" not in second
+    assert os.path.isfile(f"{path}/dist/articles/2024-01-01-article-1.html")
+
+
+def test_articles_section_is_the_fallback(tmp_path):
+    path = create_blog(str(tmp_path), "[articles]\nlisting = yes\narticles_per_page = 2\nlocation = index\n"
+                       "date_format = d.m.Y\n")
+    site = build(path)
+
+    assert [listing.per_page for listing in site.listings.listings] == [2]
+    assert site.listings.get_sections(site) == [("articles", {
+        "source": "articles", "template": "articles-excerpt.html", "per_page": "2", "location": "index",
+        "date_format": "d.m.Y",
+    })]
+    assert "Article 1" in read(f"{path}/dist/index-2.html")
+
+
+def test_articles_section_needs_to_opt_in(tmp_path):
+    path = create_blog(str(tmp_path), "[articles]\narticles_per_page = 2\nlocation = index\n")
+    site = build(path)
+
+    assert site.listings.listings == []
+    assert not os.path.exists(f"{path}/dist/index-2.html")
+
+
+def test_articles_section_is_left_to_the_articles_plugin(tmp_path):
+    path = create_blog(str(tmp_path), "[articles]\narticles_per_page = 2\nlocation = index\n\n"
+                       "[plugins]\narticles = lauratheq/articles.lste\n")
+    site = build(path)
+
+    assert site.listings.listings == []
+    assert not os.path.exists(f"{path}/dist/index-2.html")
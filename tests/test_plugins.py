@@ -0,0 +1,205 @@
+"""
+Tests the release check of the plugins against a local stand-in for the GitHub API.
+"""
+
+import io
+import json
+import zipfile
+import threading
+import configparser
+import http.server
+from types import SimpleNamespace
+
+import pytest
+
+import src.helpers as helpers
+from src.hooks import Hooks
+from src.plugins import Plugins
+
+OLD_PLUGIN = '''
+def register_hooks(lste):
+    lste.hooks.add("pre_render_content", pre_render_content)
+
+
+def pre_render_content(lste):
+    return lste
+'''
+
+NEW_PLUGIN = '''
+def register_hooks(lste):
+    lste.hooks.add("after_save_site", after_save_site)
+
+
+def after_save_site(lste):
+    return lste
+'''
+
+
+class ReleaseHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answers `/repos/<owner>/<repo>/releases/latest` like GitHub: with an ETag, 304 if the ETag
+    still matches and 500 for the repository `owner/broken`.
+    """
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/zipball":
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(self.server.zipball)))
+            self.end_headers()
+            self.wfile.write(self.server.zipball)
+            return
+        if self.path == "/repos/owner/broken/releases/latest":
+            self.send_response(500)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        zipball_url = f"http://127.0.0.1:{self.server.server_port}/zipball"
+        body = json.dumps({"tag_name": "1.0.0", "zipball_url": zipball_url}).encode()
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def github(monkeypatch):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ReleaseHandler)
+    server.requests = []
+    server.zipball = b""
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("LSTE_GITHUB_API", f"http://127.0.0.1:{server.server_port}/")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def plugins(github, tmp_path):
+    plugins = Plugins()
+    plugins.cache_file = str(tmp_path / "releases.json")
+    plugins.load_release_cache()
+    return plugins
+
+
+def test_api_url_is_read_per_instance(github, monkeypatch):
+    assert Plugins().api_url == f"http://127.0.0.1:{github.server_port}"
+    monkeypatch.setenv("LSTE_GITHUB_API", "http://localhost:1")
+    assert Plugins().api_url == "http://localhost:1"
+
+
+def test_cached_release_is_used_within_the_ttl(github, plugins):
+    with plugins.get_session(1) as session:
+        first = plugins.get_latest_release(session, "owner/repo")
+        second = plugins.get_latest_release(session, "owner/repo")
+
+    assert first == second == {
+        "tag_name": "1.0.0",
+        "zipball_url": f"http://127.0.0.1:{github.server_port}/zipball",
+    }
+    assert len(github.requests) == 1
+
+
+def test_expired_release_is_revalidated(github, plugins):
+    with plugins.get_session(1) as session:
+        release = plugins.get_latest_release(session, "owner/repo")
+        plugins.release_cache["owner/repo"]["checked"] = 0
+        assert plugins.get_latest_release(session, "owner/repo") == release
+
+    assert github.requests[1] == ("/repos/owner/repo/releases/latest", '"v1"')
+    assert plugins.release_cache["owner/repo"]["checked"] > 0
+
+    # the revalidated release is written to the cache file
+    plugins.save_release_cache()
+    with open(plugins.cache_file) as handle:
+        assert json.load(handle)["owner/repo"]["etag"] == '"v1"'
+
+
+def test_error_keeps_the_cached_release(github, plugins):
+    cached = {"tag_name": "0.9.0", "zipball_url": "http://example.com/0.9.0.zip"}
+    plugins.release_cache["owner/broken"] = {"etag": "", "checked": 0, "release": cached}
+    with plugins.get_session(1) as session:
+        assert plugins.get_latest_release(session, "owner/broken") == cached
+        del plugins.release_cache["owner/broken"]
+        assert plugins.get_latest_release(session, "owner/broken") is None
+    assert len(github.requests) == 2
+
+
+def test_offline_build_sends_no_request(github, plugins):
+    config_file = configparser.ConfigParser()
+    config_file.read_dict({"plugins": {"articles": "owner/repo"}})
+    plugins.config_file = config_file
+
+    plugins.load_plugins(SimpleNamespace(offline=True))
+    assert github.requests == []
+
+
+def test_updated_plugin_is_imported_with_a_new_manifest_entry(github, plugins, tmp_path):
+    plugin_path = tmp_path / "plugins" / "lazy"
+    plugin_path.mkdir(parents=True)
+    (plugin_path / "lste.conf").write_text("[lste]\nversion = 0.1.0\n")
+    (plugin_path / "lazy.py").write_text(OLD_PLUGIN)
+
+    zipball = io.BytesIO()
+    with zipfile.ZipFile(zipball, "w") as archive:
+        archive.writestr("owner-repo-1/lste.conf", "[lste]\nversion = 1.0.0\n")
+        archive.writestr("owner-repo-1/lazy.py", NEW_PLUGIN)
+    github.zipball = zipball.getvalue()
+
+    config_file = configparser.ConfigParser()
+    config_file.read_dict({"plugins": {"lazy": "owner/repo"}})
+    plugins.config_file = config_file
+    plugins.plugins_folder = str(tmp_path / "plugins")
+    plugins.manifest_file = str(tmp_path / "plugins.manifest.json")
+    lste = SimpleNamespace(hooks=Hooks(), helpers=helpers, offline=False)
+
+    # the installed version is registered lazily
+    plugins.init_plugins(lste)
+    assert plugins.manifest["lazy"]["hooks"] == ["pre_render_content"]
+    assert "lazy" not in plugins.plugins
+
+    # the update is imported at once, with the hooks and the version of the new files
+    plugins.load_plugins(lste)
+    assert plugins.versions["lazy"] == "1.0.0"
+    assert plugins.manifest["lazy"]["hooks"] == ["after_save_site"]
+    assert "lazy" in plugins.plugins
+    with open(plugins.manifest_file) as handle:
+        assert json.load(handle)["plugins"]["lazy"]["version"] == "1.0.0"
+
+
+def test_lazy_plugins_run_in_the_order_of_the_config(tmp_path):
+    sources = {
+        "alpha": 'def register_hooks(lste):\n    lste.hooks.add("title", lambda value: value + " alpha")\n',
+        "beta": (
+            'def register_hooks(lste):\n'
+            '    lste.hooks.add("warmup", lambda value: value)\n'
+            '    lste.hooks.add("title", lambda value: value + " beta")\n'
+        ),
+    }
+    for name, source in sources.items():
+        plugin_path = tmp_path / "plugins" / name
+        plugin_path.mkdir(parents=True)
+        (plugin_path / "lste.conf").write_text("[lste]\nversion = 1.0.0\n")
+        (plugin_path / f"{name}.py").write_text(source)
+
+    config_file = configparser.ConfigParser()
+    config_file.read_dict({"plugins": {"alpha": "owner/alpha", "beta": "owner/beta"}})
+    plugins = Plugins(config_file)
+    plugins.plugins_folder = str(tmp_path / "plugins")
+    plugins.manifest_file = str(tmp_path / "plugins.manifest.json")
+    lste = SimpleNamespace(hooks=Hooks(), helpers=helpers, offline=True)
+    plugins.init_plugins(lste)
+
+    # beta is imported first, its callback still runs after the one of alpha
+    lste.hooks.apply("warmup", "")
+    assert list(plugins.plugins) == ["beta"]
+    assert lste.hooks.apply("title", "Hello") == "Hello alpha beta"
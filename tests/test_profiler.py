@@ -0,0 +1,30 @@
+"""
+Tests the profiler of the hooks and build phases.
+"""
+
+import json
+
+from src.hooks import Hooks
+from src.profiler import Profiler
+
+
+def test_hook_calls_and_phases_are_recorded(tmp_path):
+    profiler = Profiler()
+    hooks = Hooks()
+    hooks.profiler = profiler
+    hooks.add("title", lambda value: value.upper())
+
+    with profiler.phase("render_site"):
+        assert hooks.apply("title", "a") == "A"
+        assert hooks.apply("title", "b") == "B"
+
+    rows = {(row["kind"], row["name"]): row for row in profiler.get_rows()}
+    assert rows[("hook", "title")]["calls"] == 2
+    assert rows[("phase", "render_site")]["calls"] == 1
+    assert "render_site" in profiler.report()
+
+    profiler.save(str(tmp_path / "profile.json"))
+    with open(tmp_path / "profile.json") as handle:
+        assert len(json.load(handle)) == 2
+    profiler.reset()
+    assert profiler.get_rows() == []
@@ -0,0 +1,86 @@
+"""
+Tests the timestamps of reproducible builds and the self-check.
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+import lste
+from conftest import ROOT_PATH, build_site, create_blog, read_file
+from src import reproducible
+
+
+def test_timestamp_comes_from_each_page(tmp_path, monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    path = create_blog(str(tmp_path), "[listing]\nper_page = 2\ntemplate = articles-excerpt.html\n")
+    with open(f"{path}/template/index.html", "a") as handle:
+        handle.write("<!-- {{timestamp}} -->\n")
+    with open(f"{path}/content/contact.md", "w") as handle:
+        handle.write("---\ndate: 2023-05-06T12:00:00+00:00\n---\n# Contact\n")
+    os.utime(f"{path}/content/index.md", ns=(0, 1_600_000_000 * 10 ** 9))
+
+    site = build_site(path, reproducible=True)
+    assert reproducible.get_source_date(site, "contact.md") == 1683374400
+    # the date of the file name of an article
+    assert reproducible.get_source_date(site, "articles/2024-01-01-article-1.md") == 1704067200
+    # the newest article on the first listing page wins over the location file
+    assert reproducible.get_source_date(site, "index.md") == 1704240000
+    assert reproducible.get_source_date(site, "index-2.md") == 1704067200
+    assert "<!-- 1683374400 -->" in read_file(f"{path}/dist/contact.html")
+
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "42")
+    assert reproducible.get_source_date(site, "contact.md") == 42
+
+
+def test_compare_trees(tmp_path):
+    for name, files in (("left", {"a.html": "a", "sub/b.html": "b", "c.html": "c"}),
+                        ("right", {"a.html": "a", "sub/b.html": "changed", "d.html": "d"})):
+        for file, text in files.items():
+            os.makedirs(os.path.dirname(tmp_path / name / file), exist_ok=True)
+            (tmp_path / name / file).write_text(text)
+    assert reproducible.compare_trees(str(tmp_path / "left"), str(tmp_path / "right")) == [
+        "c.html", "d.html", "sub/b.html",
+    ]
+
+
+def test_check_reproducible(simple_site, tmp_path):
+    environment = dict(os.environ, HOME=str(tmp_path))
+    environment.pop("SOURCE_DATE_EPOCH", None)
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT_PATH, "lste.py"), "--check-reproducible", "-p", simple_site],
+        env=environment, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Reproducible: both builds are identical" in result.stdout
+
+
+def test_check_reproducible_ignores_old_files(simple_site, tmp_path):
+    environment = dict(os.environ, HOME=str(tmp_path))
+    environment.pop("SOURCE_DATE_EPOCH", None)
+
+    # a file which an earlier build left behind, the build keeps it
+    build_site(simple_site)
+    with open(f"{simple_site}/dist/feed.xml", "w") as handle:
+        handle.write("old")
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT_PATH, "lste.py"), "--check-reproducible", "-p", simple_site],
+        env=environment, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert os.path.isfile(f"{simple_site}/dist/feed.xml")
+
+
+def test_failed_check_is_reported(simple_site, tmp_path, monkeypatch, capsys):
+    def check_build(lste):
+        raise subprocess.CalledProcessError(2, "lste.py")
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(reproducible, "check_build", check_build)
+    monkeypatch.setattr(sys, "argv", ["lste.py", "--check-reproducible", "--offline", "-p", simple_site])
+    with pytest.raises(SystemExit) as error:
+        lste.main()
+    assert error.value.code == 1
+    assert "the build of a copy failed with exit code 2" in capsys.readouterr().out
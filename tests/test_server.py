@@ -0,0 +1,58 @@
+"""
+Tests the development server.
+"""
+
+import urllib.request
+
+from conftest import build_site, read_file
+from src import watcher
+from src.server import DevServer
+
+
+def serve(site) -> DevServer:
+    site.server = DevServer(site, "127.0.0.1", 0)
+    site.server.start()
+    site.render()
+    site.write()
+    return site.server
+
+
+def fetch(server: DevServer, path: str) -> str:
+    port = server.httpd.server_address[1]
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/{path}") as response:
+        return response.read().decode("utf-8")
+
+
+def test_config_change_keeps_the_server_up_to_date(simple_site):
+    site = build_site(simple_site)
+    server = serve(site)
+    try:
+        config = read_file(f"{simple_site}/lste.conf").replace("title = ", "title = CHANGED ", 1)
+        with open(f"{simple_site}/lste.conf", "w") as handle:
+            handle.write(config)
+        version = server.version
+        watcher.rebuild(site, {f"{simple_site}/lste.conf"})
+        assert server.version > version
+        assert "CHANGED" in fetch(server, "index.html")
+
+        with open(f"{simple_site}/content/other.md", "a") as handle:
+            handle.write("\nA new paragraph.\n")
+        watcher.rebuild(site, {f"{simple_site}/content/other.md"})
+        assert "A new paragraph." in fetch(server, "other.html")
+    finally:
+        server.stop()
+
+
+def test_rebuild_only_publishes_the_rendered_pages(simple_site):
+    site = build_site(simple_site)
+    server = serve(site)
+    try:
+        server.pages["index.html"] = b"<p>kept</p>"
+        with open(f"{simple_site}/content/other.md", "a") as handle:
+            handle.write("\nA new paragraph.\n")
+        watcher.rebuild(site, {f"{simple_site}/content/other.md"})
+
+        assert server.pages["index.html"] == b"<p>kept</p>"
+        assert b"A new paragraph." in server.pages["other.html"]
+    finally:
+        server.stop()
@@ -0,0 +1,57 @@
+"""
+Tests the template tokenizer and the compiled template cache.
+"""
+
+import pytest
+
+from src.templates import TemplateCache, tokenize
+
+
+@pytest.mark.parametrize("text, segments", [
+    ("<h1>{{title}}</h1>", [("<h1>", ""), ("{{title}}", "title"), ("</h1>", "")]),
+    ("{{ title }}{{content}}", [("{{ title }}", "title"), ("{{content}}", "content")]),
+    ("{{{title}}}", [("{", ""), ("{{title}}", "title"), ("}", "")]),
+    ("{{a {{title}}", [("{{a ", ""), ("{{title}}", "title")]),
+    ("{{a\n{{title}}", [("{{a\n", ""), ("{{title}}", "title")]),
+    ("{{title", [("{{title", "")]),
+])
+def test_tokenize(text, segments):
+    assert tokenize(text) == segments
+    assert "".join(segment for segment, name in segments) == text
+
+
+def test_tokenize_matches_replacing_every_placeholder():
+    text = "{{{title}}} {{a {{title}} {{title}}}"
+    rendered = "".join("Hello" if name == "title" else segment for segment, name in tokenize(text))
+    assert rendered == text.replace("{{title}}", "Hello")
+
+
+def test_parts_are_expanded_and_cached():
+    cache = TemplateCache()
+    cache.update({
+        "index.html": "<main>{{part: page.html}}</main>",
+        "page.html": "<h1>{{title}}</h1>{{part: footer.html}}",
+        "footer.html": "<footer>{{keywords}}</footer>",
+    })
+    template = cache.get("index.html")
+    assert template.html == "<main><h1>{{title}}</h1><footer>{{keywords}}</footer></main>"
+    assert template.chain == ["index.html", "page.html", "footer.html"]
+    assert template.render({"title": "Hello"}) == "<main><h1>Hello</h1><footer>{{keywords}}</footer></main>"
+    assert cache.get("index.html") is template
+
+
+def test_changed_part_drops_the_templates_which_include_it():
+    sources = {
+        "index.html": "<main>{{part: footer.html}}</main>",
+        "page.html": "{{content}}",
+        "footer.html": "<footer></footer>",
+    }
+    cache = TemplateCache()
+    cache.update(dict(sources))
+    index = cache.get("index.html")
+    page = cache.get("page.html")
+
+    cache.update(dict(sources, **{"footer.html": "<footer>new</footer>"}))
+    assert cache.get("page.html") is page
+    assert cache.get("index.html") is not index
+    assert cache.get("index.html").html == "<main><footer>new</footer></main>"
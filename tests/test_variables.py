@@ -0,0 +1,24 @@
+"""
+Tests the template variables.
+"""
+
+from src.variables import Variables, substitute
+
+
+def test_substitute_keeps_unknown_placeholders():
+    assert substitute("{{title}} {{other}}", {"title": "Hi"}) == "Hi {{other}}"
+
+
+def test_callbacks_are_only_called_for_used_variables():
+    calls = []
+    variables = Variables()
+    variables.add("title", "Blog")
+    variables.add("path", lambda file, lste: calls.append(file) or f"/{file}")
+    variables.add("unused", lambda file, lste: calls.append("unused"))
+
+    html = variables.render("{{title}} {{path}} {{path}} {{content}}", "index.md", None, {"content": "text"})
+    assert html == "Blog /index.md /index.md text"
+    assert calls == ["index.md"]
+
+    variables.remove("title")
+    assert variables.render("{{title}}") == "{{title}}"
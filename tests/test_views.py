@@ -0,0 +1,39 @@
+"""
+Tests the lazy page views of the hooks for the whole website.
+"""
+
+import pytest
+
+from src.views import PageView
+
+
+def test_values_are_computed_until_they_are_set():
+    computed = []
+
+    def compute(file):
+        computed.append(file)
+        return f"<{file}>"
+
+    view = PageView(["a.md", "b.md"], compute)
+    assert list(view) == ["a.md", "b.md"] and len(view) == 2
+    assert computed == []
+
+    assert view["a.md"] == "<a.md>"
+    view["a.md"] = "set"
+    assert view["a.md"] == "set"
+    assert view.assigned == {"a.md": "set"}
+
+    view.release("a.md")
+    assert view["a.md"] == "<a.md>"
+    assert computed == ["a.md", "a.md"]
+    with pytest.raises(KeyError):
+        view["missing.md"]
+
+
+def test_new_pages_are_added():
+    view = PageView([], str.upper)
+    view.add("a.md")
+    view["b.md"] = "set"
+    assert dict(view) == {"a.md": "A.MD", "b.md": "set"}
+    del view["b.md"]
+    assert list(view) == ["a.md"] and view.assigned == {}
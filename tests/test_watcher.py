@@ -0,0 +1,67 @@
+"""
+Tests the rebuilds of watch mode.
+"""
+
+import os
+
+from conftest import build_site, read_file
+from src import watcher
+
+
+def test_changes_are_classified(simple_site):
+    site = build_site(simple_site)
+    buckets = watcher.classify_changes(site, {
+        f"{simple_site}/lste.conf",
+        f"{simple_site}/content/other.md",
+        f"{simple_site}/template/index.html",
+        f"{simple_site}/assets/style.css",
+        f"{simple_site}/dist/index.html",
+    })
+    assert buckets == {
+        "config": {f"{simple_site}/lste.conf"},
+        "template": {f"{simple_site}/template/index.html"},
+        "content": {f"{simple_site}/content/other.md"},
+        "asset": {f"{simple_site}/assets/style.css"},
+    }
+
+
+def test_content_change_renders_one_page_but_hooks_see_all(simple_site, capsys):
+    site = build_site(simple_site)
+    seen = {}
+
+    def after_render_content(lste):
+        seen.update({file: lste.rendered_html[file] for file in lste.rendered_html})
+        return lste
+
+    site.hooks.add("after_render_content", after_render_content)
+    with open(f"{simple_site}/content/other.md", "a") as handle:
+        handle.write("\nA new paragraph.\n")
+    capsys.readouterr()
+    watcher.rebuild(site, {f"{simple_site}/content/other.md"})
+
+    output = capsys.readouterr().out
+    assert "Rendering template for: other.md" in output
+    assert "Rendering template for: index.md" not in output
+    assert sorted(seen) == ["index.md", "other.md", "sample.md"]
+    assert seen["index.md"] == read_file(f"{simple_site}/dist/index.html")
+    assert "A new paragraph." in read_file(f"{simple_site}/dist/other.html")
+
+
+def test_config_change_loads_the_site_again(simple_site):
+    site = build_site(simple_site)
+    hooks = site.hooks
+    config = read_file(f"{simple_site}/lste.conf").replace("title = ", "title = Changed ", 1)
+    with open(f"{simple_site}/lste.conf", "w") as handle:
+        handle.write(config)
+
+    watcher.rebuild(site, {f"{simple_site}/lste.conf"})
+    assert site.hooks is not hooks
+    assert "Changed" in read_file(f"{simple_site}/dist/index.html")
+
+
+def test_deleted_asset_is_removed(simple_site):
+    build_site(simple_site)
+    site = build_site(simple_site)
+    os.remove(f"{simple_site}/assets/style.css")
+    watcher.rebuild(site, {f"{simple_site}/assets/style.css"})
+    assert not os.path.exists(f"{simple_site}/dist/assets/style.css")
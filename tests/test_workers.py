@@ -0,0 +1,28 @@
+"""
+Tests rendering pages in worker processes.
+"""
+
+import os
+
+from src import workers
+
+
+class Renderer:
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    def render(self, file):
+        return file, os.getpid()
+
+
+def test_results_keep_the_order_of_the_files():
+    files = [f"page-{number}.md" for number in range(20)]
+    results = list(workers.map_pages(Renderer(2), "render", files))
+    assert [file for file, pid in results] == files
+    if workers.can_fork():
+        assert os.getpid() not in {pid for file, pid in results}
+
+
+def test_pages_stay_in_the_main_process_if_not_parallel_safe():
+    results = list(workers.map_pages(Renderer(2), "render", ["a.md", "b.md"], parallel=False))
+    assert results == [("a.md", os.getpid()), ("b.md", os.getpid())]